@@ -18,7 +18,25 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+# Calendar apps can't send an Authorization header, so the iCal feed URL carries a
+# long-lived token that is only good for that feed.
+CALENDAR_SCOPE = "calendar"
+CALENDAR_TOKEN_EXPIRE_DAYS = 365
+
+def create_calendar_token(email: str) -> str:
+    return create_access_token({"sub": email, "scope": CALENDAR_SCOPE}, timedelta(days=CALENDAR_TOKEN_EXPIRE_DAYS))
+
+def get_calendar_user(token: str, db: Session):
+    """User for a calendar feed token, or None if it is invalid, expired or not a calendar token."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("scope") != CALENDAR_SCOPE or not payload.get("sub"):
+        return None
+    return crud.get_user_by_email(db, email=payload["sub"])
+
+def _user_from_token(token: str, db: Session):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -29,6 +47,9 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         email: str | None = payload.get("sub")
         if email is None:
             raise credentials_exception
+        if payload.get("scope") == CALENDAR_SCOPE:
+            # A leaked feed URL must not grant API access
+            raise credentials_exception
     except JWTError:
         raise credentials_exception
     user = crud.get_user_by_email(db, email=email)
@@ -36,5 +57,17 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         raise credentials_exception
     return user
 
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+    return _user_from_token(token, db)
+
+def get_current_reader(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_read_db)):
+    """get_current_user for read-only endpoints: looks the user up in the handler's read session.
+
+    FastAPI resolves get_read_db once per request, so the lookup shares the handler's
+    (replica) connection instead of opening one on the primary. The returned user belongs
+    to that session; don't modify it.
+    """
+    return _user_from_token(token, db)
+
 def get_current_active_user(current_user: schemas.UserOut = Depends(get_current_user)):
     return current_user
@@ -0,0 +1,46 @@
+"""In-process shared cache entries for hot, user-independent reads.
+
+Each worker keeps its own copy. Writers in the same worker invalidate
+explicitly; the TTL bounds how stale another worker's copy (or one loaded
+from a lagging read replica) can get.
+"""
+
+import time
+import threading
+from typing import Any, Callable
+from . import config
+
+
+class _CachedEntry:
+    """One cached value, loaded on demand and dropped on invalidate() or after `ttl_seconds`."""
+
+    def __init__(self, ttl_seconds: float):
+        self._ttl = float(ttl_seconds)
+        self._value: Any = None
+        self._expires = 0.0
+        # Bumped by invalidate(); a load that raced an invalidation is not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, loader: Callable[[], Any]) -> Any:
+        if self._ttl <= 0:
+            return loader()
+        with self._lock:
+            if self._value is not None and time.monotonic() < self._expires:
+                return self._value
+            generation = self._generation
+        value = loader()
+        with self._lock:
+            if generation == self._generation:
+                self._value = value
+                self._expires = time.monotonic() + self._ttl
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._value = None
+            self._generation += 1
+
+
+# First page of GET /community/posts with no search or cursor
+hot_feed = _CachedEntry(config.FEED_CACHE_TTL_SECONDS)
@@ -2,9 +2,40 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
+
+def _env_flag(name: str, default: str) -> bool:
+    return str(os.getenv(name, default)).strip().lower() in {'1', 'true', 'yes', 'on'}
+
+
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/postgres")
+# Optional read replica. When unset, read-only endpoints use the primary.
+DATABASE_READ_URL = (os.getenv("DATABASE_READ_URL") or "").strip() or None
+# After a client writes, keep its reads on the primary for this long (replica lag window).
+READ_AFTER_WRITE_SECONDS = int(os.getenv("READ_AFTER_WRITE_SECONDS", "5"))
 SECRET_KEY = os.getenv("SECRET_KEY", "devsecret")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 ADMIN_EMAIL = os.getenv("ADMIN_EMAIL", "admin@example.com")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "changeme")
+
+# Optional subsystems. Disabled ones are neither imported nor mounted (their routes 404).
+ENABLE_COMMUNITY = _env_flag("ENABLE_COMMUNITY", "false")
+ENABLE_RESOURCES = _env_flag("ENABLE_RESOURCES", "true")
+ENABLE_JOBS = _env_flag("ENABLE_JOBS", "true")
+ENABLE_PUSH = _env_flag("ENABLE_PUSH", "true")
+
+# Optional bearer token required to scrape /metrics (open when unset)
+METRICS_TOKEN = (os.getenv("METRICS_TOKEN") or "").strip() or None
+
+# Serve list endpoints through the prevalidated orjson path (see app/responses.py)
+FAST_JSON_RESPONSES = _env_flag("FAST_JSON_RESPONSES", "false")
+
+# Response compression: encodings in preference order ("br" needs the brotli package;
+# empty disables) and the smallest body worth compressing, in bytes.
+COMPRESSION_ENCODINGS = [e.strip().lower() for e in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",") if e.strip()]
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# ETag on GET responses so unchanged lists revalidate with a bodiless 304
+ENABLE_ETAGS = _env_flag("ENABLE_ETAGS", "true")
+
+# How long a worker may serve its cached first page of the community feed (0 disables)
+FEED_CACHE_TTL_SECONDS = float(os.getenv("FEED_CACHE_TTL_SECONDS", "10"))
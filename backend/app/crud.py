@@ -1,7 +1,8 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy import String, and_, case, cast, func, literal, null, or_, select, union_all, update
 from sqlalchemy.exc import IntegrityError
-from . import models, schemas
+from sqlalchemy.dialects import postgresql, sqlite
+from . import models, schemas, pagination, listing_urls, search
 from passlib.context import CryptContext
 from datetime import datetime
 from . import push
@@ -56,6 +57,8 @@ def authenticate_user(db: Session, email: str, password: str):
 def create_apartment(db: Session, apartment: schemas.ApartmentCreate, owner_id: int):
     ap = models.Apartment(**apartment.dict(), owner_id=owner_id)
     db.add(ap)
+    db.flush()
+    search.index(db, ap)
     db.commit()
     db.refresh(ap)
     return ap
@@ -63,6 +66,40 @@ def create_apartment(db: Session, apartment: schemas.ApartmentCreate, owner_id:
 def list_apartments(db: Session, skip: int=0, limit: int=100):
     return db.query(models.Apartment).offset(skip).limit(limit).all()
 
+def list_apartment_rows(db: Session, skip: int=0, limit: int=100):
+    """Apartments as ApartmentOut-shaped dicts, with the owner's name joined in one query."""
+    A = models.Apartment
+    rows = (
+        db.query(
+            A.id, A.title, A.description, A.location, A.rooms, A.rent, func.coalesce(A.listing_type, 'offer').label('listing_type'), A.gender,
+            A.shomer_shabbos, A.shomer_kashrut, A.opposite_gender_allowed, A.smoking_allowed,
+            A.owner_id, models.User.full_name,
+        )
+        .outerjoin(models.User, models.User.id == A.owner_id)
+        .order_by(A.id)
+        .offset(skip).limit(limit)
+        .all()
+    )
+    return [
+        {
+            'id': r.id,
+            'title': r.title,
+            'description': r.description,
+            'location': r.location,
+            'rooms': r.rooms,
+            'rent': r.rent,
+            'listing_type': r.listing_type,
+            'gender': r.gender,
+            'shomer_shabbos': bool(r.shomer_shabbos),
+            'shomer_kashrut': bool(r.shomer_kashrut),
+            'opposite_gender_allowed': bool(r.opposite_gender_allowed),
+            'smoking_allowed': bool(r.smoking_allowed),
+            'owner_id': r.owner_id,
+            'owner_name': r.full_name,
+        }
+        for r in rows
+    ]
+
 def get_apartment(db: Session, apartment_id: int):
     return db.query(models.Apartment).filter(models.Apartment.id==apartment_id).first()
 
@@ -96,24 +133,29 @@ def apply_to_apartment(db: Session, applicant_id: int, apartment_id: int, messag
 
 def list_applications_for_owner(db: Session, owner_id: int):
     # return all applications for apartments owned by owner
-    aps = db.query(models.Apartment).filter(models.Apartment.owner_id==owner_id).all()
-    result = []
-    for ap in aps:
-        apps = db.query(models.Application).filter(models.Application.apartment_id==ap.id).all()
-        apps_out = []
-        for a in apps:
-            applicant = db.query(models.User).filter(models.User.id==a.applicant_id).first()
-            apps_out.append({
-                'id': a.id,
-                'message': a.message,
-                'status': a.status,
-                'applicant_id': a.applicant_id,
-                'applicant_name': applicant.full_name if applicant else None,
-                'applicant_phone': None,
-                'apartment_id': a.apartment_id,
-            })
-        result.append({'apartment': {'id': ap.id, 'title': ap.title}, 'applications': apps_out})
-    return result
+    A, AP = models.Application, models.Apartment
+    aps = db.query(AP.id, AP.title).filter(AP.owner_id==owner_id).order_by(AP.id).all()
+    # Every application across the owner's apartments in one query, applicant name joined in
+    rows = (
+        db.query(A.id, A.message, A.status, A.applicant_id, A.apartment_id, models.User.full_name.label('applicant_name'))
+        .join(AP, AP.id == A.apartment_id)
+        .outerjoin(models.User, models.User.id == A.applicant_id)
+        .filter(AP.owner_id == owner_id)
+        .order_by(A.id)
+        .all()
+    )
+    by_apartment = {}
+    for a in rows:
+        by_apartment.setdefault(a.apartment_id, []).append({
+            'id': a.id,
+            'message': a.message,
+            'status': a.status,
+            'applicant_id': a.applicant_id,
+            'applicant_name': a.applicant_name,
+            'applicant_phone': None,
+            'apartment_id': a.apartment_id,
+        })
+    return [{'apartment': {'id': ap.id, 'title': ap.title}, 'applications': by_apartment.get(ap.id, [])} for ap in aps]
 
 def accept_application(db: Session, application_id: int, owner_id: int):
     a = db.query(models.Application).filter(models.Application.id==application_id).first()
@@ -240,40 +282,79 @@ def set_my_phone(db: Session, user_id: int, phone_number: str):
     return {"phone_number": u.phone_number, "phone_verified": bool(getattr(u, 'phone_verified', False))}
 
 
+def get_external_listing_by_url(db: Session, url: str):
+    """The listing whose canonical URL matches `url` (one probe on the unique url_hash index)."""
+    return db.query(models.ExternalListing).filter(models.ExternalListing.url_hash == listing_urls.url_hash(url)).first()
+
+
 def create_external_listing(db: Session, created_by_user_id: int, payload: schemas.ExternalListingCreate):
+    """Create a listing, or return the existing one for the same canonical URL.
+
+    Returns (listing, created).
+    """
+    url = (payload.url or '').strip()
     listing = models.ExternalListing(
         created_by_user_id=created_by_user_id,
         source=(payload.source or '').strip().lower(),
-        url=(payload.url or '').strip(),
+        url=url,
+        url_hash=listing_urls.url_hash(url),
         title=(payload.title or None),
         price=payload.price,
         location=(payload.location or None),
         notes=(payload.notes or None),
     )
     db.add(listing)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        existing = get_external_listing_by_url(db, url)
+        if existing is None:
+            raise
+        return existing, False
+    search.index(db, listing)
     db.commit()
     db.refresh(listing)
-    return listing
+    return listing, True
+
+
+# Totals past this are reported as "1000+" rather than counted exactly
+EXTERNAL_LISTINGS_TOTAL_CAP = 1000
 
 
-def list_external_listings(db: Session, skip: int = 0, limit: int = 20, search: str | None = None):
-    q = db.query(models.ExternalListing)
+def list_external_listings(db: Session, skip: int = 0, limit: int = 20, search: str | None = None, after: tuple | None = None):
+    """Newest-first page of listings plus a capped total.
+
+    `after` is the (created_at, id) of the previous page's last row (keyset
+    pagination); `skip` is kept for old clients. Returns (items, total, capped)
+    where `capped` means there are more than EXTERNAL_LISTINGS_TOTAL_CAP matches.
+    The ILIKE filters are served by the pg_trgm indexes from migration 3.
+    """
+
+    L = models.ExternalListing
+    q = db.query(L)
     s = (search or '').strip()
     if s:
         like = f"%{s}%"
         q = q.filter(
             or_(
-                models.ExternalListing.title.ilike(like),
-                models.ExternalListing.url.ilike(like),
-                models.ExternalListing.location.ilike(like),
-                models.ExternalListing.notes.ilike(like),
-                models.ExternalListing.source.ilike(like),
+                L.title.ilike(like),
+                L.url.ilike(like),
+                L.location.ilike(like),
+                L.notes.ilike(like),
+                L.source.ilike(like),
             )
         )
-    q = q.order_by(models.ExternalListing.created_at.desc())
-    total = q.count()
-    items = q.offset(skip).limit(limit).all()
-    return items, total
+    matched = q.with_entities(L.id).limit(EXTERNAL_LISTINGS_TOTAL_CAP + 1).subquery()
+    total = db.query(func.count()).select_from(matched).scalar() or 0
+
+    q = q.order_by(L.created_at.desc(), L.id.desc())
+    if after is not None:
+        q = q.filter(pagination.after([L.created_at, L.id], list(after)))
+    else:
+        q = q.offset(skip)
+    items = q.limit(limit).all()
+    return items, min(int(total), EXTERNAL_LISTINGS_TOTAL_CAP), int(total) > EXTERNAL_LISTINGS_TOTAL_CAP
 
 
 def get_external_listing(db: Session, listing_id):
@@ -281,6 +362,7 @@ def get_external_listing(db: Session, listing_id):
 
 
 def get_interest_counts(db: Session, listing_ids: list):
+    """Authoritative interest counts by aggregate; request paths read ExternalListing.interest_count."""
     if not listing_ids:
         return {}
     rows = (
@@ -304,81 +386,350 @@ def get_user_interests_map(db: Session, user_id: int, listing_ids: list):
     return {r[0] for r in rows}
 
 
-def add_interest(db: Session, listing_id, user_id: int) -> bool:
+def _interest_count(db: Session, listing_id) -> int:
+    count = db.query(models.ExternalListing.interest_count).filter(models.ExternalListing.id == listing_id).scalar()
+    return int(count or 0)
+
+
+def add_interest(db: Session, listing_id, user_id: int) -> int:
+    """Record interest and bump the listing's counter in one transaction; returns the new count."""
+    L = models.ExternalListing
     try:
-        row = models.ExternalListingInterest(listing_id=listing_id, user_id=user_id)
-        db.add(row)
-        db.commit()
-        return True
+        db.add(models.ExternalListingInterest(listing_id=listing_id, user_id=user_id))
+        db.flush()
     except IntegrityError:
+        # Already interested: nothing to count
         db.rollback()
-        return False
+        return _interest_count(db, listing_id)
+    count = db.execute(
+        update(L).where(L.id == listing_id).values(interest_count=L.interest_count + 1).returning(L.interest_count)
+    ).scalar()
+    db.commit()
+    return int(count or 0)
 
 
-def remove_interest(db: Session, listing_id, user_id: int) -> bool:
+def remove_interest(db: Session, listing_id, user_id: int) -> int:
+    """Drop interest and decrement the counter in the same transaction; returns the new count."""
+    L = models.ExternalListing
     deleted = (
         db.query(models.ExternalListingInterest)
         .filter(models.ExternalListingInterest.listing_id == listing_id)
         .filter(models.ExternalListingInterest.user_id == user_id)
         .delete()
     )
+    if not deleted:
+        db.commit()
+        return _interest_count(db, listing_id)
+    count = db.execute(
+        update(L).where(L.id == listing_id).values(interest_count=L.interest_count - 1).returning(L.interest_count)
+    ).scalar()
+    db.commit()
+    return int(count or 0)
+
+
+def reconcile_interest_counts(db: Session) -> int:
+    """Reset drifted ExternalListing.interest_count values from the interests table; returns rows fixed."""
+    L, I = models.ExternalListing, models.ExternalListingInterest
+    actual = select(func.count(I.id)).where(I.listing_id == L.id).scalar_subquery()
+    res = db.execute(
+        update(L).where(L.interest_count != actual).values(interest_count=actual).execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return int(res.rowcount or 0)
+
+
+def reconcile_comment_counts(db: Session) -> int:
+    """Reset drifted CommunityPost.comments_count values from the comments table; returns rows fixed."""
+    P, C = models.CommunityPost, models.CommunityComment
+    actual = select(func.count(C.id)).where(C.post_id == P.id).scalar_subquery()
+    res = db.execute(
+        update(P).where(P.comments_count != actual).values(comments_count=actual).execution_options(synchronize_session=False)
+    )
     db.commit()
-    return bool(deleted)
+    return int(res.rowcount or 0)
+
+
+# Users per user_activity_counts query
+USER_COUNTS_CHUNK = 1000
+
+
+def user_activity_counts(db: Session, user_ids: list[int]) -> dict[int, dict]:
+    """{user_id: {apartments_count, applications_count, jobs_count}} for `user_ids`.
+
+    One grouped query per USER_COUNTS_CHUNK ids, which keeps the IN lists within
+    bind-parameter limits when the whole directory is listed.
+    """
+    A, Ap, J = models.Apartment, models.Application, models.JobListing
+    kinds = ('apartments', 'applications', 'jobs')
+    out = {}
+    for start in range(0, len(user_ids), USER_COUNTS_CHUNK):
+        ids = user_ids[start:start + USER_COUNTS_CHUNK]
+        owned = union_all(
+            select(A.owner_id.label('user_id'), literal('apartments').label('kind')).where(A.owner_id.in_(ids)),
+            select(Ap.applicant_id, literal('applications')).where(Ap.applicant_id.in_(ids)),
+            select(J.created_by_user_id, literal('jobs')).where(J.created_by_user_id.in_(ids)),
+        ).subquery()
+        rows = db.execute(
+            select(owned.c.user_id, *[func.sum(case((owned.c.kind == k, 1), else_=0)).label(f'{k}_count') for k in kinds])
+            .group_by(owned.c.user_id)
+        ).all()
+        out.update({r.user_id: {f'{k}_count': int(getattr(r, f'{k}_count')) for k in kinds} for r in rows})
+    return out
+
+
+# moderation (pending events, jobs and resources)
+MODERATED_TYPES = {'event': models.CommunityEvent, 'job': models.JobListing, 'resource': models.ResourceItem}
+
+
+# Queue detail column -> the model attribute that fills it, per type (NULL elsewhere)
+_QUEUE_DETAIL_NAMES = ('location', 'starts_at', 'category', 'company', 'url')
+_QUEUE_DETAILS = {
+    'event': {'location': 'location', 'starts_at': 'starts_at'},
+    'job': {'location': 'location', 'company': 'company', 'url': 'apply_url'},
+    'resource': {'category': 'category', 'url': 'url'},
+}
+
+
+def _pending_arm(item_type: str, limit: int, after: list | None):
+    """Newest pending rows of one type, shaped for the merged queue (walks its partial index)."""
+    M, U = MODERATED_TYPES[item_type], models.User
+    own = _QUEUE_DETAILS[item_type]
+    cols = {name: getattr(M, own[name]) if name in own else cast(null(), String) for name in _QUEUE_DETAIL_NAMES}
+    stmt = (
+        select(
+            literal(item_type, String).label('type'), M.id, M.title, M.description,
+            *[c.label(name) for name, c in cols.items()],
+            M.created_by_user_id, U.full_name.label('created_by_name'), M.created_at,
+        )
+        .select_from(M)
+        .outerjoin(U, U.id == M.created_by_user_id)
+        .where(M.status == 'pending')
+    )
+    if after is not None:
+        # Queue order is (created_at, type, id) descending; `type` is a constant in this arm
+        created_at, cursor_type, cursor_id = after
+        if item_type < cursor_type:
+            stmt = stmt.where(M.created_at <= created_at)
+        elif item_type > cursor_type:
+            stmt = stmt.where(M.created_at < created_at)
+        else:
+            stmt = stmt.where(pagination.after([M.created_at, M.id], [created_at, cursor_id]))
+    return select(stmt.order_by(M.created_at.desc(), M.id.desc()).limit(limit).subquery())
+
+
+def moderation_queue(db: Session, types: list[str], limit: int = 50, after: list | None = None) -> list[dict]:
+    """Pending items of `types` merged newest first; `after` is the last row's (created_at, type, id).
+
+    Each type contributes at most `limit` rows from its own partial index before the merge.
+    """
+    if not types:
+        return []
+    merged = union_all(*[_pending_arm(t, limit, after) for t in sorted(types)]).subquery()
+    rows = db.execute(
+        select(merged).order_by(merged.c.created_at.desc(), merged.c.type.desc(), merged.c.id.desc()).limit(limit)
+    ).all()
+    return [dict(r._mapping) for r in rows]
+
+
+def apply_moderation_decisions(db: Session, decisions: list[tuple[str, int, str]]) -> list[tuple[str, int]]:
+    """Set status for many (type, id, 'approved'|'rejected') in one UPDATE per group.
+
+    Returns the (type, id) pairs that don't exist. Keeps search documents in step; caller commits.
+    """
+    groups: dict[tuple[str, str], set] = {}
+    for item_type, item_id, status in decisions:
+        groups.setdefault((item_type, status), set()).add(int(item_id))
+    missing, changed = [], {}
+    for (item_type, status), ids in groups.items():
+        M = MODERATED_TYPES[item_type]
+        done = set(db.execute(update(M).where(M.id.in_(ids)).values(status=status).returning(M.id)).scalars())
+        missing += [(item_type, i) for i in sorted(ids - done)]
+        changed.setdefault(item_type, set()).update(done)
+    searchable = [
+        obj for item_type, ids in changed.items() if ids and item_type in ('job', 'resource')
+        for obj in db.query(MODERATED_TYPES[item_type]).filter(MODERATED_TYPES[item_type].id.in_(ids)).populate_existing()
+    ]
+    search.index_many(db, searchable)
+    return missing
 
 
 def _user_phone_ready(u: models.User) -> bool:
     return bool(getattr(u, 'phone_number', None)) and bool(getattr(u, 'phone_verified', False))
 
 
-def create_contact_request(db: Session, requester_user_id: int, target_user_id: int, listing_id):
+def _insert_ignoring_conflicts(db: Session, model, values: dict, index_elements: list[str]):
+    """INSERT ... ON CONFLICT DO NOTHING RETURNING the row (None when it already existed)."""
+    dialect = postgresql if db.get_bind().dialect.name == 'postgresql' else sqlite
+    stmt = dialect.insert(model).values(**values).on_conflict_do_nothing(index_elements=index_elements).returning(model)
+    return db.execute(stmt).scalar()
+
+
+# saved items (jobs board and resources directory bookmarks)
+SAVED_ITEM_TYPES = {'job': models.JobListing, 'resource': models.ResourceItem}
+
+_JOB_FIELDS = ('id', 'created_by_user_id', 'title', 'company', 'location', 'description', 'apply_url', 'salary', 'salary_min', 'salary_max', 'salary_period', 'status', 'created_at')
+_RESOURCE_FIELDS = ('id', 'created_by_user_id', 'title', 'category', 'description', 'url', 'status', 'created_at')
+
+
+def _saveable_ids(db: Session, item_type: str, ids: set, user_id: int) -> set:
+    """The subset of `ids` that exist and are approved or the user's own."""
+    M = SAVED_ITEM_TYPES[item_type]
+    rows = db.query(M.id).filter(M.id.in_(ids), or_(M.status == 'approved', M.created_by_user_id == user_id)).all()
+    return {r[0] for r in rows}
+
+
+def save_items(db: Session, user_id: int, items: list[tuple[str, int]]) -> tuple[int, list[tuple[str, int]]]:
+    """Save many (type, id) pairs with one INSERT (caller commits).
+
+    Returns (rows inserted, pairs that can't be saved). Already-saved pairs are
+    not an error and are not counted.
+    """
+    wanted: dict[str, set] = {}
+    for item_type, item_id in items:
+        wanted.setdefault(item_type, set()).add(int(item_id))
+    rows, skipped = [], []
+    now = datetime.utcnow().isoformat()
+    for item_type, ids in wanted.items():
+        ok = _saveable_ids(db, item_type, ids, user_id)
+        rows += [{'user_id': user_id, 'item_type': item_type, 'item_id': i, 'created_at': now} for i in sorted(ok)]
+        skipped += [(item_type, i) for i in sorted(ids - ok)]
+    return _insert_saves(db, rows), skipped
+
+
+def save_item(db: Session, user_id: int, item_type: str, item_id: int) -> None:
+    """Save one item the caller already checked is visible; idempotent (caller commits)."""
+    _insert_saves(db, [{'user_id': user_id, 'item_type': item_type, 'item_id': int(item_id), 'created_at': datetime.utcnow().isoformat()}])
+
+
+def _insert_saves(db: Session, rows: list[dict]) -> int:
+    """Insert save rows, skipping ones that already exist; returns how many were inserted."""
+    if not rows:
+        return 0
+    S = models.SavedItem
+    dialect = postgresql if db.get_bind().dialect.name == 'postgresql' else sqlite
+    stmt = dialect.insert(S).values(rows).on_conflict_do_nothing(index_elements=['user_id', 'item_type', 'item_id'])
+    return len(db.execute(stmt.returning(S.id)).all())
+
+
+def unsave_items(db: Session, user_id: int, items: list[tuple[str, int]]) -> int:
+    """Remove many (type, id) pairs with one DELETE; returns rows removed (caller commits)."""
+    wanted: dict[str, set] = {}
+    for item_type, item_id in items:
+        wanted.setdefault(item_type, set()).add(int(item_id))
+    if not wanted:
+        return 0
+    S = models.SavedItem
+    return db.query(S).filter(
+        S.user_id == user_id,
+        or_(*[(S.item_type == t) & S.item_id.in_(ids) for t, ids in wanted.items()]),
+    ).delete(synchronize_session=False)
+
+
+def delete_saves_of(db: Session, item_type: str, item_ids) -> None:
+    """Drop everyone's saves of the given items (a list or a select of ids); caller commits."""
+    S = models.SavedItem
+    db.query(S).filter(S.item_type == item_type, S.item_id.in_(item_ids)).delete(synchronize_session=False)
+
+
+def list_saved_items(db: Session, user_id: int, item_type: str | None = None, limit: int | None = None, after: tuple | None = None) -> list[dict]:
+    """A user's saves, newest first, each with its job or resource and author name in one query.
+
+    Returns dicts {type, id, saved_at, save_id, job, resource}; exactly one of job/resource is set.
+    `after` is the (saved_at, save_id) of the previous page's last row.
+    """
+    S, J, R, U = models.SavedItem, models.JobListing, models.ResourceItem, models.User
+    job_cols = [getattr(J, f).label(f'job_{f}') for f in _JOB_FIELDS]
+    resource_cols = [getattr(R, f).label(f'resource_{f}') for f in _RESOURCE_FIELDS]
+    q = (
+        db.query(S.id, S.item_type, S.item_id, S.created_at, U.full_name, *job_cols, *resource_cols)
+        .outerjoin(J, and_(S.item_type == 'job', J.id == S.item_id))
+        .outerjoin(R, and_(S.item_type == 'resource', R.id == S.item_id))
+        .outerjoin(U, U.id == func.coalesce(J.created_by_user_id, R.created_by_user_id))
+        .filter(S.user_id == user_id)
+        # Saves whose item is gone (deleted outside the API) are hidden
+        .filter(or_(J.id.isnot(None), R.id.isnot(None)))
+    )
+    if item_type is not None:
+        q = q.filter(S.item_type == item_type)
+    if after is not None:
+        q = q.filter(pagination.after([S.created_at, S.id], list(after)))
+    q = q.order_by(S.created_at.desc(), S.id.desc())
+    if limit is not None:
+        q = q.limit(limit)
+
+    out = []
+    for r in q.all():
+        m = r._mapping
+        job = resource = None
+        if r.item_type == 'job':
+            job = {f: m[f'job_{f}'] for f in _JOB_FIELDS}
+            job.update(created_by_name=r.full_name, is_saved=True)
+        else:
+            resource = {f: m[f'resource_{f}'] for f in _RESOURCE_FIELDS}
+            resource.update(created_by_name=r.full_name, is_saved=True)
+        out.append({'type': r.item_type, 'id': r.item_id, 'saved_at': r.created_at, 'save_id': r.id, 'job': job, 'resource': resource})
+    return out
+
+
+def create_contact_request(db: Session, requester_user_id: int, target_user_id: int, listing_id, requester: models.User | None = None):
+    """Create (or return the existing) pending request; a constant number of round trips.
+
+    Pass `requester` when the caller already loaded it (the current user) to skip that lookup.
+    Duplicates are resolved by the unique (requester, target, listing) index, not a pre-check.
+    """
     if requester_user_id == target_user_id:
         raise ValueError('Cannot request contact with yourself')
 
-    requester = db.query(models.User).filter(models.User.id == requester_user_id).first()
-    target = db.query(models.User).filter(models.User.id == target_user_id).first()
-    if not requester or not target:
+    if requester is None or requester.id != requester_user_id:
+        requester = db.query(models.User).filter(models.User.id == requester_user_id).first()
+    # The listing and its creator in one query; only the creator can be the target
+    row = (
+        db.query(models.ExternalListing.created_by_user_id, models.User.phone_number, models.User.phone_verified)
+        .outerjoin(models.User, models.User.id == models.ExternalListing.created_by_user_id)
+        .filter(models.ExternalListing.id == listing_id)
+        .first()
+    )
+    if not requester:
         raise ValueError('User not found')
-
-    if not _user_phone_ready(requester) or not _user_phone_ready(target):
-        raise PermissionError('Both users must have a verified phone number')
-
-    listing = get_external_listing(db, listing_id)
-    if not listing:
+    if not row:
         raise ValueError('Listing not found')
-    if listing.created_by_user_id != target_user_id:
+    if row.created_by_user_id != target_user_id:
         # keep it tight: contact exchange is only with the user who posted the listing
         raise PermissionError('Target user must be the listing creator')
+    if not _user_phone_ready(requester) or not (row.phone_number and row.phone_verified):
+        raise PermissionError('Both users must have a verified phone number')
 
-    existing = (
-        db.query(models.ContactRequest)
-        .filter(models.ContactRequest.requester_user_id == requester_user_id)
-        .filter(models.ContactRequest.target_user_id == target_user_id)
-        .filter(models.ContactRequest.listing_id == listing_id)
-        .first()
-    )
-    if existing:
-        return existing
-
-    cr = models.ContactRequest(
-        requester_user_id=requester_user_id,
-        target_user_id=target_user_id,
-        listing_id=listing_id,
-        status='pending',
-    )
-    db.add(cr)
+    keys = {'requester_user_id': requester_user_id, 'target_user_id': target_user_id, 'listing_id': listing_id}
+    cr = _insert_ignoring_conflicts(db, models.ContactRequest, {**keys, 'status': 'pending'}, list(keys))
+    if cr is None:
+        cr = db.query(models.ContactRequest).filter_by(**keys).one()
     db.commit()
-    db.refresh(cr)
     return cr
 
 
-def list_incoming_contact_requests(db: Session, user_id: int):
-    return (
-        db.query(models.ContactRequest)
-        .filter(models.ContactRequest.target_user_id == user_id)
-        .filter(models.ContactRequest.status == 'pending')
-        .order_by(models.ContactRequest.created_at.desc())
-        .all()
+def list_incoming_contact_requests(db: Session, user_id: int, limit: int | None = 50, after: tuple | None = None):
+    """Pending requests to `user_id`, newest first, with requester and listing joined in.
+
+    `after` is the (created_at, id) of the previous page's last row; `limit=None` returns them all.
+    """
+    CR, L = models.ContactRequest, models.ExternalListing
+    q = (
+        db.query(
+            CR.id, CR.requester_user_id, CR.target_user_id, CR.listing_id, CR.status, CR.created_at,
+            models.User.full_name.label('requester_name'), models.User.email.label('requester_email'),
+            L.title.label('listing_title'), L.url.label('listing_url'),
+        )
+        .outerjoin(models.User, models.User.id == CR.requester_user_id)
+        .outerjoin(L, L.id == CR.listing_id)
+        .filter(CR.target_user_id == user_id)
+        .filter(CR.status == 'pending')
     )
+    if after is not None:
+        q = q.filter(pagination.after([CR.created_at, CR.id], list(after)))
+    q = q.order_by(CR.created_at.desc(), CR.id.desc())
+    if limit is not None:
+        q = q.limit(limit)
+    return q.all()
 
 
 def accept_contact_request(db: Session, request_id, current_user_id: int):
@@ -1,14 +1,115 @@
+import time
+import hashlib
+import threading
+from fastapi import Request, Response
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from .config import DATABASE_URL
+from .config import DATABASE_URL, DATABASE_READ_URL, READ_AFTER_WRITE_SECONDS
 
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Replica pool for read-only endpoints. Falls back to the primary when not configured.
+read_engine = create_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if DATABASE_READ_URL else SessionLocal
+
+
+# Read-your-writes marker: a successful write sets this cookie (unix time until which the
+# client reads from the primary), so stickiness holds whichever worker or instance serves
+# the next read. The in-process tracker below covers clients that don't send cookies, but
+# only for reads that land on the same worker.
+READ_PRIMARY_COOKIE = 'read_primary_until'
+
+
+class _ReadAfterWriteTracker:
+    """Remembers which clients wrote recently (in this process) so their reads skip the replica."""
+
+    def __init__(self, window_seconds: int):
+        self._window = float(window_seconds)
+        self._until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, key: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._until[key] = now + self._window
+            # best-effort cleanup so the map stays bounded by recent writers
+            if len(self._until) > 10_000:
+                for k in [k for k, t in self._until.items() if t < now]:
+                    self._until.pop(k, None)
+
+    def is_sticky(self, key: str) -> bool:
+        with self._lock:
+            until = self._until.get(key)
+            if until is None:
+                return False
+            if until < time.time():
+                self._until.pop(key, None)
+                return False
+            return True
+
+
+_read_after_write = _ReadAfterWriteTracker(READ_AFTER_WRITE_SECONDS)
+
+
+def _client_key(request: Request) -> str:
+    # Prefer the bearer token (one per user session); fall back to the client address.
+    raw = request.headers.get('authorization') or ''
+    if not raw:
+        xff = request.headers.get('x-forwarded-for')
+        if xff:
+            raw = 'ip:' + xff.split(',')[0].strip()
+        elif request.client and request.client.host:
+            raw = 'ip:' + request.client.host
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest() if raw else ''
+
+
+def mark_write(request: Request, response: Response) -> None:
+    if not DATABASE_READ_URL:
+        return
+    key = _client_key(request)
+    if key:
+        _read_after_write.mark(key)
+    secure = request.url.scheme == 'https' or request.headers.get('x-forwarded-proto') == 'https'
+    response.set_cookie(
+        READ_PRIMARY_COOKIE, str(int(time.time() + READ_AFTER_WRITE_SECONDS)), max_age=READ_AFTER_WRITE_SECONDS,
+        # The frontend may be served from another site than the API
+        httponly=True, secure=secure, samesite='none' if secure else 'lax',
+    )
+
+
+def _reads_primary(request: Request) -> bool:
+    try:
+        if float(request.cookies.get(READ_PRIMARY_COOKIE) or 0) > time.time():
+            return True
+    except ValueError:
+        pass
+    key = _client_key(request)
+    return bool(key) and _read_after_write.is_sticky(key)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request):
+    """Session for read-only endpoints.
+
+    Uses the replica when DATABASE_READ_URL is set, except for clients that wrote
+    within the last READ_AFTER_WRITE_SECONDS (they read from the primary so they
+    see their own changes despite replica lag).
+    """
+
+    factory = ReadSessionLocal
+    if DATABASE_READ_URL and _reads_primary(request):
+        factory = SessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,51 @@
+import time
+import threading
+from collections import defaultdict, deque
+from fastapi import HTTPException, Request
+
+
+class _SlidingWindowRateLimiter:
+    def __init__(self):
+        self._events: dict[str, deque[float]] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, *, limit: int, window_seconds: int) -> tuple[bool, int | None]:
+        now = time.time()
+        cutoff = now - float(window_seconds)
+
+        with self._lock:
+            dq = self._events[key]
+            while dq and dq[0] < cutoff:
+                dq.popleft()
+            if len(dq) >= int(limit):
+                # Retry when the oldest event falls out of window
+                retry_after = int((dq[0] + float(window_seconds)) - now) + 1
+                # best-effort cleanup
+                if not dq:
+                    self._events.pop(key, None)
+                return False, max(1, retry_after)
+            dq.append(now)
+            return True, None
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._events.pop(key, None)
+
+
+rate_limiter = _SlidingWindowRateLimiter()
+
+
+def get_client_ip(request: Request) -> str:
+    # Works behind common proxies/load balancers.
+    xff = request.headers.get('x-forwarded-for')
+    if xff:
+        # first IP in the list is the original client
+        return xff.split(',')[0].strip()
+    if request.client and request.client.host:
+        return request.client.host
+    return 'unknown'
+
+
+def require_admin(current_user):
+    if not getattr(current_user, 'is_admin', False):
+        raise HTTPException(status_code=403, detail='Not authorized')
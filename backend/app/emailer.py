@@ -1,5 +1,4 @@
 import os
-import resend
 
 
 def _send_via_resend(to_email: str, subject: str, text: str, html: str | None = None) -> bool:
@@ -14,6 +13,9 @@ def _send_via_resend(to_email: str, subject: str, text: str, html: str | None =
         print("[email] RESEND_FROM is not set")
         return False
 
+    # Imported lazily so the SDK is only loaded once an email is actually sent
+    import resend
+
     resend.api_key = api_key
 
     params: dict = {
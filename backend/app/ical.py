@@ -0,0 +1,76 @@
+"""Minimal iCalendar (RFC 5545) writer for the community events feed."""
+
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+PRODID = '-//Soldier Housing//Community Events//EN'
+UID_DOMAIN = 'soldier-housing'
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n')
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold to 75-octet lines (continuations start with a space), without splitting UTF-8 sequences."""
+
+    raw = line.encode('utf-8')
+    if len(raw) <= 75:
+        return line + '\r\n'
+    parts, start, limit = [], 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(raw[start:end].decode('utf-8'))
+        start, limit = end, 74
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _format_dt(value: str) -> str | None:
+    """ISO-8601 → iCal DATE-TIME: UTC with Z when the offset is known, else floating local time."""
+
+    try:
+        dt = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    if dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    return dt.strftime('%Y%m%dT%H%M%S')
+
+
+def iter_calendar(events: Iterable, *, name: str) -> Iterator[str]:
+    """Yield the calendar in chunks (one per event) so it can be streamed.
+
+    `events` rows need id, title, description, location, starts_at, status, created_at.
+    Rows whose starts_at can't be parsed are skipped.
+    """
+
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    yield ''.join(_fold(line) for line in (
+        'BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODID}', 'CALSCALE:GREGORIAN', 'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(name)}',
+    ))
+    for ev in events:
+        start = _format_dt(ev.starts_at or '')
+        if start is None:
+            continue
+        lines = [
+            'BEGIN:VEVENT',
+            f'UID:event-{ev.id}@{UID_DOMAIN}',
+            f'DTSTAMP:{stamp}',
+            f'DTSTART:{start}',
+            f'SUMMARY:{_escape(ev.title or "")}',
+            # Own pending events are included for their creator
+            'STATUS:' + ('CONFIRMED' if ev.status == 'approved' else 'TENTATIVE'),
+        ]
+        if ev.description:
+            lines.append(f'DESCRIPTION:{_escape(ev.description)}')
+        if ev.location:
+            lines.append(f'LOCATION:{_escape(ev.location)}')
+        lines.append('END:VEVENT')
+        yield ''.join(_fold(line) for line in lines)
+    yield 'END:VCALENDAR\r\n'
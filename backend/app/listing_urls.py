@@ -0,0 +1,73 @@
+"""Canonical URLs for external listings.
+
+The same yad2/facebook post gets pasted with different tracking parameters,
+mobile hosts and fragments. `canonicalize_url` reduces a link to the parts that
+identify the post, and `url_hash` is what the unique index on
+external_listings.url_hash stores.
+"""
+
+import re
+import hashlib
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+# Query parameters that never identify content
+_TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'mibextid', 'ref', 'refid', 'ref_type', 'rdid', 'share_url', 'sfnsn',
+    'component', 'opened-from', 'spot_id', 'from_ad', 'hp', '_ga', 'igshid', 'si',
+}
+_TRACKING_PREFIXES = ('utm_', '__cft__', '__tn__', 'mc_')
+
+_YAD2_ITEM = re.compile(r'/item/([A-Za-z0-9]+)')
+_FACEBOOK_PATHS = (
+    re.compile(r'^/groups/[^/]+/(?:posts|permalink)/\d+'),
+    re.compile(r'^/marketplace/item/\d+'),
+    re.compile(r'^/[^/]+/posts/[^/]+'),
+)
+# facebook's legacy permalink pages identify the post by query string
+_FACEBOOK_QUERY_KEYS = {'/permalink.php': ('story_fbid', 'id'), '/story.php': ('story_fbid', 'id')}
+
+
+def _host(netloc: str) -> str:
+    host = netloc.lower().rsplit('@', 1)[-1].split(':', 1)[0]
+    for prefix in ('www.', 'm.', 'mobile.', 'web.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return host
+
+
+def canonicalize_url(url: str) -> str:
+    """Host-aware canonical form of a listing URL (scheme-less, no tracking noise)."""
+
+    raw = (url or '').strip()
+    if '://' not in raw:
+        raw = 'https://' + raw
+    parts = urlsplit(raw)
+    host = _host(parts.netloc)
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+
+    if host.endswith('yad2.co.il'):
+        m = _YAD2_ITEM.search(path)
+        if m:
+            return f'yad2.co.il/item/{m.group(1)}'
+    if host in ('facebook.com', 'fb.com'):
+        keys = _FACEBOOK_QUERY_KEYS.get(path.rstrip('/'))
+        if keys:
+            q = dict(parse_qsl(parts.query))
+            return 'facebook.com' + path.rstrip('/') + '?' + urlencode([(k, q.get(k, '')) for k in keys])
+        for pattern in _FACEBOOK_PATHS:
+            m = pattern.match(path)
+            if m:
+                return 'facebook.com' + m.group(0)
+
+    params = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith(_TRACKING_PREFIXES)
+    )
+    out = host + (path.rstrip('/') or '')
+    if params:
+        out += '?' + urlencode(params)
+    return out
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha256(canonicalize_url(url).encode('utf-8')).hexdigest()
@@ -0,0 +1,71 @@
+"""Periodic maintenance jobs, run from cron (or a scheduled Railway service):
+
+    python -m app.maintenance reconcile-interests   # repair ExternalListing.interest_count
+    python -m app.maintenance reconcile-comments    # repair CommunityPost.comments_count
+    python -m app.maintenance rebuild-search        # regenerate search_documents
+    python -m app.maintenance run-user-deletions    # resume queued/interrupted account deletions
+    python -m app.maintenance run-cleans            # resume queued/interrupted /admin/clean purges
+
+Jobs are idempotent and safe to run while the API is serving traffic.
+"""
+
+import sys
+import time
+from . import crud, search, purge, user_deletion
+from .database import SessionLocal
+
+
+def reconcile_interests() -> int:
+    db = SessionLocal()
+    try:
+        return crud.reconcile_interest_counts(db)
+    finally:
+        db.close()
+
+
+def reconcile_comments() -> int:
+    db = SessionLocal()
+    try:
+        return crud.reconcile_comment_counts(db)
+    finally:
+        db.close()
+
+
+def rebuild_search() -> int:
+    db = SessionLocal()
+    try:
+        return search.rebuild(db)
+    finally:
+        db.close()
+
+
+def run_user_deletions() -> int:
+    return user_deletion.run_pending()
+
+
+
+def run_cleans() -> int:
+    return purge.run_pending_cleans()
+
+
+_JOBS = {
+    'reconcile-interests': reconcile_interests,
+    'reconcile-comments': reconcile_comments,
+    'rebuild-search': rebuild_search,
+    'run-user-deletions': run_user_deletions,
+    'run-cleans': run_cleans,
+}
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) != 1 or argv[0] not in _JOBS:
+        print(f"usage: python -m app.maintenance {{{'|'.join(_JOBS)}}}", file=sys.stderr)
+        return 2
+    started = time.perf_counter()
+    rows = _JOBS[argv[0]]()
+    print(f'[maintenance] {argv[0]}: {rows} rows written in {time.perf_counter() - started:.1f}s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
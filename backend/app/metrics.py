@@ -0,0 +1,178 @@
+"""In-process request and DB metrics with Prometheus text exposition.
+
+Kept dependency-free (no prometheus_client) so it is always on. Metrics are per
+worker process; scrape each worker or run a single worker per container.
+
+- `http_request_duration_seconds` histogram, by method + route template
+- `http_requests_total` counter, by method + route + status
+- `http_requests_in_flight` gauge, by method + route
+- `db_statements_per_request` / `db_time_per_request_seconds` histograms, by method + route
+- `db_statements_total` counter (all statements, including ones outside requests)
+
+SQL statements are attributed to the current request through a context variable,
+so N+1 patterns show up as a per-route statement count that grows with page size.
+"""
+
+import time
+import threading
+import contextvars
+from bisect import bisect_left
+from sqlalchemy import event
+from starlette.routing import Match
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233)
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _RequestStats:
+    __slots__ = ('statements', 'db_seconds')
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+_current: contextvars.ContextVar['_RequestStats | None'] = contextvars.ContextVar('request_db_stats', default=None)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: dict[tuple, _Histogram] = {}
+        self._statements: dict[tuple, _Histogram] = {}
+        self._db_time: dict[tuple, _Histogram] = {}
+        self._requests: dict[tuple, int] = {}
+        self._in_flight: dict[tuple, int] = {}
+        self._db_statements_total = 0
+
+    # request lifecycle -------------------------------------------------
+
+    def request_started(self, method: str, route: str) -> None:
+        with self._lock:
+            key = (method, route)
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+
+    def request_finished(self, method: str, route: str, status: int, seconds: float, stats: _RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            self._in_flight[key] = max(0, self._in_flight.get(key, 1) - 1)
+            ckey = (method, route, str(status))
+            self._requests[ckey] = self._requests.get(ckey, 0) + 1
+            self._latency.setdefault(key, _Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self._statements.setdefault(key, _Histogram(STATEMENT_BUCKETS)).observe(stats.statements)
+            self._db_time.setdefault(key, _Histogram(LATENCY_BUCKETS)).observe(stats.db_seconds)
+
+    def statement_executed(self) -> None:
+        with self._lock:
+            self._db_statements_total += 1
+
+    # exposition --------------------------------------------------------
+
+    def render(self) -> str:
+        with self._lock:
+            lines: list[str] = []
+            self._render_histograms(lines, 'http_request_duration_seconds', 'Request latency by route.', self._latency)
+            lines.append('# HELP http_requests_total Requests by route and status.')
+            lines.append('# TYPE http_requests_total counter')
+            for (method, route, status), v in sorted(self._requests.items()):
+                lines.append(f'http_requests_total{{{_labels(method=method, route=route, status=status)}}} {v}')
+            lines.append('# HELP http_requests_in_flight Requests currently being served.')
+            lines.append('# TYPE http_requests_in_flight gauge')
+            for (method, route), v in sorted(self._in_flight.items()):
+                lines.append(f'http_requests_in_flight{{{_labels(method=method, route=route)}}} {v}')
+            self._render_histograms(lines, 'db_statements_per_request', 'SQL statements issued per request.', self._statements)
+            self._render_histograms(lines, 'db_time_per_request_seconds', 'Time spent in SQL per request.', self._db_time)
+            lines.append('# HELP db_statements_total SQL statements executed by this process.')
+            lines.append('# TYPE db_statements_total counter')
+            lines.append(f'db_statements_total {self._db_statements_total}')
+            return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _render_histograms(lines: list[str], name: str, help_text: str, series: dict) -> None:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (method, route), h in sorted(series.items()):
+            base = _labels(method=method, route=route)
+            cumulative = 0
+            for bound, c in zip(h.buckets, h.counts):
+                cumulative += c
+                lines.append(f'{name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{base},le="+Inf"}} {h.count}')
+            lines.append(f'{name}_sum{{{base}}} {h.sum}')
+            lines.append(f'{name}_count{{{base}}} {h.count}')
+
+
+def _labels(**kv) -> str:
+    return ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in kv.items())
+
+
+registry = MetricsRegistry()
+
+
+# -----------------------------
+# Request scope
+# -----------------------------
+
+
+def begin_request() -> tuple[_RequestStats, contextvars.Token]:
+    stats = _RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token: contextvars.Token) -> None:
+    _current.reset(token)
+
+
+def current_request_stats() -> '_RequestStats | None':
+    return _current.get()
+
+
+def route_label(app, scope: dict) -> str:
+    """Route template for the request (bounded label cardinality), resolved before routing runs."""
+
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, 'path', None) or 'unmatched'
+    return 'unmatched'
+
+
+# -----------------------------
+# SQLAlchemy hooks
+# -----------------------------
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Statements on one connection run sequentially, so a single slot is enough
+    conn.info['_metrics_started'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('_metrics_started', None)
+    elapsed = (time.perf_counter() - started) if started is not None else 0.0
+    registry.statement_executed()
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
@@ -0,0 +1,231 @@
+"""HTTP-level middleware: response compression and ETag revalidation.
+
+Both are plain ASGI middleware (not `@app.middleware("http")`) so they can
+rewrite streamed bodies without buffering whole responses in BaseHTTPMiddleware.
+
+- ETagMiddleware hashes the uncompressed body of single-chunk 200 responses to
+  GET requests and answers a matching If-None-Match with 304 and no body.
+- CompressionMiddleware negotiates brotli (when the optional `brotli` package
+  is installed) or gzip from Accept-Encoding, for compressible content types at
+  or above a size threshold. Streamed responses are compressed incrementally.
+
+The ETag is computed before compression and sent as a weak validator, so it is
+the same whichever encoding the client receives.
+"""
+
+import zlib
+import hashlib
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    # Optional dependency; without it only gzip is offered.
+    import brotli  # type: ignore
+except Exception:  # pragma: no cover - depends on environment
+    brotli = None
+
+GZIP_LEVEL = 6
+# Dynamic responses: quality 4 is close to gzip -6 in speed with smaller output.
+BROTLI_QUALITY = 4
+
+_COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'application/xml')
+
+
+def _header(message: Message, name: bytes) -> bytes | None:
+    for k, v in message.get('headers', []):
+        if k.lower() == name:
+            return v
+    return None
+
+
+# -----------------------------
+# ETag / If-None-Match
+# -----------------------------
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == '*':
+        return True
+    # Weak comparison (RFC 9110 13.1.2): ignore the W/ prefix on both sides
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class ETagMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get('if-none-match')
+        start: Message | None = None
+        passthrough = False
+
+        async def send_with_etag(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message['type'] == 'http.response.start':
+                if message['status'] != 200 or _header(message, b'etag') is not None:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            body = message.get('body', b'')
+            if message.get('more_body', False):
+                # Streamed response: don't buffer it just to hash it
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            etag = 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+            headers = MutableHeaders(raw=start['headers'])
+            headers['ETag'] = etag
+            if if_none_match and _etag_matches(if_none_match, etag):
+                for name in ('content-length', 'content-type', 'content-encoding'):
+                    if name in headers:
+                        del headers[name]
+                await send({'type': 'http.response.start', 'status': 304, 'headers': headers.raw})
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+
+# -----------------------------
+# Compression
+# -----------------------------
+
+class _Gzip:
+    name = 'gzip'
+
+    def __init__(self) -> None:
+        # wbits=31 writes a gzip header/trailer instead of a raw zlib stream
+        self._c = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data) + self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._c.flush()
+
+
+class _Brotli:
+    name = 'br'
+
+    def __init__(self) -> None:
+        self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data) + self._c.flush()
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+_CODECS = {'br': _Brotli, 'gzip': _Gzip}
+
+
+def available_encodings(requested: list[str]) -> list[str]:
+    """Filter the configured encodings down to the ones this process can produce."""
+
+    return [e for e in requested if e in _CODECS and (e != 'br' or brotli is not None)]
+
+
+def _negotiate(accept_encoding: str, encodings: list[str]) -> str | None:
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for enc in encodings:  # server preference order
+        if accepted.get(enc, accepted.get('*', 0.0)) > 0:
+            return enc
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, *, encodings: list[str], minimum_size: int = 1024) -> None:
+        self.app = app
+        self.encodings = available_encodings(encodings)
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = _negotiate(Headers(scope=scope).get('accept-encoding', ''), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        codec = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, codec, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message['type'] == 'http.response.start':
+                content_type = (_header(message, b'content-type') or b'').decode('latin-1')
+                if _header(message, b'content-encoding') is not None or not content_type.startswith(_COMPRESSIBLE_TYPES):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            headers = MutableHeaders(raw=start['headers']) if start is not None else None
+
+            if codec is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    headers.add_vary_header('Accept-Encoding')
+                    await send(start)
+                    await send(message)
+                    return
+                codec = _CODECS[encoding]()
+                headers['Content-Encoding'] = encoding
+                headers.add_vary_header('Accept-Encoding')
+                if more_body:
+                    if 'content-length' in headers:
+                        del headers['content-length']
+                    await send(start)
+                    await send({'type': 'http.response.body', 'body': codec.compress(body), 'more_body': True})
+                    return
+                data = codec.compress(body) + codec.finish()
+                headers['Content-Length'] = str(len(data))
+                await send(start)
+                await send({'type': 'http.response.body', 'body': data})
+                return
+
+            data = codec.compress(body)
+            if not more_body:
+                data += codec.finish()
+            await send({'type': 'http.response.body', 'body': data, 'more_body': more_body})
+
+        await self.app(scope, receive, send_compressed)
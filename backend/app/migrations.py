@@ -0,0 +1,494 @@
+"""Versioned schema migrations.
+
+Run once per deploy, before starting the API:
+
+    python -m app.migrations upgrade   # apply pending migrations + bootstrap admin
+    python -m app.migrations status    # show stored vs. latest version
+
+The API itself only compares the stored version on boot (see `check_schema_version`).
+Migrations marked `concurrent` run outside a transaction so index builds can use
+CREATE INDEX CONCURRENTLY without blocking writes; their statements must be
+idempotent (IF NOT EXISTS) so an interrupted run can simply be repeated.
+"""
+
+import sys
+import uuid
+from datetime import datetime
+from sqlalchemy import text, inspect, MetaData, Table, Column, Integer, String, Text, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.engine import Connection, Engine
+from . import models, crud, config, schema_baseline
+from .database import engine as default_engine, SessionLocal
+
+# Arbitrary constant; serialises concurrent `upgrade` runs on Postgres.
+_ADVISORY_LOCK_ID = 727_001
+
+_MIGRATIONS: list[dict] = []
+
+
+def migration(version: int, name: str, *, concurrent: bool = False):
+    def register(fn):
+        _MIGRATIONS.append({'version': version, 'name': name, 'concurrent': concurrent, 'fn': fn})
+        _MIGRATIONS.sort(key=lambda m: m['version'])
+        return fn
+    return register
+
+
+def latest_version() -> int:
+    return _MIGRATIONS[-1]['version'] if _MIGRATIONS else 0
+
+
+def _is_postgres(conn: Connection) -> bool:
+    return conn.dialect.name == 'postgresql'
+
+
+def create_index(conn: Connection, name: str, table: str, columns: str, *, unique: bool = False, using: str | None = None, where: str | None = None) -> None:
+    """Create an index if missing; CONCURRENTLY on Postgres (caller must be in autocommit)."""
+
+    pg = _is_postgres(conn)
+    sql = 'CREATE {unique}INDEX {concurrently}IF NOT EXISTS {name} ON {table} {using}({columns}){where}'.format(
+        unique='UNIQUE ' if unique else '',
+        concurrently='CONCURRENTLY ' if pg else '',
+        name=name,
+        table=table,
+        using=f'USING {using} ' if (using and pg) else '',
+        columns=columns,
+        where=f' WHERE {where}' if where else '',
+    )
+    if pg:
+        # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would skip.
+        conn.execute(text(
+            "DO $$ BEGIN "
+            "IF EXISTS (SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            f"WHERE c.relname = '{name}' AND NOT i.indisvalid) THEN "
+            f"EXECUTE 'DROP INDEX {name}'; END IF; END $$"
+        ))
+    conn.execute(text(sql))
+
+
+def add_column(conn: Connection, table: str, column: str, ddl: str) -> None:
+    """Add a column if missing (SQLite has no ADD COLUMN IF NOT EXISTS)."""
+
+    if column in {c['name'] for c in inspect(conn).get_columns(table)}:
+        return
+    conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+
+
+# -----------------------------
+# Migrations (append only; never edit a released one)
+# -----------------------------
+
+
+@migration(1, 'baseline')
+def _baseline(conn: Connection):
+    # Frozen snapshot, not the live models: later objects come from their own migrations
+    schema_baseline.metadata.create_all(bind=conn)
+    if not _is_postgres(conn):
+        return
+    # Columns added to pre-existing tables before migrations were versioned
+    for stmt in (
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS phone VARCHAR",
+        "ALTER TABLE applications ADD COLUMN IF NOT EXISTS status VARCHAR DEFAULT 'pending'",
+        "ALTER TABLE apartments ADD COLUMN IF NOT EXISTS listing_type VARCHAR DEFAULT 'offer'",
+        "ALTER TABLE apartments ADD COLUMN IF NOT EXISTS gender VARCHAR",
+        "ALTER TABLE apartments ADD COLUMN IF NOT EXISTS shomer_shabbos BOOLEAN DEFAULT FALSE",
+        "ALTER TABLE apartments ADD COLUMN IF NOT EXISTS shomer_kashrut BOOLEAN DEFAULT FALSE",
+        "ALTER TABLE apartments ADD COLUMN IF NOT EXISTS opposite_gender_allowed BOOLEAN DEFAULT FALSE",
+        "ALTER TABLE apartments ADD COLUMN IF NOT EXISTS smoking_allowed BOOLEAN DEFAULT FALSE",
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS reset_code_hash VARCHAR",
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS reset_code_expires_at BIGINT",
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS phone_number VARCHAR",
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS phone_verified BOOLEAN DEFAULT FALSE",
+    ):
+        conn.execute(text(stmt))
+
+
+@migration(2, 'foreign key indexes', concurrent=True)
+def _fk_indexes(conn: Connection):
+    # Same names create_all uses, so fresh databases already have them.
+    create_index(conn, 'ix_apartments_owner_id', 'apartments', 'owner_id')
+    create_index(conn, 'ix_applications_applicant_id', 'applications', 'applicant_id')
+    create_index(conn, 'ix_applications_apartment_id', 'applications', 'apartment_id')
+    create_index(conn, 'ix_external_listing_interests_listing_id', 'external_listing_interests', 'listing_id')
+    create_index(conn, 'ix_contact_requests_target_user_id', 'contact_requests', 'target_user_id')
+    create_index(conn, 'ix_community_comments_post_id', 'community_comments', 'post_id')
+    create_index(conn, 'ix_resource_saves_user_id', 'resource_saves', 'user_id')
+    create_index(conn, 'ix_job_saves_user_id', 'job_saves', 'user_id')
+    create_index(conn, 'ix_job_applications_job_id', 'job_applications', 'job_id')
+
+
+
+@migration(3, 'external listing search', concurrent=True)
+def _external_listing_search(conn: Connection):
+    # Keyset pagination order for GET /external-listings
+    create_index(conn, 'ix_external_listings_created_at_id', 'external_listings', 'created_at, id')
+    if not _is_postgres(conn):
+        return
+    # Trigram GIN indexes let the five-way ILIKE '%term%' search use a BitmapOr
+    # of index scans instead of a sequential scan. Every OR arm needs one.
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for column in ('title', 'url', 'location', 'notes', 'source'):
+        create_index(conn, f'ix_external_listings_{column}_trgm', 'external_listings', f'{column} gin_trgm_ops', using='gin')
+
+
+
+@migration(4, 'external listing interest counters')
+def _interest_counters(conn: Connection):
+    # Constant default: a metadata-only change on Postgres 11+, no table rewrite
+    add_column(conn, 'external_listings', 'interest_count', 'INTEGER NOT NULL DEFAULT 0')
+    conn.execute(text(
+        "UPDATE external_listings SET interest_count = "
+        "(SELECT COUNT(*) FROM external_listing_interests i WHERE i.listing_id = external_listings.id)"
+    ))
+
+
+
+@migration(5, 'external listing url hashes')
+def _listing_url_hashes(conn: Connection):
+    from .listing_urls import url_hash
+
+    add_column(conn, 'external_listings', 'url_hash', 'VARCHAR(64)')
+    # Oldest listing keeps the hash; later duplicates stay NULL (the unique index allows that)
+    taken = set(r[0] for r in conn.execute(text("SELECT url_hash FROM external_listings WHERE url_hash IS NOT NULL")))
+    rows = conn.execute(text(
+        "SELECT id, url FROM external_listings WHERE url_hash IS NULL ORDER BY created_at, id"
+    )).fetchall()
+    updates = []
+    for listing_id, url in rows:
+        h = url_hash(url or '')
+        if h not in taken:
+            taken.add(h)
+            updates.append({'id': listing_id, 'h': h})
+    for start in range(0, len(updates), 1000):
+        conn.execute(text("UPDATE external_listings SET url_hash = :h WHERE id = :id"), updates[start:start + 1000])
+
+
+@migration(6, 'external listing url hash index', concurrent=True)
+def _listing_url_hash_index(conn: Connection):
+    create_index(conn, 'ix_external_listings_url_hash', 'external_listings', 'url_hash', unique=True)
+
+
+
+@migration(7, 'deduplicate contact requests')
+def _dedupe_contact_requests(conn: Connection):
+    # Keep the earliest request per (requester, target, listing) before the unique index goes on
+    conn.execute(text(
+        "DELETE FROM contact_requests WHERE EXISTS ("
+        "SELECT 1 FROM contact_requests b "
+        "WHERE b.requester_user_id = contact_requests.requester_user_id "
+        "AND b.target_user_id = contact_requests.target_user_id "
+        "AND b.listing_id = contact_requests.listing_id "
+        "AND (COALESCE(b.created_at, '') < COALESCE(contact_requests.created_at, '') "
+        "OR (COALESCE(b.created_at, '') = COALESCE(contact_requests.created_at, '') AND b.id < contact_requests.id)))"
+    ))
+
+
+@migration(8, 'contact request indexes', concurrent=True)
+def _contact_request_indexes(conn: Connection):
+    create_index(conn, 'uq_contact_requests_requester_target_listing', 'contact_requests', 'requester_user_id, target_user_id, listing_id', unique=True)
+    create_index(conn, 'ix_contact_requests_inbox', 'contact_requests', 'target_user_id, status, created_at, id')
+
+
+
+@migration(9, 'community post comment counters')
+def _comment_counters(conn: Connection):
+    add_column(conn, 'community_posts', 'comments_count', 'INTEGER NOT NULL DEFAULT 0')
+    conn.execute(text(
+        "UPDATE community_posts SET comments_count = "
+        "(SELECT COUNT(*) FROM community_comments c WHERE c.post_id = community_posts.id)"
+    ))
+    # NULLs would sort ahead of pinned posts and break keyset comparisons
+    conn.execute(text("UPDATE community_posts SET is_pinned = FALSE WHERE is_pinned IS NULL"))
+
+
+@migration(10, 'community feed index', concurrent=True)
+def _community_feed_index(conn: Connection):
+    create_index(conn, 'ix_community_posts_feed', 'community_posts', 'is_pinned, created_at, id')
+
+
+
+@migration(11, 'community comment thread index', concurrent=True)
+def _comment_thread_index(conn: Connection):
+    create_index(conn, 'ix_community_comments_thread', 'community_comments', 'post_id, created_at, id')
+    # The thread index's leading column covers what this one did
+    conn.execute(text(f"DROP INDEX {'CONCURRENTLY ' if _is_postgres(conn) else ''}IF EXISTS ix_community_comments_post_id"))
+
+
+
+@migration(12, 'community event window index', concurrent=True)
+def _event_window_index(conn: Connection):
+    create_index(conn, 'ix_community_events_status_starts_at', 'community_events', 'status, starts_at')
+
+
+
+@migration(13, 'resources directory indexes', concurrent=True)
+def _resources_directory_indexes(conn: Connection):
+    create_index(conn, 'ix_resource_items_status_created_at', 'resource_items', 'status, created_at, id')
+    if _is_postgres(conn):
+        create_index(conn, 'ix_resource_items_search', 'resource_items', f'({models.RESOURCE_SEARCH_DOCUMENT})', using='gin')
+
+
+
+def _parse_job_salaries(conn: Connection, where: str) -> None:
+    from .salary import salary_columns
+
+    rows = conn.execute(text(f"SELECT id, salary FROM job_listings WHERE {where}")).fetchall()
+    updates = [{'id': job_id, **salary_columns(salary)} for job_id, salary in rows]
+    for start in range(0, len(updates), 1000):
+        conn.execute(text(
+            "UPDATE job_listings SET salary_min = :salary_min, salary_max = :salary_max, salary_period = :salary_period WHERE id = :id"
+        ), updates[start:start + 1000])
+
+
+@migration(14, 'job listing salaries')
+def _job_salaries(conn: Connection):
+    add_column(conn, 'job_listings', 'salary_min', 'INTEGER')
+    add_column(conn, 'job_listings', 'salary_max', 'INTEGER')
+    add_column(conn, 'job_listings', 'salary_period', 'VARCHAR')
+    _parse_job_salaries(conn, 'salary IS NOT NULL AND salary_period IS NULL')
+
+
+@migration(15, 'job board indexes', concurrent=True)
+def _job_board_indexes(conn: Connection):
+    create_index(conn, 'ix_job_listings_status_created_at', 'job_listings', 'status, created_at, id')
+    create_index(conn, 'ix_job_listings_salary', 'job_listings', 'salary_period, salary_max')
+    create_index(conn, 'ix_job_listings_location_lower', 'job_listings', 'lower(location)')
+    create_index(conn, 'ix_job_listings_company_lower', 'job_listings', 'lower(company)')
+    if _is_postgres(conn):
+        # Free-text `q` still substring-matches these (see migration 3)
+        for column in ('title', 'company', 'location', 'description'):
+            create_index(conn, f'ix_job_listings_{column}_trgm', 'job_listings', f'{column} gin_trgm_ops', using='gin')
+
+
+
+def _join_text(*parts) -> str | None:
+    return ' '.join(str(p).strip() for p in parts if p and str(p).strip()) or None
+
+
+# Search documents per source table, as app/search.py built them when migration 16 was written
+_SEARCH_BACKFILL = (
+    ('apartment', "SELECT id, owner_id AS owner, title, location, description FROM apartments",
+     lambda r: {'title': r.title, 'body': _join_text(r.location, r.description), 'created_at': None}),
+    ('external_listing', "SELECT id, created_by_user_id AS owner, title, url, location, price, notes, source, created_at FROM external_listings",
+     lambda r: {'title': r.title or r.url, 'body': _join_text(r.location, r.price, r.notes, r.source), 'created_at': r.created_at}),
+    ('job', "SELECT id, created_by_user_id AS owner, title, company, location, salary, description, created_at FROM job_listings WHERE status = 'approved'",
+     lambda r: {'title': r.title, 'body': _join_text(r.company, r.location, r.salary, r.description), 'created_at': r.created_at}),
+    ('resource', "SELECT id, created_by_user_id AS owner, title, category, description, created_at FROM resource_items WHERE status = 'approved'",
+     lambda r: {'title': r.title, 'body': _join_text(r.category, r.description), 'created_at': r.created_at}),
+    ('post', "SELECT id, created_by_user_id AS owner, title, body, created_at FROM community_posts",
+     lambda r: {'title': r.title or (r.body or '')[:80], 'body': r.body, 'created_at': r.created_at}),
+)
+
+
+@migration(16, 'search documents')
+def _search_documents(conn: Connection):
+    # Frozen DDL and plain SQL: later model changes must not alter what this migration does
+    documents = Table(
+        'search_documents', MetaData(),
+        Column('id', Integer, primary_key=True),
+        Column('doc_type', String, nullable=False),
+        Column('ref_id', String, nullable=False),
+        Column('owner_user_id', Integer, nullable=True, index=True),
+        Column('title', String, nullable=True),
+        Column('body', Text, nullable=True),
+        Column('created_at', String, nullable=True),
+        UniqueConstraint('doc_type', 'ref_id', name='uq_search_documents_ref'),
+        Index('ix_search_documents_type_created_at', 'doc_type', 'created_at'),
+    )
+    documents.create(bind=conn, checkfirst=True)
+    conn.execute(text("DELETE FROM search_documents"))
+    insert = text(
+        "INSERT INTO search_documents (doc_type, ref_id, owner_user_id, title, body, created_at) "
+        "VALUES (:doc_type, :ref_id, :owner_user_id, :title, :body, :created_at)"
+    )
+    for doc_type, select_sql, build in _SEARCH_BACKFILL:
+        rows = [
+            {
+                'doc_type': doc_type,
+                # UUIDs come back as 32-char hex on SQLite; store the dashed form the API uses
+                'ref_id': str(uuid.UUID(str(r.id))) if doc_type == 'external_listing' else str(r.id),
+                'owner_user_id': r.owner,
+                **build(r),
+            }
+            for r in conn.execute(text(select_sql))
+        ]
+        for start in range(0, len(rows), 1000):
+            conn.execute(insert, rows[start:start + 1000])
+
+
+@migration(17, 'search document index', concurrent=True)
+def _search_document_index(conn: Connection):
+    if _is_postgres(conn):
+        create_index(conn, 'ix_search_documents_vector', 'search_documents', models.SEARCH_DOCUMENT_VECTOR, using='gin')
+
+
+
+@migration(18, 'unified saved items')
+def _saved_items(conn: Connection):
+    # Frozen DDL (not models.SavedItem) so later model changes can't alter this migration
+    metadata = MetaData()
+    Table('users', metadata, Column('id', Integer, primary_key=True))  # FK target only; not created
+    saved_items = Table(
+        'saved_items', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+        Column('item_type', String, nullable=False),
+        Column('item_id', Integer, nullable=False),
+        Column('created_at', String),
+        UniqueConstraint('user_id', 'item_type', 'item_id', name='uq_saved_items_user_item'),
+        Index('ix_saved_items_user_created_at', 'user_id', 'created_at', 'id'),
+        Index('ix_saved_items_item', 'item_type', 'item_id'),
+    )
+    saved_items.create(bind=conn, checkfirst=True)
+    for table, item_type, column in (('job_saves', 'job', 'job_id'), ('resource_saves', 'resource', 'resource_id')):
+        conn.execute(text(
+            f"INSERT INTO saved_items (user_id, item_type, item_id, created_at) "
+            f"SELECT user_id, '{item_type}', {column}, created_at FROM {table} "
+            f"WHERE user_id IS NOT NULL AND {column} IS NOT NULL"
+        ))
+        # Emptied rather than dropped: their FKs would otherwise block item deletes
+        conn.execute(text(f"DELETE FROM {table}"))
+
+
+
+@migration(19, 'moderation queue indexes', concurrent=True)
+def _moderation_queue_indexes(conn: Connection):
+    # Partial: only the (small) pending backlog is indexed, not every approved row
+    for table in ('community_events', 'resource_items', 'job_listings'):
+        create_index(conn, f'ix_{table}_pending', table, 'created_at, id', where="status = 'pending'")
+
+
+
+@migration(20, 'user deletion jobs')
+def _user_deletion_jobs(conn: Connection):
+    models.UserDeletionJob.__table__.create(bind=conn, checkfirst=True)
+
+
+
+@migration(21, 'purge jobs')
+def _purge_jobs(conn: Connection):
+    models.PurgeJob.__table__.create(bind=conn, checkfirst=True)
+
+
+
+@migration(22, 'user directory indexes', concurrent=True)
+def _user_directory_indexes(conn: Connection):
+    ops = ' text_pattern_ops' if _is_postgres(conn) else ''
+    create_index(conn, 'ix_users_email_prefix', 'users', f'lower(email){ops}')
+    create_index(conn, 'ix_users_full_name_prefix', 'users', f'lower(full_name){ops}')
+
+
+
+@migration(23, 'reparse job salaries')
+def _reparse_job_salaries(conn: Connection):
+    # The first parser paired any two numbers ("40 hours/week, 12000 monthly" became 40-12000/hour)
+    _parse_job_salaries(conn, 'salary IS NOT NULL')
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+
+
+def _ensure_version_table(conn: Connection) -> None:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at VARCHAR)"
+    ))
+
+
+def current_version(conn: Connection) -> int:
+    """Stored schema version (0 if migrations never ran)."""
+
+    exists = conn.dialect.has_table(conn, 'schema_version')
+    if not exists:
+        return 0
+    v = conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+    return int(v or 0)
+
+
+def _record(conn: Connection, m: dict) -> None:
+    conn.execute(
+        text("INSERT INTO schema_version (version, name, applied_at) VALUES (:v, :n, :t)"),
+        {'v': m['version'], 'n': m['name'], 't': datetime.utcnow().isoformat()},
+    )
+
+
+def upgrade(engine: Engine = default_engine) -> list[int]:
+    """Apply pending migrations in order. Returns the versions applied."""
+
+    applied = []
+    with engine.connect() as lock_conn:
+        pg = _is_postgres(lock_conn)
+        if pg:
+            lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {'id': _ADVISORY_LOCK_ID})
+        try:
+            with engine.begin() as conn:
+                _ensure_version_table(conn)
+            for m in _MIGRATIONS:
+                with engine.connect() as conn:
+                    done = m['version'] <= current_version(conn)
+                if done:
+                    continue
+                if m['concurrent']:
+                    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                        m['fn'](conn)
+                    with engine.begin() as conn:
+                        _record(conn, m)
+                else:
+                    with engine.begin() as conn:
+                        m['fn'](conn)
+                        _record(conn, m)
+                print(f"[migrations] applied {m['version']}: {m['name']}")
+                applied.append(m['version'])
+        finally:
+            if pg:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {'id': _ADVISORY_LOCK_ID})
+                lock_conn.commit()
+    return applied
+
+
+def ensure_admin() -> None:
+    db = SessionLocal()
+    try:
+        admin = crud.get_user_by_email(db, config.ADMIN_EMAIL)
+        if not admin:
+            from pydantic import BaseModel
+            class Admin(BaseModel):
+                email: str
+                password: str
+                full_name: str | None = None
+            crud.create_user(db, Admin(email=config.ADMIN_EMAIL, password=config.ADMIN_PASSWORD), is_admin=True)
+            print("Default admin created:", config.ADMIN_EMAIL)
+    finally:
+        db.close()
+
+
+def check_schema_version(engine: Engine = default_engine) -> int:
+    """Cheap boot-time check: one query, no DDL. Raises if migrations are pending."""
+
+    with engine.connect() as conn:
+        v = current_version(conn)
+    if v < latest_version():
+        raise RuntimeError(
+            f"Database schema is at version {v}, expected {latest_version()}. "
+            "Run `python -m app.migrations upgrade` before starting the API."
+        )
+    return v
+
+
+def main(argv: list[str]) -> int:
+    cmd = argv[0] if argv else 'upgrade'
+    if cmd == 'upgrade':
+        upgrade()
+        ensure_admin()
+        return 0
+    if cmd == 'status':
+        with default_engine.connect() as conn:
+            print(f"stored={current_version(conn)} latest={latest_version()}")
+        return 0
+    print("usage: python -m app.migrations [upgrade|status]", file=sys.stderr)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
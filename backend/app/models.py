@@ -1,13 +1,30 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, BigInteger
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, BigInteger, UniqueConstraint, Index, func, text
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .database import Base
 
+
+def _utcnow_iso() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def _pending_index(name: str) -> Index:
+    """Partial index over the moderation backlog only (newest first in the admin queue)."""
+    pending = text("status = 'pending'")
+    return Index(name, "created_at", "id", postgresql_where=pending, sqlite_where=pending)
+
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     full_name = Column(String, nullable=True)
     phone = Column(String, nullable=True)
+    # Private contact number (only exchanged through accepted contact requests)
+    phone_number = Column(String, nullable=True)
+    phone_verified = Column(Boolean, default=False)
     hashed_password = Column(String, nullable=False)
     is_admin = Column(Boolean, default=False)
 
@@ -18,6 +35,12 @@ class User(Base):
     apartments = relationship("Apartment", back_populates="owner")
     applications = relationship("Application", back_populates="applicant")
 
+
+# Prefix search in the admin user directory (`lower(col) LIKE 'abc%'`); text_pattern_ops
+# lets Postgres use them for LIKE under any collation
+Index("ix_users_email_prefix", func.lower(User.email).label("email_lower"), postgresql_ops={"email_lower": "text_pattern_ops"})
+Index("ix_users_full_name_prefix", func.lower(User.full_name).label("full_name_lower"), postgresql_ops={"full_name_lower": "text_pattern_ops"})
+
 class Apartment(Base):
     __tablename__ = "apartments"
     id = Column(Integer, primary_key=True, index=True)
@@ -35,7 +58,7 @@ class Apartment(Base):
     opposite_gender_allowed = Column(Boolean, default=False)
     smoking_allowed = Column(Boolean, default=False)
 
-    owner_id = Column(Integer, ForeignKey("users.id"))
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
     owner = relationship("User", back_populates="apartments")
     applications = relationship("Application", back_populates="apartment")
 
@@ -44,8 +67,8 @@ class Application(Base):
     id = Column(Integer, primary_key=True, index=True)
     message = Column(Text)
     status = Column(String, default="pending")
-    applicant_id = Column(Integer, ForeignKey("users.id"))
-    apartment_id = Column(Integer, ForeignKey("apartments.id"))
+    applicant_id = Column(Integer, ForeignKey("users.id"), index=True)
+    apartment_id = Column(Integer, ForeignKey("apartments.id"), index=True)
     applicant = relationship("User", back_populates="applications")
     apartment = relationship("Apartment", back_populates="applications")
 
@@ -58,3 +81,310 @@ class Notification(Base):
     is_read = Column(Boolean, default=False)
     created_at = Column(String, nullable=True)
     user = relationship("User")
+
+
+class PushSubscription(Base):
+    __tablename__ = "push_subscriptions"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    endpoint = Column(String, unique=True, nullable=False)
+    p256dh = Column(String, nullable=False)
+    auth = Column(String, nullable=False)
+    created_at = Column(String, default=_utcnow_iso)
+
+
+# -----------------------------
+# External listings
+# -----------------------------
+
+
+class ExternalListing(Base):
+    __tablename__ = "external_listings"
+    __table_args__ = (
+        Index("ix_external_listings_created_at_id", "created_at", "id"),
+        Index("ix_external_listings_url_hash", "url_hash", unique=True),
+    )
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    created_by_user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    source = Column(String, nullable=False)  # 'yad2' | 'facebook' | 'other'
+    url = Column(String, nullable=False)
+    # sha256 of listing_urls.canonicalize_url(url); NULL only for pre-dedup duplicates
+    url_hash = Column(String(64), nullable=True)
+    title = Column(String, nullable=True)
+    price = Column(String, nullable=True)
+    location = Column(String, nullable=True)
+    notes = Column(Text, nullable=True)
+    created_at = Column(String, default=_utcnow_iso, index=True)
+    # Maintained by crud.add_interest/remove_interest; `python -m app.maintenance reconcile-interests` repairs drift
+    interest_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class ExternalListingInterest(Base):
+    __tablename__ = "external_listing_interests"
+    __table_args__ = (UniqueConstraint("listing_id", "user_id", name="uq_external_interest_listing_user"),)
+    id = Column(Integer, primary_key=True, index=True)
+    listing_id = Column(UUID(as_uuid=True), ForeignKey("external_listings.id"), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    created_at = Column(String, default=_utcnow_iso)
+
+
+class ContactRequest(Base):
+    __tablename__ = "contact_requests"
+    __table_args__ = (
+        Index("uq_contact_requests_requester_target_listing", "requester_user_id", "target_user_id", "listing_id", unique=True),
+        Index("ix_contact_requests_inbox", "target_user_id", "status", "created_at", "id"),
+    )
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    requester_user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    target_user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    listing_id = Column(UUID(as_uuid=True), ForeignKey("external_listings.id"))
+    status = Column(String, default="pending")  # 'pending' | 'accepted' | 'declined'
+    created_at = Column(String, default=_utcnow_iso)
+
+
+# -----------------------------
+# Community
+# -----------------------------
+
+
+class CommunityPost(Base):
+    __tablename__ = "community_posts"
+    # Feed order: is_pinned DESC, created_at DESC, id DESC (scanned backwards)
+    __table_args__ = (Index("ix_community_posts_feed", "is_pinned", "created_at", "id"),)
+    id = Column(Integer, primary_key=True, index=True)
+    created_by_user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    title = Column(String, nullable=True)
+    body = Column(Text, nullable=False)
+    is_pinned = Column(Boolean, default=False)
+    created_at = Column(String, default=_utcnow_iso)
+    # Maintained on comment insert/delete; `python -m app.maintenance reconcile-comments` repairs drift
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class CommunityComment(Base):
+    __tablename__ = "community_comments"
+    # Thread order in either direction; also serves post_id lookups
+    __table_args__ = (Index("ix_community_comments_thread", "post_id", "created_at", "id"),)
+    id = Column(Integer, primary_key=True, index=True)
+    post_id = Column(Integer, ForeignKey("community_posts.id"))
+    created_by_user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    body = Column(Text, nullable=False)
+    created_at = Column(String, default=_utcnow_iso)
+
+
+class CommunityEvent(Base):
+    __tablename__ = "community_events"
+    # Time-window queries over approved events
+    __table_args__ = (
+        Index("ix_community_events_status_starts_at", "status", "starts_at"),
+        _pending_index("ix_community_events_pending"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    created_by_user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    title = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    location = Column(String, nullable=True)
+    starts_at = Column(String, nullable=False)  # ISO-8601
+    status = Column(String, default="pending")  # 'pending' | 'approved' | 'rejected'
+    created_at = Column(String, default=_utcnow_iso)
+
+
+class CommunityMessage(Base):
+    __tablename__ = "community_messages"
+    id = Column(Integer, primary_key=True, index=True)
+    sender_user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    recipient_user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    body = Column(Text, nullable=False)
+    is_read = Column(Boolean, default=False)
+    created_at = Column(String, default=_utcnow_iso)
+
+
+# -----------------------------
+# Resources
+# -----------------------------
+
+
+# Full-text document for the resources search. The GIN index from migration 13 is
+# built on exactly this expression; queries must use it verbatim to hit the index.
+RESOURCE_SEARCH_DOCUMENT = (
+    "to_tsvector('simple', coalesce(resource_items.title, '') || ' ' || coalesce(resource_items.category, '') "
+    "|| ' ' || coalesce(resource_items.description, '') || ' ' || coalesce(resource_items.url, ''))"
+)
+
+
+class ResourceItem(Base):
+    __tablename__ = "resource_items"
+    # Keyset order of the directory, with the approved filter in front
+    __table_args__ = (
+        Index("ix_resource_items_status_created_at", "status", "created_at", "id"),
+        _pending_index("ix_resource_items_pending"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    created_by_user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    title = Column(String, nullable=False)
+    category = Column(String, nullable=True, index=True)
+    description = Column(Text, nullable=True)
+    url = Column(String, nullable=True)
+    status = Column(String, default="pending")
+    created_at = Column(String, default=_utcnow_iso)
+
+
+# Superseded by SavedItem (migration 18 moved its rows); kept so older migrations apply
+class ResourceSave(Base):
+    __tablename__ = "resource_saves"
+    __table_args__ = (UniqueConstraint("user_id", "resource_id", name="uq_resource_save_user_resource"),)
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    resource_id = Column(Integer, ForeignKey("resource_items.id"), index=True)
+    created_at = Column(String, default=_utcnow_iso)
+
+
+# -----------------------------
+# Jobs
+# -----------------------------
+
+
+class JobListing(Base):
+    __tablename__ = "job_listings"
+    __table_args__ = (
+        # Keyset order of the board, with the approved filter in front
+        Index("ix_job_listings_status_created_at", "status", "created_at", "id"),
+        # "Pays at least X per <period>" filters
+        Index("ix_job_listings_salary", "salary_period", "salary_max"),
+        _pending_index("ix_job_listings_pending"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    created_by_user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    title = Column(String, nullable=False)
+    company = Column(String, nullable=True)
+    location = Column(String, nullable=True)
+    description = Column(Text, nullable=True)
+    apply_url = Column(String, nullable=True)
+    salary = Column(String, nullable=True)
+    # Parsed from `salary` on write (app/salary.py); NULL when it has no amount
+    salary_min = Column(Integer, nullable=True)
+    salary_max = Column(Integer, nullable=True)
+    salary_period = Column(String, nullable=True)
+    status = Column(String, default="pending")
+    created_at = Column(String, default=_utcnow_iso)
+
+
+# Case-insensitive exact-match filters
+Index("ix_job_listings_location_lower", func.lower(JobListing.location))
+Index("ix_job_listings_company_lower", func.lower(JobListing.company))
+
+
+# Superseded by SavedItem (migration 18 moved its rows); kept so older migrations apply
+class JobSave(Base):
+    __tablename__ = "job_saves"
+    __table_args__ = (UniqueConstraint("user_id", "job_id", name="uq_job_save_user_job"),)
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    job_id = Column(Integer, ForeignKey("job_listings.id"), index=True)
+    created_at = Column(String, default=_utcnow_iso)
+
+
+class JobApplication(Base):
+    __tablename__ = "job_applications"
+    __table_args__ = (UniqueConstraint("job_id", "user_id", name="uq_job_application_job_user"),)
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("job_listings.id"), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    message = Column(Text, nullable=True)
+    created_at = Column(String, default=_utcnow_iso)
+
+
+# -----------------------------
+# Saved items
+# -----------------------------
+
+
+class SavedItem(Base):
+    """A user's bookmark on a job or resource (item_type + item_id; see crud.SAVED_ITEM_TYPES)."""
+
+    __tablename__ = "saved_items"
+    __table_args__ = (
+        UniqueConstraint("user_id", "item_type", "item_id", name="uq_saved_items_user_item"),
+        # Newest-first pages of one user's saves
+        Index("ix_saved_items_user_created_at", "user_id", "created_at", "id"),
+        # Dropping every save of an item when it is deleted
+        Index("ix_saved_items_item", "item_type", "item_id"),
+    )
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    item_type = Column(String, nullable=False)
+    # No FK (polymorphic); rows go away with the item via crud.delete_saves_of
+    item_id = Column(Integer, nullable=False)
+    created_at = Column(String, default=_utcnow_iso)
+
+
+# -----------------------------
+# Search
+# -----------------------------
+
+
+# Weighted full-text vector of a search document (title ranks above body). The GIN
+# index from migration 17 is built on exactly this expression.
+SEARCH_DOCUMENT_VECTOR = (
+    "(setweight(to_tsvector('simple', coalesce(search_documents.title, '')), 'A') "
+    "|| setweight(to_tsvector('simple', coalesce(search_documents.body, '')), 'B'))"
+)
+
+
+class SearchDocument(Base):
+    """One row per publicly visible item across the apps; maintained by app/search.py."""
+
+    __tablename__ = "search_documents"
+    __table_args__ = (
+        UniqueConstraint("doc_type", "ref_id", name="uq_search_documents_ref"),
+        Index("ix_search_documents_type_created_at", "doc_type", "created_at"),
+    )
+    id = Column(Integer, primary_key=True)
+    doc_type = Column(String, nullable=False)  # see search.DOC_TYPES
+    ref_id = Column(String, nullable=False)  # source row id as text (external listings use UUIDs)
+    # No FK: documents are removed together with their owner's content
+    owner_user_id = Column(Integer, nullable=True, index=True)
+    title = Column(String, nullable=True)
+    body = Column(Text, nullable=True)
+    created_at = Column(String, nullable=True)
+
+
+# -----------------------------
+# Background admin jobs
+# -----------------------------
+
+
+class UserDeletionJob(Base):
+    """A queued account deletion; app/user_deletion.py works through it in chunks."""
+
+    __tablename__ = "user_deletion_jobs"
+    id = Column(Integer, primary_key=True)
+    # No FK: the job outlives the user it deletes
+    user_id = Column(Integer, nullable=False, index=True)
+    requested_by_user_id = Column(Integer, nullable=True)
+    status = Column(String, nullable=False, default="queued")  # 'queued' | 'running' | 'done' | 'failed'
+    # Name of the step in progress (see purge.STEPS); earlier steps are complete
+    step = Column(String, nullable=True)
+    deleted_rows = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text, nullable=True)
+    created_at = Column(String, default=_utcnow_iso)
+    # Bumped after every batch; a running job that stops updating is picked up again
+    updated_at = Column(String, default=_utcnow_iso)
+    finished_at = Column(String, nullable=True)
+
+
+class PurgeJob(Base):
+    """A queued `POST /admin/clean` (delete everything but the admins); see app/purge.py."""
+
+    __tablename__ = "purge_jobs"
+    id = Column(Integer, primary_key=True)
+    requested_by_user_id = Column(Integer, nullable=True)
+    # 'auto' until the run picks 'chunked' or 'truncate' (see purge.PURGE_MODES)
+    mode = Column(String, nullable=False, default="auto")
+    status = Column(String, nullable=False, default="queued")  # 'queued' | 'running' | 'done' | 'failed'
+    step = Column(String, nullable=True)
+    deleted_rows = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text, nullable=True)
+    created_at = Column(String, default=_utcnow_iso)
+    updated_at = Column(String, default=_utcnow_iso)
+    finished_at = Column(String, nullable=True)
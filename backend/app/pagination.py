@@ -0,0 +1,42 @@
+"""Opaque keyset cursors.
+
+A cursor carries the sort key of the last row on a page (e.g. created_at, id)
+so the next page is `WHERE (created_at, id) < (:created_at, :id)` on an index,
+instead of an OFFSET that rescans every skipped row. Clients treat it as an
+opaque string.
+
+Endpoints that return a bare list (and so can't add a `next_cursor` field
+without breaking clients) send the cursor in the NEXT_CURSOR_HEADER header.
+"""
+
+import json
+import base64
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps([str(v) if v is not None and not isinstance(v, (int, float, bool, str)) else v for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Sort-key values from `cursor`; ValueError if it is malformed or the wrong shape."""
+
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def after(columns: list, values: list, *, descending: bool = True):
+    """Row-value comparison `(c1, c2, ...) < (v1, v2, ...)`, or `>` for ascending order."""
+
+    if descending:
+        return tuple_(*columns) < tuple_(*values)
+    return tuple_(*columns) > tuple_(*values)
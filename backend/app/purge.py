@@ -0,0 +1,366 @@
+"""Chunked, resumable deletion of users and everything they own.
+
+Shared by the two admin jobs that remove accounts: deleting one user
+(app/user_deletion.py) and cleaning the database down to its admins (`POST
+/admin/clean`, `run_clean` below). Both used to be a DELETE per table inside
+the admin request and its single transaction, which held locks across every
+table (and, on a big database, wrote a huge WAL) until it finished.
+
+`run_steps` walks STEPS in order (ordered so foreign keys always hold). Each
+step deletes the rows matching its predicate in key-ordered chunks of
+`batch_size` and commits every chunk together with the job's progress (current
+step, rows deleted). Predicates are evaluated afresh, so an interrupted job
+resumes at its recorded step and re-selects whatever is left there. Parent
+steps also clear their chunk's children, and the final `users` step sweeps
+anything its users still own, so rows created while the job runs can't block
+a later delete.
+
+When almost every row goes (a clean of a big database), `truncate_and_reinsert`
+is much cheaper: it copies the few kept rows aside, TRUNCATEs every table in
+one statement and inserts them back, in a single short transaction.
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import and_, case, func, insert, or_, select, text, update
+from sqlalchemy.orm import Session
+from . import models, crud, cache
+from .database import SessionLocal
+
+BATCH_SIZE = 500
+
+# A running job that hasn't recorded progress for this long is assumed dead and may be resumed
+STALE_AFTER_SECONDS = 300
+
+# `mode='auto'` cleans by TRUNCATE when at least this share of the rows goes and the
+# rows kept (held in memory while the tables are emptied) are at most TRUNCATE_MAX_KEPT_ROWS
+TRUNCATE_MIN_DELETED_SHARE = 0.9
+TRUNCATE_MAX_KEPT_ROWS = 20_000
+
+PURGE_MODES = ('auto', 'chunked', 'truncate')
+
+_UNFINISHED = ('queued', 'running', 'failed')
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+# -----------------------------
+# Steps
+# -----------------------------
+# `owned(column)` is the predicate "this owner/user id column points at a user
+# being deleted", e.g. `column == 42` or `~column.in_(admin_ids)`.
+
+_C, _P = models.CommunityComment, models.CommunityPost
+_S, _R, _J = models.SavedItem, models.ResourceItem, models.JobListing
+_JA, _CR = models.JobApplication, models.ContactRequest
+_EL, _ELI = models.ExternalListing, models.ExternalListingInterest
+_A, _AP = models.Application, models.Apartment
+_RS, _JS = models.ResourceSave, models.JobSave
+
+
+def _ids_of(owner_column, owned):
+    """`SELECT id FROM <table> WHERE owned(<owner_column>)`"""
+    return select(owner_column.table.c.id).where(owned(owner_column))
+
+
+def _delete_where(db: Session, model, where) -> int:
+    return db.query(model).filter(where).delete(synchronize_session=False)
+
+
+def _uncount_comments(db: Session, ids: list) -> int:
+    """Take a chunk of comments off their posts' comments_count."""
+    in_chunk = select(func.count(_C.id)).where(_C.post_id == _P.id, _C.id.in_(ids)).scalar_subquery()
+    db.execute(
+        update(_P)
+        .where(_P.id.in_(select(_C.post_id).where(_C.id.in_(ids))))
+        .values(comments_count=_P.comments_count - in_chunk)
+        .execution_options(synchronize_session=False)
+    )
+    return 0
+
+
+def _uncount_interests(db: Session, ids: list) -> int:
+    """Take a chunk of interests off their listings' interest_count."""
+    in_chunk = select(func.count(_ELI.id)).where(_ELI.listing_id == _EL.id, _ELI.id.in_(ids)).scalar_subquery()
+    db.execute(
+        update(_EL)
+        .where(_EL.id.in_(select(_ELI.listing_id).where(_ELI.id.in_(ids))))
+        .values(interest_count=_EL.interest_count - in_chunk)
+        .execution_options(synchronize_session=False)
+    )
+    return 0
+
+
+# Parent hooks: children that appeared after the children's own step ran
+
+def _clear_posts(db: Session, ids: list) -> int:
+    return _delete_where(db, _C, _C.post_id.in_(ids))
+
+
+def _clear_resources(db: Session, ids: list) -> int:
+    return (_delete_where(db, _S, and_(_S.item_type == 'resource', _S.item_id.in_(ids)))
+            + _delete_where(db, _RS, _RS.resource_id.in_(ids)))
+
+
+def _clear_jobs(db: Session, ids: list) -> int:
+    return (_delete_where(db, _S, and_(_S.item_type == 'job', _S.item_id.in_(ids)))
+            + _delete_where(db, _JS, _JS.job_id.in_(ids))
+            + _delete_where(db, _JA, _JA.job_id.in_(ids)))
+
+
+def _clear_listings(db: Session, ids: list) -> int:
+    return _delete_where(db, _ELI, _ELI.listing_id.in_(ids)) + _delete_where(db, _CR, _CR.listing_id.in_(ids))
+
+
+def _clear_apartments(db: Session, ids: list) -> int:
+    return _delete_where(db, _A, _A.apartment_id.in_(ids))
+
+
+def _clear_users(db: Session, ids: list) -> int:
+    """Everything these users still own (created while the job ran), unchunked."""
+    owned = lambda column: column.in_(ids)  # noqa: E731
+    return sum(delete_chunk(db, model, where(owned), hook, None)[0] for _, model, where, hook in STEPS[:-1])
+
+
+# (step name, model, owned -> rows to delete, hook(db, chunk ids) run before the chunk is
+# deleted, returning the extra rows it deleted)
+STEPS = (
+    ('search_documents', models.SearchDocument, lambda owned: owned(models.SearchDocument.owner_user_id), None),
+    ('comments', _C, lambda owned: owned(_C.created_by_user_id), _uncount_comments),
+    ('comments_on_posts', _C, lambda owned: _C.post_id.in_(_ids_of(_P.created_by_user_id, owned)), None),
+    ('posts', _P, lambda owned: owned(_P.created_by_user_id), _clear_posts),
+    ('events', models.CommunityEvent, lambda owned: owned(models.CommunityEvent.created_by_user_id), None),
+    ('messages', models.CommunityMessage, lambda owned: or_(owned(models.CommunityMessage.sender_user_id), owned(models.CommunityMessage.recipient_user_id)), None),
+    ('saved_items', _S, lambda owned: owned(_S.user_id), None),
+    ('saves_of_resources', _S, lambda owned: and_(_S.item_type == 'resource', _S.item_id.in_(_ids_of(_R.created_by_user_id, owned))), None),
+    ('saves_of_jobs', _S, lambda owned: and_(_S.item_type == 'job', _S.item_id.in_(_ids_of(_J.created_by_user_id, owned))), None),
+    # Superseded tables (emptied by migration 18); still covered because their FKs are
+    ('legacy_resource_saves', _RS, lambda owned: or_(owned(_RS.user_id), _RS.resource_id.in_(_ids_of(_R.created_by_user_id, owned))), None),
+    ('legacy_job_saves', _JS, lambda owned: or_(owned(_JS.user_id), _JS.job_id.in_(_ids_of(_J.created_by_user_id, owned))), None),
+    ('resources', _R, lambda owned: owned(_R.created_by_user_id), _clear_resources),
+    ('job_applications', _JA, lambda owned: owned(_JA.user_id), None),
+    ('applications_to_jobs', _JA, lambda owned: _JA.job_id.in_(_ids_of(_J.created_by_user_id, owned)), None),
+    ('jobs', _J, lambda owned: owned(_J.created_by_user_id), _clear_jobs),
+    ('contact_requests', _CR, lambda owned: or_(owned(_CR.requester_user_id), owned(_CR.target_user_id), _CR.listing_id.in_(_ids_of(_EL.created_by_user_id, owned))), None),
+    ('interests', _ELI, lambda owned: owned(_ELI.user_id), _uncount_interests),
+    ('interests_in_listings', _ELI, lambda owned: _ELI.listing_id.in_(_ids_of(_EL.created_by_user_id, owned)), None),
+    ('external_listings', _EL, lambda owned: owned(_EL.created_by_user_id), _clear_listings),
+    ('applications', _A, lambda owned: owned(_A.applicant_id), None),
+    ('applications_to_apartments', _A, lambda owned: _A.apartment_id.in_(_ids_of(_AP.owner_id, owned)), None),
+    ('apartments', _AP, lambda owned: owned(_AP.owner_id), _clear_apartments),
+    ('notifications', models.Notification, lambda owned: owned(models.Notification.user_id), None),
+    ('push_subscriptions', models.PushSubscription, lambda owned: owned(models.PushSubscription.user_id), None),
+    ('users', models.User, lambda owned: owned(models.User.id), _clear_users),
+)
+_STEP_NAMES = [name for name, *_ in STEPS]
+
+
+def delete_chunk(db: Session, model, where, hook, limit: int | None, after=None) -> tuple[int, object]:
+    """Delete up to `limit` matching rows with id > `after`, in id order.
+
+    Returns (rows deleted including the hook's, last id in the chunk or None if it was empty).
+    """
+    qry = select(model.id).where(where)
+    if after is not None:
+        qry = qry.where(model.id > after)
+    qry = qry.order_by(model.id)
+    if limit is not None:
+        qry = qry.limit(limit)
+    ids = db.execute(qry).scalars().all()
+    if not ids:
+        return 0, None
+    extra = hook(db, ids) if hook is not None else 0
+    return extra + _delete_where(db, model, model.id.in_(ids)), ids[-1]
+
+
+def run_steps(db: Session, job, owned, batch_size: int = BATCH_SIZE) -> None:
+    """Delete everything `owned` selects, resuming at `job.step`; commits after every chunk."""
+    start = _STEP_NAMES.index(job.step) if job.step in _STEP_NAMES else 0
+    for name, model, where, hook in STEPS[start:]:
+        after = None
+        while True:
+            deleted, last = delete_chunk(db, model, where(owned), hook, batch_size, after)
+            job.step = name
+            job.deleted_rows += deleted
+            job.updated_at = _now()
+            db.commit()
+            if last is None:
+                break
+            after = last
+
+
+def steps_done(job) -> int:
+    """Completed steps, for progress display."""
+    if job.status == 'done':
+        return len(STEPS)
+    return _STEP_NAMES.index(job.step) if job.step in _STEP_NAMES else 0
+
+
+# -----------------------------
+# Truncate and reinsert
+# -----------------------------
+
+def _keep_clauses(owned) -> dict:
+    """Table -> predicate for the rows that survive (the negation of all its steps)."""
+    deleted: dict = {}
+    for _, model, where, _ in STEPS:
+        deleted.setdefault(model.__table__, []).append(where(owned))
+    # NULL (e.g. an ownerless row) counts as kept, as it does for the chunked deletes
+    return {table: case((or_(*preds), 0), else_=1) == 1 for table, preds in deleted.items()}
+
+
+def plan(db: Session, owned) -> tuple[int, int]:
+    """(rows in the purged tables, rows that would be kept)."""
+    total = kept = 0
+    for table, keep in _keep_clauses(owned).items():
+        total += db.execute(select(func.count()).select_from(table)).scalar()
+        kept += db.execute(select(func.count()).select_from(table).where(keep)).scalar()
+    return total, kept
+
+
+def truncate_and_reinsert(db: Session, owned) -> int:
+    """Empty every purged table and put the kept rows back, in one transaction; returns rows deleted."""
+    keep = _keep_clauses(owned)
+    tables = [t for t in models.Base.metadata.sorted_tables if t in keep]  # parents first
+    kept_rows, total = {}, 0
+    for table in tables:
+        total += db.execute(select(func.count()).select_from(table)).scalar()
+        kept_rows[table] = [dict(r) for r in db.execute(select(table).where(keep[table])).mappings()]
+    if db.get_bind().dialect.name == 'postgresql':
+        # One statement, so foreign keys between the tables don't block it
+        db.execute(text('TRUNCATE ' + ', '.join(t.name for t in tables)))
+    else:
+        for table in reversed(tables):
+            db.execute(table.delete())
+    for table in tables:
+        if kept_rows[table]:
+            db.execute(insert(table), kept_rows[table])
+    return total - sum(len(rows) for rows in kept_rows.values())
+
+
+# -----------------------------
+# Job bookkeeping (UserDeletionJob, PurgeJob)
+# -----------------------------
+
+def _claimable(J):
+    """Queued, failed, or running without recent progress."""
+    stale = (datetime.utcnow() - timedelta(seconds=STALE_AFTER_SECONDS)).isoformat()
+    return or_(J.status.in_(('queued', 'failed')), and_(J.status == 'running', J.updated_at < stale))
+
+
+def resumable_job_ids(db: Session, J) -> list[int]:
+    return [r[0] for r in db.query(J.id).filter(_claimable(J)).order_by(J.id)]
+
+
+def _claim(db: Session, J, job_id: int):
+    """Mark the job running unless another runner holds it (or it is done)."""
+    claimed = db.execute(
+        update(J).where(J.id == job_id, _claimable(J)).values(status='running', error=None, updated_at=_now()).returning(J.id)
+    ).scalar()
+    db.commit()
+    return db.get(J, job_id) if claimed else None
+
+
+def finish(db: Session, job) -> None:
+    job.status = 'done'
+    job.step = None
+    job.updated_at = job.finished_at = _now()
+    db.commit()
+    # Deleted posts and comments may be on the cached first feed page
+    cache.hot_feed.invalidate()
+
+
+def execute(J, job_id: int, work, label: str) -> int | None:
+    """Claim job `job_id` of model `J` and run `work(db, job)`.
+
+    Returns the rows this run deleted, or None if the job wasn't claimable or
+    failed (recorded as status 'failed' for the next run to resume).
+    """
+    db = SessionLocal()
+    try:
+        job = _claim(db, J, job_id)
+        if job is None:
+            return None
+        before = job.deleted_rows
+        try:
+            work(db, job)
+        except Exception as e:
+            db.rollback()
+            db.query(J).filter(J.id == job_id).update(
+                {'status': 'failed', 'error': str(e)[:1000], 'updated_at': _now()}, synchronize_session=False
+            )
+            db.commit()
+            print(f"[{label}] job {job_id} failed: {e}")
+            return None
+        return job.deleted_rows - before
+    finally:
+        db.close()
+
+
+def run_pending(J, run) -> int:
+    """`run(job_id)` every resumable job of model `J`; returns the rows deleted."""
+    db = SessionLocal()
+    try:
+        job_ids = resumable_job_ids(db, J)
+    finally:
+        db.close()
+    return sum(run(job_id) or 0 for job_id in job_ids)
+
+
+# -----------------------------
+# Clean (everything but the admins)
+# -----------------------------
+
+def enqueue_clean(db: Session, requested_by_user_id: int | None = None, mode: str = 'auto') -> models.PurgeJob:
+    """The unfinished clean job, or a new queued one (caller commits).
+
+    A job that hasn't been claimed yet switches to `mode`. One that has started
+    keeps its mode; asking for a different one (other than 'auto') raises ValueError.
+    """
+    J = models.PurgeJob
+    job = db.query(J).filter(J.status.in_(_UNFINISHED)).order_by(J.id.desc()).first()
+    if job is None:
+        job = J(requested_by_user_id=requested_by_user_id, mode=mode, status='queued', deleted_rows=0)
+        db.add(job)
+        db.flush()
+    elif job.mode != mode:
+        # Conditional on 'queued' so a runner claiming the job concurrently wins
+        switched = db.execute(
+            update(J).where(J.id == job.id, J.status == 'queued').values(mode=mode, updated_at=_now()).returning(J.id)
+        ).first()
+        if switched:
+            db.refresh(job)
+        elif mode != 'auto':
+            raise ValueError(f"Clean job {job.id} already started in '{job.mode}' mode; retry with mode={job.mode} or auto")
+    return job
+
+
+def _clean(db: Session, job: models.PurgeJob, batch_size: int) -> None:
+    # Whoever is an admin when the run starts is kept
+    keep = [r[0] for r in db.query(models.User.id).filter(models.User.is_admin == True)]  # noqa: E712
+    owned = lambda column: ~column.in_(keep)  # noqa: E731
+    if job.mode == 'auto':
+        total, kept = plan(db, owned)
+        big_majority = total and (total - kept) >= TRUNCATE_MIN_DELETED_SHARE * total
+        job.mode = 'truncate' if big_majority and kept <= TRUNCATE_MAX_KEPT_ROWS else 'chunked'
+        db.commit()
+    if job.mode == 'truncate':
+        job.step = 'truncate'
+        job.deleted_rows += truncate_and_reinsert(db, owned)
+        job.updated_at = _now()
+        db.commit()
+        # Kept posts and listings may have lost comments and interests with the purged rows
+        crud.reconcile_comment_counts(db)
+        crud.reconcile_interest_counts(db)
+    else:
+        run_steps(db, job, owned, batch_size)
+    finish(db, job)
+
+
+def run_clean(job_id: int, batch_size: int = BATCH_SIZE) -> int | None:
+    return execute(models.PurgeJob, job_id, lambda db, job: _clean(db, job, batch_size), 'clean')
+
+
+def run_pending_cleans(batch_size: int = BATCH_SIZE) -> int:
+    return run_pending(models.PurgeJob, lambda job_id: run_clean(job_id, batch_size))
@@ -0,0 +1,45 @@
+"""Fast JSON responses for list endpoints.
+
+FastAPI normally re-validates a handler's return value against `response_model`
+and then encodes it with the stdlib json module. For list handlers that already
+build plain dicts with the schema's exact keys and coerced types, both steps are
+redundant per row. Returning `fast_json(rows)` skips them: the payload goes
+straight to orjson (or compact stdlib json if orjson isn't installed).
+
+Opt-in via FAST_JSON_RESPONSES; when off, `fast_json` returns the payload
+unchanged and the normal validation path runs. `response_model` stays on the
+route either way so the OpenAPI schema is unchanged.
+"""
+
+import json
+from typing import Any, Mapping
+from fastapi.responses import JSONResponse
+from . import config
+
+try:
+    # Optional dependency; the stdlib fallback keeps the fast path usable without it.
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - depends on environment
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            # Handles UUID/datetime natively; non-str dict keys appear in apartments_applied-style maps
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def fast_json(payload: Any, headers: Mapping[str, str] | None = None):
+    """Return `payload` as a prevalidated FastJSONResponse when the fast path is enabled.
+
+    FastAPI only merges headers set on an injected `Response` into plain return
+    values, so a handler that sets any (e.g. X-Next-Cursor) passes them here too.
+    """
+
+    if config.FAST_JSON_RESPONSES:
+        return FastJSONResponse(payload, headers=dict(headers) if headers else None)
+    return payload
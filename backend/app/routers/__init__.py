@@ -0,0 +1 @@
+# Per-domain API routers, mounted by app.main according to the feature flags in app.config
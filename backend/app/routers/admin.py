@@ -0,0 +1,371 @@
+"""Core admin endpoints (users, apartments, applications, broadcasts)."""
+
+from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from .. import models, schemas, crud, push, search, config, purge, user_deletion
+from ..database import get_db
+from ..auth import get_current_user
+from ..dependencies import require_admin
+from ..emailer import send_email
+from ..pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from ..responses import fast_json
+
+router = APIRouter()
+
+
+def _like_prefix(text: str) -> str:
+    """`text%` for LIKE, with LIKE's wildcards in `text` escaped."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+@router.get('/admin/users', response_model=list[schemas.AdminUserOut])
+def admin_list_users(response: Response, q: str | None = None, limit: int | None = None, cursor: str | None = None, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    """Users newest first, with their apartment/application/job counts.
+
+    `q` matches the start of the email or the full name, case-insensitively.
+    Without `limit` or `cursor` every match comes back (the Admin page loads the
+    list that way); otherwise pages of `limit` with the next cursor in X-Next-Cursor.
+    """
+    require_admin(current_user)
+    paged = limit is not None or cursor is not None
+    limit = min(max(int(limit or 100), 1), 200)
+    U = models.User
+    qry = db.query(U.id, U.email, U.full_name, U.is_admin)
+    term = (q or '').strip().lower()
+    if term:
+        like = _like_prefix(term)
+        qry = qry.filter(or_(func.lower(U.email).like(like, escape='\\'), func.lower(U.full_name).like(like, escape='\\')))
+    if cursor:
+        try:
+            qry = qry.filter(U.id < int(decode_cursor(cursor, 1)[0]))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+    qry = qry.order_by(U.id.desc())
+    rows = (qry.limit(limit) if paged else qry).all()
+
+    counts = crud.user_activity_counts(db, [r.id for r in rows])
+    none = {'apartments_count': 0, 'applications_count': 0, 'jobs_count': 0}
+    out = [{'id': r.id, 'email': r.email, 'full_name': r.full_name, 'is_admin': bool(r.is_admin), **counts.get(r.id, none)} for r in rows]
+    headers = {}
+    if paged and len(out) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(out[-1]['id'])
+    response.headers.update(headers)
+    return fast_json(out, headers)
+
+
+@router.get('/admin/apartments')
+def admin_list_apartments(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    require_admin(current_user)
+    A = models.Apartment
+    rows = (
+        db.query(A.id, A.title, A.description, A.owner_id, models.User.email.label('owner_email'))
+        .outerjoin(models.User, models.User.id == A.owner_id)
+        .order_by(A.id)
+        .all()
+    )
+    return [dict(r._mapping) for r in rows]
+
+
+@router.delete('/admin/users/{user_id}', status_code=202, response_model=schemas.UserDeletionJobOut)
+def admin_delete_user(user_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    """Queue the account's deletion and return the job right away (poll /admin/user-deletions/{id})."""
+    require_admin(current_user)
+    # prevent deleting self
+    if current_user.id == user_id:
+        raise HTTPException(status_code=400, detail='Cannot delete self')
+    u = db.query(models.User).filter(models.User.id == user_id).first()
+    if not u:
+        raise HTTPException(status_code=404, detail='User not found')
+    job = user_deletion.enqueue(db, user_id, current_user.id)
+    db.commit()
+    background_tasks.add_task(user_deletion.run, job.id)
+    return _deletion_job_out(job)
+
+
+@router.get('/admin/user-deletions/{job_id}', response_model=schemas.UserDeletionJobOut)
+def admin_user_deletion(job_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    require_admin(current_user)
+    job = db.query(models.UserDeletionJob).filter(models.UserDeletionJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail='Job not found')
+    return _deletion_job_out(job)
+
+
+def _deletion_job_out(job: models.UserDeletionJob) -> dict:
+    return {
+        'ok': True,
+        'job_id': job.id,
+        'user_id': job.user_id,
+        'status': job.status,
+        'step': job.step,
+        'steps_done': user_deletion.steps_done(job),
+        'steps_total': len(user_deletion.STEPS),
+        'deleted_rows': job.deleted_rows,
+        'error': job.error,
+        'created_at': job.created_at,
+        'updated_at': job.updated_at,
+        'finished_at': job.finished_at,
+    }
+
+
+@router.delete('/admin/apartments/{apartment_id}')
+def admin_delete_apartment(apartment_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    require_admin(current_user)
+    ap = db.query(models.Apartment).filter(models.Apartment.id==apartment_id).first()
+    if not ap:
+        raise HTTPException(status_code=404, detail='Apartment not found')
+    # remove related applications
+    db.query(models.Application).filter(models.Application.apartment_id==apartment_id).delete()
+    search.unindex(db, 'apartment', apartment_id)
+    db.delete(ap)
+    db.commit()
+    return {'ok': True}
+
+
+@router.get('/admin/applications')
+def admin_list_applications(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    require_admin(current_user)
+    A = models.Application
+    rows = (
+        db.query(
+            A.id, A.message, A.status, A.applicant_id, models.User.full_name.label('applicant_name'),
+            A.apartment_id, models.Apartment.title.label('apartment_title'),
+        )
+        .outerjoin(models.User, models.User.id == A.applicant_id)
+        .outerjoin(models.Apartment, models.Apartment.id == A.apartment_id)
+        .order_by(A.id.desc())
+        .all()
+    )
+    return [dict(r._mapping) for r in rows]
+
+
+@router.delete('/admin/applications/{application_id}')
+def admin_delete_application(application_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    require_admin(current_user)
+    a = db.query(models.Application).filter(models.Application.id==application_id).first()
+    if not a:
+        raise HTTPException(status_code=404, detail='Not found')
+    db.delete(a)
+    db.commit()
+    return {'ok': True}
+
+
+@router.post('/admin/clean', status_code=202, response_model=schemas.PurgeJobOut)
+def admin_clean_db(background_tasks: BackgroundTasks, mode: str = 'auto', db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    """Queue deleting every non-admin user and their data; returns the job right away (poll /admin/purges/{id}).
+
+    `mode`: 'chunked' deletes in committed chunks, 'truncate' empties the tables and puts the
+    admins' rows back, 'auto' picks truncate when nearly every row goes. An unfinished
+    job is returned instead of a new one; 409 if it already started in another mode.
+    """
+    require_admin(current_user)
+    if mode not in purge.PURGE_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(purge.PURGE_MODES)}")
+    try:
+        job = purge.enqueue_clean(db, current_user.id, mode)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    db.commit()
+    background_tasks.add_task(purge.run_clean, job.id)
+    return _purge_job_out(job)
+
+
+@router.get('/admin/purges/{job_id}', response_model=schemas.PurgeJobOut)
+def admin_purge(job_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    require_admin(current_user)
+    job = db.query(models.PurgeJob).filter(models.PurgeJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail='Job not found')
+    return _purge_job_out(job)
+
+
+def _purge_job_out(job: models.PurgeJob) -> dict:
+    return {
+        'ok': True,
+        'job_id': job.id,
+        'mode': job.mode,
+        'status': job.status,
+        'step': job.step,
+        'steps_done': purge.steps_done(job),
+        'steps_total': len(purge.STEPS),
+        'deleted_rows': job.deleted_rows,
+        'error': job.error,
+        'created_at': job.created_at,
+        'updated_at': job.updated_at,
+        'finished_at': job.finished_at,
+    }
+
+
+# -----------------------------
+# Moderation queue
+# -----------------------------
+
+# Decisions per bulk request
+MAX_MODERATION_BATCH = 200
+
+_ACTIONS = {'approve': 'approved', 'reject': 'rejected'}
+
+
+def _moderated_types() -> set[str]:
+    """Queue item types whose app is enabled."""
+    types = set()
+    if config.ENABLE_COMMUNITY:
+        types.add('event')
+    if config.ENABLE_JOBS:
+        types.add('job')
+    if config.ENABLE_RESOURCES:
+        types.add('resource')
+    return types
+
+
+@router.get('/admin/moderation-queue', response_model=list[schemas.ModerationItemOut])
+def admin_moderation_queue(response: Response, type: str | None = None, limit: int = 50, cursor: str | None = None, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    """Pending events, jobs and resources merged newest first; next page's cursor in X-Next-Cursor."""
+    require_admin(current_user)
+    limit = min(max(int(limit), 1), 200)
+    types = _moderated_types()
+    if type:
+        requested = {t.strip() for t in type.split(',') if t.strip()}
+        unknown = requested - types
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown type: {', '.join(sorted(unknown))}")
+        types = requested
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, 3)
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+    page = crud.moderation_queue(db, sorted(types), limit=limit, after=after)
+    if len(page) == limit:
+        last = page[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last['created_at'], last['type'], last['id'])
+    return page
+
+
+@router.post('/admin/moderation-queue/decisions', response_model=schemas.ModerationDecisionsOut)
+def admin_moderation_decisions(body: schemas.ModerationDecisionsIn, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    """Approve/reject many items of mixed types in one transaction."""
+    require_admin(current_user)
+    if len(body.items) > MAX_MODERATION_BATCH:
+        raise HTTPException(status_code=400, detail=f'Too many items (max {MAX_MODERATION_BATCH})')
+    types = _moderated_types()
+    for d in body.items:
+        if d.type not in types:
+            raise HTTPException(status_code=400, detail=f'Unknown type: {d.type}')
+        if d.action not in _ACTIONS:
+            raise HTTPException(status_code=400, detail="action must be 'approve' or 'reject'")
+    missing = set(crud.apply_moderation_decisions(db, [(d.type, d.id, _ACTIONS[d.action]) for d in body.items]))
+    db.commit()
+    return {
+        'updated': len({(d.type, d.id) for d in body.items} - missing),
+        'missing': [d for d in body.items if (d.type, d.id) in missing],
+    }
+
+
+@router.post('/admin/email')
+def admin_send_email(payload: schemas.AdminSendEmailRequest, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    require_admin(current_user)
+
+    target = (payload.target or '').strip().lower()
+    subject = (payload.subject or '').strip()
+    message = (payload.message or '').strip()
+    include_admins = bool(payload.include_admins)
+
+    if target not in {'all', 'user'}:
+        raise HTTPException(status_code=400, detail="target must be 'all' or 'user'")
+    if not subject:
+        raise HTTPException(status_code=400, detail='subject is required')
+    if not message:
+        raise HTTPException(status_code=400, detail='message is required')
+
+    recipients = []
+    if target == 'user':
+        if not payload.user_id:
+            raise HTTPException(status_code=400, detail='user_id is required when target=user')
+        u = db.query(models.User).filter(models.User.id == payload.user_id).first()
+        if not u or not u.email:
+            raise HTTPException(status_code=404, detail='User not found')
+        recipients = [u]
+    else:
+        q = db.query(models.User)
+        if not include_admins:
+            q = q.filter(models.User.is_admin == False)  # noqa: E712
+        recipients = q.all()
+
+    # Guardrail: avoid accidentally blasting huge lists
+    if len(recipients) > 500:
+        raise HTTPException(status_code=400, detail='Too many recipients (max 500)')
+
+    sent = 0
+    failed = 0
+    for u in recipients:
+        try:
+            ok = send_email(u.email, subject, message)
+            if ok:
+                sent += 1
+            else:
+                failed += 1
+        except Exception as e:
+            failed += 1
+            print(f"[admin-email] failed to send to {getattr(u, 'email', None)}: {e}")
+
+    return {'ok': True, 'sent': sent, 'failed': failed}
+
+
+@router.post('/admin/notifications')
+def admin_send_notification(payload: schemas.AdminSendNotificationRequest, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    require_admin(current_user)
+
+    target = (payload.target or '').strip().lower()
+    title = (payload.title or '').strip()
+    message = (payload.message or '').strip()
+    include_admins = bool(payload.include_admins)
+
+    if target not in {'all', 'user'}:
+        raise HTTPException(status_code=400, detail="target must be 'all' or 'user'")
+    if not message:
+        raise HTTPException(status_code=400, detail='message is required')
+
+    final_message = f"{title}: {message}" if title else message
+
+    recipients = []
+    if target == 'user':
+        if not payload.user_id:
+            raise HTTPException(status_code=400, detail='user_id is required when target=user')
+        u = db.query(models.User).filter(models.User.id == payload.user_id).first()
+        if not u:
+            raise HTTPException(status_code=404, detail='User not found')
+        recipients = [u]
+    else:
+        q = db.query(models.User)
+        if not include_admins:
+            q = q.filter(models.User.is_admin == False)  # noqa: E712
+        recipients = q.all()
+
+    # Guardrail: avoid accidentally blasting huge lists
+    if len(recipients) > 500:
+        raise HTTPException(status_code=400, detail='Too many recipients (max 500)')
+
+    created = 0
+    for u in recipients:
+        n = models.Notification(
+            user_id=u.id,
+            message=final_message,
+            is_read=False,
+            created_at=datetime.utcnow().isoformat(),
+        )
+        db.add(n)
+        created += 1
+
+    db.commit()
+
+    # Best-effort push to each recipient (does not affect API success)
+    for u in recipients:
+        try:
+            push.send_push_to_user(db, u.id, title="Soldier Housing", message=final_message, url="/")
+        except Exception:
+            pass
+    return {'ok': True, 'created': created}
@@ -0,0 +1,438 @@
+"""Community app (mounted only when ENABLE_COMMUNITY is on)."""
+
+from datetime import date, datetime, time, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from .. import models, schemas, pagination, cache, search
+from ..database import get_db, get_read_db
+from ..auth import get_current_user, get_current_reader, create_calendar_token, get_calendar_user
+from ..responses import fast_json
+from ..pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from ..ical import iter_calendar
+from ..dependencies import require_admin
+
+router = APIRouter()
+
+
+def _feed_query(db: Session):
+    """Posts with the author's name joined in, in feed order (pinned first, then newest).
+
+    The order matches ix_community_posts_feed, so a cursor page is an index range scan.
+    """
+    P = models.CommunityPost
+    return (
+        db.query(P.id, P.created_by_user_id, models.User.full_name.label('created_by_name'), P.title, P.body, P.is_pinned, P.created_at, P.comments_count)
+        .outerjoin(models.User, models.User.id == P.created_by_user_id)
+        .order_by(P.is_pinned.desc(), P.created_at.desc(), P.id.desc())
+    )
+
+
+# Default start of the iCal feed window, in days before now
+CALENDAR_LOOKBACK_DAYS = 30
+
+# The hot-feed cache holds this many rows; first-page requests up to this limit slice it
+_HOT_FEED_ROWS = 100
+
+
+def _post_row(r) -> dict:
+    return {
+        'id': r.id,
+        'created_by_user_id': r.created_by_user_id,
+        'created_by_name': r.created_by_name,
+        'title': r.title,
+        'body': r.body,
+        'is_pinned': bool(r.is_pinned),
+        'created_at': r.created_at,
+        'comments_count': int(r.comments_count or 0),
+    }
+
+
+def _set_next_cursor(response: Response, page: list[dict], limit: int) -> dict[str, str]:
+    """Put a full page's cursor on `response`; returns the headers set, for fast_json."""
+    headers = {}
+    if len(page) == limit:
+        last = page[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last['is_pinned'], last['created_at'], last['id'])
+    response.headers.update(headers)
+    return headers
+
+
+def _feed_page(qry, *, limit: int, skip: int, cursor: str | None) -> list[dict]:
+    P = models.CommunityPost
+    if cursor:
+        try:
+            qry = qry.filter(pagination.after([P.is_pinned, P.created_at, P.id], decode_cursor(cursor, 3)))
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+    elif skip:
+        qry = qry.offset(skip)
+    return [_post_row(r) for r in qry.limit(limit).all()]
+
+
+@router.get('/community/posts', response_model=list[schemas.CommunityPostOut])
+def community_list_posts(response: Response, skip: int = 0, limit: int = 50, q: str | None = None, cursor: str | None = None, db: Session = Depends(get_read_db), current_user=Depends(get_current_reader)):
+    limit = min(max(int(limit or 50), 1), 100)
+    skip = max(int(skip or 0), 0)
+
+    s = (q or '').strip()
+    if not s and not cursor and not skip:
+        # Everyone's first page is the same: serve it from the shared cache.
+        # The feed has no per-user fields yet; any would be overlaid on these rows here.
+        rows = cache.hot_feed.get(lambda: [_post_row(r) for r in _feed_query(db).limit(_HOT_FEED_ROWS).all()])
+        page = rows[:limit]
+        return fast_json(page, _set_next_cursor(response, page, limit))
+
+    qry = _feed_query(db)
+    if s:
+        like = f"%{s}%"
+        qry = qry.filter(or_(models.CommunityPost.title.ilike(like), models.CommunityPost.body.ilike(like)))
+    page = _feed_page(qry, limit=limit, skip=skip, cursor=cursor)
+    return fast_json(page, _set_next_cursor(response, page, limit))
+
+
+@router.post('/community/posts', response_model=schemas.CommunityPostOut)
+def community_create_post(body: schemas.CommunityPostCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    text_body = (body.body or '').strip()
+    title = (body.title or '').strip() or None
+    if not text_body:
+        raise HTTPException(status_code=400, detail='body is required')
+    if len(text_body) > 5000:
+        raise HTTPException(status_code=400, detail='body too long')
+
+    post = models.CommunityPost(created_by_user_id=current_user.id, title=title, body=text_body, is_pinned=False)
+    db.add(post)
+    db.flush()
+    search.index(db, post)
+    db.commit()
+    cache.hot_feed.invalidate()
+    db.refresh(post)
+    return {
+        'id': post.id,
+        'created_by_user_id': post.created_by_user_id,
+        'created_by_name': current_user.full_name,
+        'title': post.title,
+        'body': post.body,
+        'is_pinned': bool(getattr(post, 'is_pinned', False)),
+        'created_at': post.created_at,
+        'comments_count': 0,
+    }
+
+
+@router.get('/community/posts/{post_id}/comments', response_model=list[schemas.CommunityCommentOut])
+def community_list_comments(post_id: int, response: Response, limit: int | None = None, cursor: str | None = None, order: str = 'oldest', db: Session = Depends(get_read_db), current_user=Depends(get_current_reader)):
+    """A post's comments; the whole thread unless `limit` or `cursor` asks for a page."""
+    if order not in ('oldest', 'newest'):
+        raise HTTPException(status_code=400, detail="order must be 'oldest' or 'newest'")
+    paged = limit is not None or cursor is not None
+    limit = min(max(int(limit or 100), 1), 200)
+    post_exists = db.query(models.CommunityPost.id).filter(models.CommunityPost.id == post_id).first()
+    if not post_exists:
+        raise HTTPException(status_code=404, detail='Not found')
+
+    C = models.CommunityComment
+    descending = order == 'newest'
+    qry = (
+        db.query(C.id, C.post_id, C.created_by_user_id, models.User.full_name.label('created_by_name'), C.body, C.created_at)
+        .outerjoin(models.User, models.User.id == C.created_by_user_id)
+        .filter(C.post_id == post_id)
+    )
+    if cursor:
+        try:
+            qry = qry.filter(pagination.after([C.created_at, C.id], decode_cursor(cursor, 2), descending=descending))
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+    if descending:
+        qry = qry.order_by(C.created_at.desc(), C.id.desc())
+    else:
+        qry = qry.order_by(C.created_at.asc(), C.id.asc())
+    if not paged:
+        return fast_json([dict(r._mapping) for r in qry.all()])
+    rows = qry.limit(limit).all()
+    headers = {}
+    if len(rows) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    response.headers.update(headers)
+    return fast_json([dict(r._mapping) for r in rows], headers)
+
+
+@router.post('/community/posts/{post_id}/comments', response_model=schemas.CommunityCommentOut)
+def community_add_comment(post_id: int, body: schemas.CommunityCommentCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    post = db.query(models.CommunityPost).filter(models.CommunityPost.id == post_id).first()
+    if not post:
+        raise HTTPException(status_code=404, detail='Not found')
+
+    text_body = (body.body or '').strip()
+    if not text_body:
+        raise HTTPException(status_code=400, detail='body is required')
+    if len(text_body) > 2000:
+        raise HTTPException(status_code=400, detail='body too long')
+
+    c = models.CommunityComment(post_id=post_id, created_by_user_id=current_user.id, body=text_body)
+    db.add(c)
+    # Counter moves in the same transaction as the insert
+    db.query(models.CommunityPost).filter(models.CommunityPost.id == post_id).update(
+        {models.CommunityPost.comments_count: models.CommunityPost.comments_count + 1}, synchronize_session=False
+    )
+    db.commit()
+    cache.hot_feed.invalidate()
+    db.refresh(c)
+    return {
+        'id': c.id,
+        'post_id': c.post_id,
+        'created_by_user_id': c.created_by_user_id,
+        'created_by_name': current_user.full_name,
+        'body': c.body,
+        'created_at': c.created_at,
+    }
+
+
+def _event_window(from_: date | datetime | None, to: date | datetime | None, default_from: datetime) -> tuple[str, str | None]:
+    """ISO string bounds for comparing against CommunityEvent.starts_at (stored as naive ISO text).
+
+    A plain date means midnight (UTC) at the start of that day.
+    """
+
+    def iso(dt: date | datetime) -> str:
+        if not isinstance(dt, datetime):
+            dt = datetime.combine(dt, time.min)
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+        return dt.isoformat()
+
+    lo = iso(from_ if from_ is not None else default_from)
+    hi = iso(to) if to is not None else None
+    if hi is not None and hi < lo:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    return lo, hi
+
+
+def _visible_events(qry, user_id: int, lo: str, hi: str | None):
+    """Approved events plus the user's own, in [lo, hi), by start time.
+
+    The approved arm is a range scan on ix_community_events_status_starts_at.
+    """
+    E = models.CommunityEvent
+    qry = qry.filter(or_(E.status == 'approved', E.created_by_user_id == user_id)).filter(E.starts_at >= lo)
+    if hi is not None:
+        qry = qry.filter(E.starts_at < hi)
+    return qry.order_by(E.starts_at.asc(), E.id.asc())
+
+
+@router.get('/community/events', response_model=list[schemas.CommunityEventOut])
+def community_list_events(
+    response: Response,
+    q: str | None = None,
+    from_: date | datetime | None = Query(None, alias='from'),
+    to: date | datetime | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_reader),
+):
+    """Events in the window by start time; all of them unless `limit` or `cursor` asks for a page.
+
+    Pages hold `limit` events (default 200, max 500), keyed on (starts_at, id), with
+    the next page's cursor in X-Next-Cursor.
+    """
+    paged = limit is not None or cursor is not None
+    limit = min(max(int(limit or 200), 1), 500)
+    # Upcoming only by default (today's events included)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    lo, hi = _event_window(from_, to, today)
+    E = models.CommunityEvent
+    qry = db.query(
+        E.id, E.created_by_user_id, models.User.full_name.label('created_by_name'), E.title, E.description,
+        E.location, E.starts_at, E.status, E.created_at,
+    ).outerjoin(models.User, models.User.id == E.created_by_user_id)
+    s = (q or '').strip()
+    if s:
+        like = f"%{s}%"
+        qry = qry.filter(
+            or_(
+                E.title.ilike(like),
+                E.description.ilike(like),
+                E.location.ilike(like),
+            )
+        )
+    if cursor:
+        try:
+            qry = qry.filter(pagination.after([E.starts_at, E.id], decode_cursor(cursor, 2), descending=False))
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+    qry = _visible_events(qry, current_user.id, lo, hi)
+    if not paged:
+        return fast_json([dict(r._mapping) for r in qry.all()])
+    rows = qry.limit(limit).all()
+    headers = {}
+    if len(rows) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].starts_at, rows[-1].id)
+    response.headers.update(headers)
+    return fast_json([dict(r._mapping) for r in rows], headers)
+
+
+@router.get('/community/events/calendar-url')
+def community_events_calendar_url(request: Request, current_user=Depends(get_current_user)):
+    """Subscription URL for calendar apps; the embedded token only works for the iCal feed."""
+    url = request.url_for('community_events_ics').include_query_params(token=create_calendar_token(current_user.email))
+    return {'url': str(url)}
+
+
+@router.get('/community/events.ics', name='community_events_ics')
+def community_events_ics(
+    token: str,
+    from_: date | datetime | None = Query(None, alias='from'),
+    to: date | datetime | None = None,
+    db: Session = Depends(get_read_db),
+):
+    user = get_calendar_user(token, db)
+    if user is None:
+        raise HTTPException(status_code=401, detail='Invalid calendar token')
+    # Calendar apps re-poll the whole feed: keep it to a recent window by default
+    lo, hi = _event_window(from_, to, datetime.utcnow() - timedelta(days=CALENDAR_LOOKBACK_DAYS))
+    E = models.CommunityEvent
+    qry = db.query(E.id, E.title, E.description, E.location, E.starts_at, E.status, E.created_at)
+    rows = _visible_events(qry, user.id, lo, hi).yield_per(500)
+    return StreamingResponse(
+        iter_calendar(rows, name='Soldier Housing community events'),
+        media_type='text/calendar',
+    )
+
+
+@router.post('/community/events', response_model=schemas.CommunityEventOut)
+def community_create_event(body: schemas.CommunityEventCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    title = (body.title or '').strip()
+    if not title:
+        raise HTTPException(status_code=400, detail='title is required')
+    ev = models.CommunityEvent(
+        created_by_user_id=current_user.id,
+        title=title,
+        description=(body.description or None),
+        location=(body.location or None),
+        starts_at=body.starts_at,
+        status='pending',
+    )
+    db.add(ev)
+    db.commit()
+    db.refresh(ev)
+    return {
+        'id': ev.id,
+        'created_by_user_id': ev.created_by_user_id,
+        'created_by_name': current_user.full_name,
+        'title': ev.title,
+        'description': ev.description,
+        'location': ev.location,
+        'starts_at': ev.starts_at,
+        'status': ev.status,
+        'created_at': ev.created_at,
+    }
+
+
+@router.get('/community/users', response_model=list[schemas.CommunityUserOut])
+def community_list_users(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    raise HTTPException(status_code=403, detail='Direct messaging is disabled')
+
+
+@router.get('/community/messages/inbox', response_model=list[schemas.CommunityMessageOut])
+def community_inbox(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    raise HTTPException(status_code=403, detail='Direct messaging is disabled')
+
+
+@router.get('/community/messages/sent', response_model=list[schemas.CommunityMessageOut])
+def community_sent(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    raise HTTPException(status_code=403, detail='Direct messaging is disabled')
+
+
+@router.post('/community/messages', response_model=schemas.CommunityMessageOut)
+def community_send_message(body: schemas.CommunityMessageSendIn, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    raise HTTPException(status_code=403, detail='Direct messaging is disabled')
+
+
+@router.post('/community/messages/{message_id}/read')
+def community_mark_message_read(message_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    raise HTTPException(status_code=403, detail='Direct messaging is disabled')
+
+
+@router.get('/admin/community/posts', response_model=list[schemas.CommunityPostOut])
+def admin_community_posts(response: Response, limit: int = 200, cursor: str | None = None, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    require_admin(current_user)
+    limit = min(max(int(limit), 1), 200)
+    page = _feed_page(_feed_query(db), limit=limit, skip=0, cursor=cursor)
+    _set_next_cursor(response, page, limit)
+    return page
+
+
+@router.get('/admin/community/events', response_model=list[schemas.CommunityEventOut])
+def admin_community_events(status: str | None = None, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    require_admin(current_user)
+    q = db.query(models.CommunityEvent, models.User.full_name).outerjoin(models.User, models.User.id == models.CommunityEvent.created_by_user_id)
+    if status:
+        q = q.filter(models.CommunityEvent.status == status)
+    events = q.order_by(models.CommunityEvent.created_at.desc(), models.CommunityEvent.id.desc()).all()
+    out = []
+    for ev, created_by_name in events:
+        out.append({
+            'id': ev.id,
+            'created_by_user_id': ev.created_by_user_id,
+            'created_by_name': created_by_name,
+            'title': ev.title,
+            'description': ev.description,
+            'location': ev.location,
+            'starts_at': ev.starts_at,
+            'status': ev.status,
+            'created_at': ev.created_at,
+        })
+    return out
+
+
+@router.post('/admin/community/events/{event_id}/approve')
+def admin_approve_event(event_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    require_admin(current_user)
+    ev = db.query(models.CommunityEvent).filter(models.CommunityEvent.id == event_id).first()
+    if not ev:
+        raise HTTPException(status_code=404, detail='Not found')
+    ev.status = 'approved'
+    db.add(ev)
+    db.commit()
+    return {'ok': True}
+
+
+@router.post('/admin/community/events/{event_id}/reject')
+def admin_reject_event(event_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    require_admin(current_user)
+    ev = db.query(models.CommunityEvent).filter(models.CommunityEvent.id == event_id).first()
+    if not ev:
+        raise HTTPException(status_code=404, detail='Not found')
+    ev.status = 'rejected'
+    db.add(ev)
+    db.commit()
+    return {'ok': True}
+
+
+@router.post('/admin/community/posts/{post_id}/pin')
+def admin_pin_post(post_id: int, body: dict, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    require_admin(current_user)
+    post = db.query(models.CommunityPost).filter(models.CommunityPost.id == post_id).first()
+    if not post:
+        raise HTTPException(status_code=404, detail='Not found')
+    is_pinned = bool(body.get('is_pinned')) if isinstance(body, dict) else False
+    post.is_pinned = is_pinned
+    db.add(post)
+    db.commit()
+    cache.hot_feed.invalidate()
+    return {'ok': True}
+
+
+@router.delete('/admin/community/posts/{post_id}')
+def admin_delete_post(post_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    require_admin(current_user)
+    post = db.query(models.CommunityPost).filter(models.CommunityPost.id == post_id).first()
+    if not post:
+        raise HTTPException(status_code=404, detail='Not found')
+    db.query(models.CommunityComment).filter(models.CommunityComment.post_id == post_id).delete(synchronize_session=False)
+    search.unindex(db, 'post', post_id)
+    db.delete(post)
+    db.commit()
+    cache.hot_feed.invalidate()
+    return {'ok': True}
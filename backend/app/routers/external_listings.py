@@ -0,0 +1,180 @@
+"""External (yad2/facebook) listings and contact requests."""
+
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session
+from .. import models, schemas, crud
+from ..database import get_db, get_read_db
+from ..auth import get_current_user, get_current_reader
+from ..responses import fast_json
+from ..pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+
+router = APIRouter()
+
+
+def _listing_out(listing: models.ExternalListing, is_interested: bool) -> dict:
+    return {
+        'id': listing.id,
+        'created_by_user_id': listing.created_by_user_id,
+        'source': listing.source,
+        'url': listing.url,
+        'title': listing.title,
+        'price': listing.price,
+        'location': listing.location,
+        'notes': listing.notes,
+        'created_at': listing.created_at,
+        'interest_count': int(listing.interest_count or 0),
+        'is_interested': is_interested,
+    }
+
+
+@router.post('/external-listings', response_model=schemas.ExternalListingOut)
+def create_external_listing(body: schemas.ExternalListingCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    if not body.url or not str(body.url).strip():
+        raise HTTPException(status_code=400, detail='URL is required')
+    if not body.source or str(body.source).strip().lower() not in {'yad2', 'facebook', 'other'}:
+        raise HTTPException(status_code=400, detail='Invalid source')
+    listing, created = crud.create_external_listing(db, current_user.id, body)
+    if created:
+        return _listing_out(listing, False)
+    # Same post pasted again (different tracking params etc.): hand back the original
+    return _listing_out(listing, bool(crud.get_user_interests_map(db, current_user.id, [listing.id])))
+
+
+@router.get('/external-listings', response_model=schemas.ExternalListingListOut)
+def list_external_listings(skip: int = 0, limit: int = 20, q: str | None = None, cursor: str | None = None, db: Session = Depends(get_read_db), current_user = Depends(get_current_reader)):
+    limit = min(max(int(limit), 1), 100)
+    skip = max(int(skip), 0)
+    after = None
+    if cursor:
+        try:
+            created_at, listing_id = decode_cursor(cursor, 2)
+            after = (created_at, UUID(str(listing_id)))
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+    items, total, capped = crud.list_external_listings(db, skip=skip, limit=limit, search=q, after=after)
+    ids = [i.id for i in items]
+    interested_set = crud.get_user_interests_map(db, current_user.id, ids) if current_user else set()
+    out = [_listing_out(i, i.id in interested_set) for i in items]
+    next_cursor = encode_cursor(items[-1].created_at, items[-1].id) if len(items) == limit else None
+    return fast_json({'items': out, 'total': int(total), 'total_capped': capped, 'next_cursor': next_cursor})
+
+
+@router.get('/external-listings/lookup', response_model=schemas.ExternalListingOut)
+def lookup_external_listing(url: str, db: Session = Depends(get_read_db), current_user = Depends(get_current_reader)):
+    if not url.strip():
+        raise HTTPException(status_code=400, detail='URL is required')
+    listing = crud.get_external_listing_by_url(db, url)
+    if not listing:
+        raise HTTPException(status_code=404, detail='Not found')
+    return _listing_out(listing, bool(crud.get_user_interests_map(db, current_user.id, [listing.id])))
+
+
+@router.get('/external-listings/{listing_id}', response_model=schemas.ExternalListingOut)
+def get_external_listing(listing_id: UUID, db: Session = Depends(get_read_db), current_user = Depends(get_current_reader)):
+    listing = crud.get_external_listing(db, listing_id)
+    if not listing:
+        raise HTTPException(status_code=404, detail='Not found')
+    return _listing_out(listing, bool(crud.get_user_interests_map(db, current_user.id, [listing.id])))
+
+
+@router.post('/external-listings/{listing_id}/interest')
+def add_external_interest(listing_id: UUID, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    listing = crud.get_external_listing(db, listing_id)
+    if not listing:
+        raise HTTPException(status_code=404, detail='Not found')
+    count = crud.add_interest(db, listing_id, current_user.id)
+    return {'ok': True, 'interest_count': count}
+
+
+@router.delete('/external-listings/{listing_id}/interest')
+def remove_external_interest(listing_id: UUID, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    listing = crud.get_external_listing(db, listing_id)
+    if not listing:
+        raise HTTPException(status_code=404, detail='Not found')
+    count = crud.remove_interest(db, listing_id, current_user.id)
+    return {'ok': True, 'interest_count': count}
+
+
+@router.post('/contact-requests', response_model=schemas.ContactRequestOut)
+def create_contact_request(body: schemas.ContactRequestCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    try:
+        cr = crud.create_contact_request(db, current_user.id, body.target_user_id, body.listing_id, requester=current_user)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return cr
+
+
+@router.get('/contact-requests/incoming', response_model=list[schemas.IncomingContactRequestOut])
+def incoming_contact_requests(response: Response, limit: int | None = None, cursor: str | None = None, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    """Pending requests to the current user, newest first.
+
+    Without `limit` or `cursor` the whole inbox comes back, as the frontend expects;
+    otherwise pages of `limit` (default 50, max 100) with the next cursor in X-Next-Cursor.
+    """
+    if limit is None and cursor is None:
+        return [dict(r._mapping) for r in crud.list_incoming_contact_requests(db, current_user.id, limit=None)]
+    limit = min(max(int(limit or 50), 1), 100)
+    after = None
+    if cursor:
+        try:
+            created_at, request_id = decode_cursor(cursor, 2)
+            after = (created_at, UUID(str(request_id)))
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+    rows = crud.list_incoming_contact_requests(db, current_user.id, limit=limit, after=after)
+    if len(rows) == limit:
+        # The body stays a plain list for existing clients; the next page is in a header
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return [dict(r._mapping) for r in rows]
+
+
+@router.post('/contact-requests/{request_id}/accept', response_model=schemas.ContactRequestOut)
+def accept_contact_request(request_id: UUID, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    try:
+        cr = crud.accept_contact_request(db, request_id, current_user.id)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not cr:
+        raise HTTPException(status_code=404, detail='Not found')
+    return cr
+
+
+@router.post('/contact-requests/{request_id}/decline', response_model=schemas.ContactRequestOut)
+def decline_contact_request(request_id: UUID, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    cr = crud.decline_contact_request(db, request_id, current_user.id)
+    if not cr:
+        raise HTTPException(status_code=404, detail='Not found')
+    return cr
+
+
+@router.get('/contact-requests/{request_id}/contact', response_model=schemas.ContactInfoOut)
+def get_contact_info(request_id: UUID, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    cr = crud.get_contact_request(db, request_id)
+    if not cr:
+        raise HTTPException(status_code=404, detail='Not found')
+    if current_user.id not in {cr.requester_user_id, cr.target_user_id}:
+        raise HTTPException(status_code=403, detail='Not authorized')
+    if cr.status != 'accepted':
+        raise HTTPException(status_code=403, detail='Contact not exchanged')
+
+    requester = db.query(models.User).filter(models.User.id == cr.requester_user_id).first()
+    target = db.query(models.User).filter(models.User.id == cr.target_user_id).first()
+    if not requester or not target:
+        raise HTTPException(status_code=400, detail='User not found')
+    if not getattr(requester, 'phone_verified', False) or not getattr(target, 'phone_verified', False):
+        raise HTTPException(status_code=403, detail='Both users must have verified phone numbers')
+    if not requester.phone_number or not target.phone_number:
+        raise HTTPException(status_code=403, detail='Missing phone number')
+
+    return {
+        'listing_id': cr.listing_id,
+        'requester_user_id': cr.requester_user_id,
+        'target_user_id': cr.target_user_id,
+        'requester_phone_number': requester.phone_number,
+        'target_phone_number': target.phone_number,
+    }
@@ -0,0 +1,224 @@
+"""Apartments, applications and notifications."""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from .. import models, schemas, crud, search
+from ..database import get_db, get_read_db
+from ..auth import get_current_user
+from ..emailer import send_email
+from ..responses import fast_json
+
+router = APIRouter()
+
+
+@router.get("/stats", response_model=schemas.PublicStatsOut)
+def public_stats(db: Session = Depends(get_read_db)):
+    users_count = db.query(models.User).count()
+    posts_count = db.query(models.Apartment).count()
+    return {"users_count": int(users_count), "posts_count": int(posts_count)}
+
+
+@router.post("/apartments", response_model=schemas.ApartmentOut)
+def create_apartment(apartment: schemas.ApartmentCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    ap = crud.create_apartment(db, apartment, owner_id=current_user.id)
+    owner = db.query(models.User).filter(models.User.id == ap.owner_id).first()
+    return {
+        'id': ap.id,
+        'title': ap.title,
+        'description': ap.description,
+        'location': ap.location,
+        'rooms': ap.rooms,
+        'rent': ap.rent,
+        'listing_type': ap.listing_type if hasattr(ap, 'listing_type') else 'offer',
+        'gender': getattr(ap, 'gender', None),
+        'shomer_shabbos': bool(getattr(ap, 'shomer_shabbos', False)),
+        'shomer_kashrut': bool(getattr(ap, 'shomer_kashrut', False)),
+        'opposite_gender_allowed': bool(getattr(ap, 'opposite_gender_allowed', False)),
+        'smoking_allowed': bool(getattr(ap, 'smoking_allowed', False)),
+        'owner_id': ap.owner_id,
+        'owner_name': owner.full_name if owner else None,
+    }
+
+
+@router.get("/apartments", response_model=list[schemas.ApartmentOut])
+def list_apartments(db: Session = Depends(get_read_db)):
+    return fast_json(crud.list_apartment_rows(db))
+
+
+@router.get("/apartments/{apartment_id}", response_model=schemas.ApartmentOut)
+def get_apartment(apartment_id: int, db: Session = Depends(get_read_db)):
+    ap = crud.get_apartment(db, apartment_id)
+    if not ap:
+        raise HTTPException(status_code=404, detail="Not found")
+    owner = db.query(models.User).filter(models.User.id == ap.owner_id).first() if ap.owner_id else None
+    return {
+        'id': ap.id,
+        'title': ap.title,
+        'description': ap.description,
+        'location': ap.location,
+        'rooms': ap.rooms,
+        'rent': ap.rent,
+        'listing_type': ap.listing_type if hasattr(ap, 'listing_type') else 'offer',
+        'gender': getattr(ap, 'gender', None),
+        'shomer_shabbos': bool(getattr(ap, 'shomer_shabbos', False)),
+        'shomer_kashrut': bool(getattr(ap, 'shomer_kashrut', False)),
+        'opposite_gender_allowed': bool(getattr(ap, 'opposite_gender_allowed', False)),
+        'smoking_allowed': bool(getattr(ap, 'smoking_allowed', False)),
+        'owner_id': ap.owner_id,
+        'owner_name': owner.full_name if owner else None,
+    }
+
+
+@router.delete("/apartments/{apartment_id}")
+def delete_apartment(apartment_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    ap = db.query(models.Apartment).filter(models.Apartment.id == apartment_id).first()
+    if not ap:
+        raise HTTPException(status_code=404, detail="Apartment not found")
+    # Only owner (or admin) can delete
+    if (ap.owner_id != current_user.id) and (not getattr(current_user, 'is_admin', False)):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    # Remove related applications first to avoid FK constraint issues
+    db.query(models.Application).filter(models.Application.apartment_id == apartment_id).delete(synchronize_session=False)
+    search.unindex(db, 'apartment', apartment_id)
+    db.delete(ap)
+    db.commit()
+    return {"ok": True}
+
+
+@router.post("/apartments/{apartment_id}/apply", response_model=schemas.ApplicationOut)
+def apply_apartment(apartment_id: int, application: schemas.ApplicationCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    ap = crud.get_apartment(db, apartment_id)
+    if not ap:
+        raise HTTPException(status_code=404, detail="Apartment not found")
+    # prevent owners from applying to their own listing
+    if ap.owner_id and ap.owner_id == current_user.id:
+        raise HTTPException(status_code=400, detail="Cannot apply to your own apartment")
+    # prevent admin users from applying
+    if getattr(current_user, 'is_admin', False):
+        raise HTTPException(status_code=403, detail="Admins cannot apply to apartments")
+    # prevent duplicate applications by same user
+    existing = db.query(models.Application).filter(models.Application.apartment_id==apartment_id, models.Application.applicant_id==current_user.id).first()
+    if existing:
+        raise HTTPException(status_code=400, detail="Already applied to this apartment")
+    a = crud.apply_to_apartment(db, applicant_id=current_user.id, apartment_id=apartment_id, message=application.message)
+    # return richer application output
+    user = crud.get_user_by_email(db, current_user.email)
+
+    # Best-effort email notification to the apartment owner
+    try:
+        owner = db.query(models.User).filter(models.User.id == ap.owner_id).first() if ap.owner_id else None
+        if owner and owner.email:
+            applicant_name = (user.full_name if user and user.full_name else f"User #{current_user.id}")
+            msg = (application.message or "").strip()
+            body = (
+                f"You have a new application for your listing: {ap.title}\n\n"
+                f"From: {applicant_name} ({user.email if user else current_user.email})\n"
+            )
+            if msg:
+                body += f"\nMessage:\n{msg}\n"
+            body += "\nLog in to Soldier Housing to view/manage applications."
+            send_email(owner.email, f"New application for '{ap.title}'", body)
+    except Exception as e:
+        print(f"[email] apply notification failed: {e}")
+
+    return {
+        'id': a.id,
+        'message': a.message,
+        'status': a.status,
+        'applicant_id': a.applicant_id,
+        'applicant_name': user.full_name if user else None,
+        'applicant_phone': None,
+        'apartment_id': a.apartment_id,
+    }
+
+
+@router.get('/apartments/{apartment_id}/applied')
+def apartment_applied(apartment_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    # returns whether the authenticated user has already applied to this apartment
+    a = db.query(models.Application).filter(models.Application.apartment_id==apartment_id, models.Application.applicant_id==current_user.id).first()
+    return {'applied': True if a else False}
+
+
+@router.post('/apartments/applied')
+def apartments_applied(payload: dict, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    # Expect payload: { "ids": [1,2,3] }
+    ids = payload.get('ids') if isinstance(payload, dict) else None
+    if not ids or not isinstance(ids, list):
+        return {'applied': {}}
+    # query for applications by this user for the given apartment ids
+    rows = db.query(models.Application.apartment_id).filter(models.Application.apartment_id.in_(ids), models.Application.applicant_id==current_user.id).all()
+    applied_ids = {r[0] for r in rows}
+    mapping = {i: (i in applied_ids) for i in ids}
+    return {'applied': mapping}
+
+
+@router.get('/owner/applications')
+def owner_applications(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    return crud.list_applications_for_owner(db, current_user.id)
+
+
+@router.post('/applications/{application_id}/accept')
+def accept_application(application_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    a = crud.accept_application(db, application_id, current_user.id)
+    if not a:
+        raise HTTPException(status_code=404, detail='Not found or not authorized')
+
+    # Best-effort email notification to applicant (accepted)
+    try:
+        ap = crud.get_apartment(db, a.apartment_id)
+        applicant = db.query(models.User).filter(models.User.id == a.applicant_id).first() if a.applicant_id else None
+        owner = db.query(models.User).filter(models.User.id == current_user.id).first() if current_user and getattr(current_user, 'id', None) else None
+        if applicant and applicant.email:
+            apt_title = ap.title if ap else f"Apartment #{a.apartment_id}"
+            owner_name = (owner.full_name if owner and owner.full_name else "the owner")
+            body = (
+                f"Good news — your application to '{apt_title}' was accepted.\n\n"
+                f"Accepted by: {owner_name}\n"
+            )
+            if owner and owner.phone:
+                body += f"Owner phone: {owner.phone}\n"
+            body += "\nLog in to Soldier Housing to view full details."
+            send_email(applicant.email, f"Application accepted: '{apt_title}'", body)
+    except Exception as e:
+        print(f"[email] accept notification failed: {e}")
+
+    return {'ok': True}
+
+
+@router.get('/notifications')
+def get_notifications(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    notes = crud.list_notifications(db, current_user.id)
+    return [{'id': n.id, 'message': n.message, 'is_read': n.is_read, 'created_at': n.created_at} for n in notes]
+
+
+@router.post('/notifications/{notification_id}/read')
+def read_notification(notification_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    n = crud.mark_notification_read(db, notification_id, current_user.id)
+    if not n:
+        raise HTTPException(status_code=404, detail='Not found')
+    return {'ok': True}
+
+
+@router.get('/applications/{application_id}', response_model=schemas.ApplicationDetailOut)
+def get_application_detail(application_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    a = crud.get_application(db, application_id)
+    if not a:
+        raise HTTPException(status_code=404, detail='Not found')
+    ap = crud.get_apartment(db, a.apartment_id)
+    applicant = db.query(models.User).filter(models.User.id==a.applicant_id).first() if a.applicant_id else None
+    # fetch owner
+    owner = None
+    if ap and ap.owner_id:
+        owner = db.query(models.User).filter(models.User.id==ap.owner_id).first()
+
+    return {
+        'id': a.id,
+        'message': a.message,
+        'status': a.status,
+        'applicant_id': a.applicant_id,
+        'applicant_name': applicant.full_name if applicant else None,
+        'owner_id': owner.id if owner else None,
+        'owner_name': owner.full_name if owner else None,
+        'apartment_id': a.apartment_id,
+        'apartment_title': ap.title if ap else None,
+    }
@@ -0,0 +1,301 @@
+"""Jobs board app."""
+
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import and_, or_, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from .. import models, schemas, crud, push, pagination, search
+from ..database import get_db, get_read_db
+from ..auth import get_current_user, get_current_reader
+from ..responses import fast_json
+from ..pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from ..salary import PERIODS, salary_columns
+from ..dependencies import require_admin
+
+router = APIRouter()
+
+
+@router.get('/jobs/listings', response_model=list[schemas.JobListingOut])
+def jobs_list_listings(
+    response: Response,
+    q: str | None = None,
+    location: str | None = None,
+    company: str | None = None,
+    min_salary: int | None = None,
+    max_salary: int | None = None,
+    salary_period: str = 'month',
+    limit: int = 100,
+    cursor: str | None = None,
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_reader),
+):
+    """Newest-first page of the board.
+
+    `location` and `company` match case-insensitively on the whole value.
+    `min_salary`/`max_salary` keep jobs whose parsed range overlaps [min, max]
+    for `salary_period`; jobs without a parseable salary are left out then.
+    """
+    limit = min(max(int(limit), 1), 200)
+    if salary_period not in PERIODS:
+        raise HTTPException(status_code=400, detail=f"salary_period must be one of: {', '.join(PERIODS)}")
+    J, S = models.JobListing, models.SavedItem
+    qry = (
+        db.query(
+            J.id, J.created_by_user_id, models.User.full_name.label('created_by_name'), J.title, J.company,
+            J.location, J.description, J.apply_url, J.salary, J.salary_min, J.salary_max, J.salary_period,
+            J.status, J.created_at, S.id.label('save_id'),
+        )
+        .outerjoin(models.User, models.User.id == J.created_by_user_id)
+        .outerjoin(S, and_(S.user_id == current_user.id, S.item_type == 'job', S.item_id == J.id))
+        .filter(or_(J.status == 'approved', J.created_by_user_id == current_user.id))
+    )
+    if (location or '').strip():
+        qry = qry.filter(func.lower(J.location) == location.strip().lower())
+    if (company or '').strip():
+        qry = qry.filter(func.lower(J.company) == company.strip().lower())
+    if min_salary is not None or max_salary is not None:
+        qry = qry.filter(J.salary_period == salary_period)
+        if min_salary is not None:
+            qry = qry.filter(J.salary_max >= min_salary)
+        if max_salary is not None:
+            qry = qry.filter(J.salary_min <= max_salary)
+    s = (q or '').strip()
+    if s:
+        like = f"%{s}%"
+        qry = qry.filter(
+            or_(
+                J.title.ilike(like),
+                J.company.ilike(like),
+                J.location.ilike(like),
+                J.description.ilike(like),
+            )
+        )
+    if cursor:
+        try:
+            qry = qry.filter(pagination.after([J.created_at, J.id], decode_cursor(cursor, 2)))
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+    rows = qry.order_by(J.created_at.desc(), J.id.desc()).limit(limit).all()
+
+    out = []
+    for r in rows:
+        item = dict(r._mapping)
+        item['is_saved'] = item.pop('save_id') is not None
+        out.append(item)
+    headers = {}
+    if len(out) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(out[-1]['created_at'], out[-1]['id'])
+    response.headers.update(headers)
+    return fast_json(out, headers)
+
+
+@router.post('/jobs/listings', response_model=schemas.JobListingOut)
+def jobs_create_listing(body: schemas.JobListingCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    title = (body.title or '').strip()
+    if not title:
+        raise HTTPException(status_code=400, detail='title is required')
+    j = models.JobListing(
+        created_by_user_id=current_user.id,
+        title=title,
+        company=(body.company or None),
+        location=(body.location or None),
+        description=(body.description or None),
+        apply_url=(body.apply_url or None),
+        salary=(body.salary or None),
+        **salary_columns(body.salary),
+        status='pending',
+    )
+    db.add(j)
+    db.commit()
+    db.refresh(j)
+    return {
+        'id': j.id,
+        'created_by_user_id': j.created_by_user_id,
+        'created_by_name': current_user.full_name,
+        'title': j.title,
+        'company': j.company,
+        'location': j.location,
+        'description': j.description,
+        'apply_url': j.apply_url,
+        'salary': j.salary,
+        'salary_min': j.salary_min,
+        'salary_max': j.salary_max,
+        'salary_period': j.salary_period,
+        'status': j.status,
+        'created_at': j.created_at,
+        'is_saved': False,
+    }
+
+
+@router.post('/jobs/listings/{job_id}/save')
+def jobs_save(job_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    j = db.query(models.JobListing).filter(models.JobListing.id == job_id).first()
+    if not j:
+        raise HTTPException(status_code=404, detail='Not found')
+    if j.status != 'approved' and j.created_by_user_id != current_user.id:
+        raise HTTPException(status_code=403, detail='Not authorized')
+    crud.save_item(db, current_user.id, 'job', job_id)
+    db.commit()
+    return {'ok': True}
+
+
+@router.delete('/jobs/listings/{job_id}/save')
+def jobs_unsave(job_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    crud.unsave_items(db, current_user.id, [('job', job_id)])
+    db.commit()
+    return {'ok': True}
+
+
+@router.get('/jobs/saved', response_model=list[schemas.JobListingOut])
+def jobs_saved(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    # Most recently saved first; GET /me/saved pages the same rows
+    return [s['job'] for s in crud.list_saved_items(db, current_user.id, 'job')]
+
+
+@router.post('/jobs/listings/{job_id}/apply', response_model=schemas.JobApplicationOut)
+def jobs_apply(job_id: int, body: schemas.JobApplicationCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    j = db.query(models.JobListing).filter(models.JobListing.id == job_id).first()
+    if not j:
+        raise HTTPException(status_code=404, detail='Not found')
+    if j.status != 'approved' and j.created_by_user_id != current_user.id:
+        raise HTTPException(status_code=403, detail='Not authorized')
+    try:
+        app_row = models.JobApplication(job_id=job_id, user_id=current_user.id, message=(body.message or None))
+        db.add(app_row)
+        db.commit()
+        db.refresh(app_row)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail='Already applied')
+
+    # Notify job poster
+    try:
+        note = models.Notification(
+            user_id=j.created_by_user_id,
+            message=f"New job application for '{j.title}' from {current_user.full_name or current_user.email}",
+            is_read=False,
+            created_at=datetime.utcnow().isoformat(),
+        )
+        db.add(note)
+        db.commit()
+        try:
+            push.send_push_to_user(db, j.created_by_user_id, title="Soldier Housing", message=note.message, url="/jobs")
+        except Exception:
+            pass
+    except Exception:
+        db.rollback()
+
+    return {
+        'id': app_row.id,
+        'job_id': app_row.job_id,
+        'user_id': app_row.user_id,
+        'user_name': current_user.full_name,
+        'message': app_row.message,
+        'created_at': app_row.created_at,
+    }
+
+
+@router.get('/jobs/listings/{job_id}/applications', response_model=list[schemas.JobApplicationOut])
+def jobs_list_applications(job_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    j = db.query(models.JobListing).filter(models.JobListing.id == job_id).first()
+    if not j:
+        raise HTTPException(status_code=404, detail='Not found')
+    if (j.created_by_user_id != current_user.id) and (not getattr(current_user, 'is_admin', False)):
+        raise HTTPException(status_code=403, detail='Not authorized')
+    JA = models.JobApplication
+    rows = (
+        db.query(JA.id, JA.job_id, JA.user_id, models.User.full_name.label('user_name'), JA.message, JA.created_at)
+        .outerjoin(models.User, models.User.id == JA.user_id)
+        .filter(JA.job_id == job_id)
+        .order_by(JA.created_at.desc(), JA.id.desc())
+        .all()
+    )
+    return [dict(r._mapping) for r in rows]
+
+
+@router.get('/jobs/my-applications', response_model=list[schemas.JobApplicationOut])
+def jobs_my_applications(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    apps = (
+        db.query(models.JobApplication)
+        .filter(models.JobApplication.user_id == current_user.id)
+        .order_by(models.JobApplication.created_at.desc(), models.JobApplication.id.desc())
+        .all()
+    )
+    return [
+        {
+            'id': a.id,
+            'job_id': a.job_id,
+            'user_id': a.user_id,
+            'user_name': current_user.full_name,
+            'message': a.message,
+            'created_at': a.created_at,
+        }
+        for a in apps
+    ]
+
+
+@router.get('/admin/jobs/listings', response_model=list[schemas.JobListingOut])
+def admin_jobs_listings(status: str | None = None, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    require_admin(current_user)
+    q = db.query(models.JobListing, models.User.full_name).outerjoin(models.User, models.User.id == models.JobListing.created_by_user_id)
+    if status:
+        q = q.filter(models.JobListing.status == status)
+    listings = q.order_by(models.JobListing.created_at.desc(), models.JobListing.id.desc()).all()
+    out = []
+    for j, created_by_name in listings:
+        out.append({
+            'id': j.id,
+            'created_by_user_id': j.created_by_user_id,
+            'created_by_name': created_by_name,
+            'title': j.title,
+            'company': j.company,
+            'location': j.location,
+            'description': j.description,
+            'apply_url': j.apply_url,
+            'salary': j.salary,
+            'status': j.status,
+            'created_at': j.created_at,
+            'is_saved': False,
+        })
+    return out
+
+
+@router.post('/admin/jobs/listings/{job_id}/approve')
+def admin_approve_job(job_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    require_admin(current_user)
+    j = db.query(models.JobListing).filter(models.JobListing.id == job_id).first()
+    if not j:
+        raise HTTPException(status_code=404, detail='Not found')
+    j.status = 'approved'
+    db.add(j)
+    search.index(db, j)
+    db.commit()
+    return {'ok': True}
+
+
+@router.post('/admin/jobs/listings/{job_id}/reject')
+def admin_reject_job(job_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    require_admin(current_user)
+    j = db.query(models.JobListing).filter(models.JobListing.id == job_id).first()
+    if not j:
+        raise HTTPException(status_code=404, detail='Not found')
+    j.status = 'rejected'
+    db.add(j)
+    search.index(db, j)
+    db.commit()
+    return {'ok': True}
+
+
+@router.delete('/admin/jobs/listings/{job_id}')
+def admin_delete_job(job_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    require_admin(current_user)
+    crud.delete_saves_of(db, 'job', [job_id])
+    db.query(models.JobApplication).filter(models.JobApplication.job_id == job_id).delete(synchronize_session=False)
+    j = db.query(models.JobListing).filter(models.JobListing.id == job_id).first()
+    if not j:
+        raise HTTPException(status_code=404, detail='Not found')
+    search.unindex(db, 'job', job_id)
+    db.delete(j)
+    db.commit()
+    return {'ok': True}
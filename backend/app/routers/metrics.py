@@ -0,0 +1,17 @@
+"""Prometheus scrape endpoint."""
+
+import hmac
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from .. import config, metrics
+
+router = APIRouter()
+
+
+@router.get('/metrics', response_class=PlainTextResponse, include_in_schema=False)
+def metrics_endpoint(request: Request):
+    if config.METRICS_TOKEN:
+        supplied = request.headers.get('authorization') or ''
+        if not hmac.compare_digest(supplied, f'Bearer {config.METRICS_TOKEN}'):
+            raise HTTPException(status_code=401, detail='Not authorized')
+    return PlainTextResponse(metrics.registry.render(), media_type='text/plain; version=0.0.4')
@@ -0,0 +1,38 @@
+"""Web push subscription endpoints."""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from .. import schemas, crud, push
+from ..database import get_db
+from ..auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get('/push/vapid-public-key', response_model=schemas.VapidPublicKeyOut)
+def get_vapid_public_key():
+    key = push.get_vapid_public_key()
+    if not key:
+        raise HTTPException(status_code=503, detail='Push notifications are not configured')
+    return {'public_key': key}
+
+
+@router.post('/push/subscribe')
+def push_subscribe(body: schemas.PushSubscriptionIn, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    try:
+        sub = crud.upsert_push_subscription(
+            db,
+            current_user.id,
+            endpoint=body.endpoint,
+            p256dh=body.keys.p256dh,
+            auth=body.keys.auth,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {'ok': True, 'id': sub.id}
+
+
+@router.post('/push/unsubscribe')
+def push_unsubscribe(body: schemas.PushUnsubscribeIn, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    ok = crud.delete_push_subscription(db, current_user.id, endpoint=body.endpoint)
+    return {'ok': True, 'deleted': bool(ok)}
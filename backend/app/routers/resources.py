@@ -0,0 +1,208 @@
+"""Resources directory app."""
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import and_, or_, func, text
+from sqlalchemy.orm import Session
+from .. import models, schemas, crud, pagination, search
+from ..database import get_db, get_read_db
+from ..auth import get_current_user, get_current_reader
+from ..responses import fast_json
+from ..pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from ..dependencies import require_admin
+
+router = APIRouter()
+
+
+def _visible(qry, user_id: int):
+    """Approved items plus the user's own pending/rejected ones."""
+    R = models.ResourceItem
+    return qry.filter(or_(R.status == 'approved', R.created_by_user_id == user_id))
+
+
+def _search(db: Session, qry, q: str | None):
+    """Word-prefix full-text match on Postgres (GIN index from migration 13), ILIKE elsewhere."""
+
+    s = (q or '').strip()
+    if not s:
+        return qry
+    R = models.ResourceItem
+    if db.get_bind().dialect.name == 'postgresql':
+        tsquery = search.prefix_tsquery(s)
+        if tsquery is None:
+            return qry
+        return qry.filter(
+            text(f"{models.RESOURCE_SEARCH_DOCUMENT} @@ to_tsquery('simple', :resource_query)")
+            .bindparams(resource_query=tsquery)
+        )
+    like = f"%{s}%"
+    return qry.filter(or_(R.title.ilike(like), R.category.ilike(like), R.description.ilike(like), R.url.ilike(like)))
+
+
+@router.get('/resources/items', response_model=list[schemas.ResourceItemOut])
+def resources_list_items(
+    response: Response,
+    category: str | None = None,
+    q: str | None = None,
+    limit: int = 100,
+    cursor: str | None = None,
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_reader),
+):
+    limit = min(max(int(limit), 1), 200)
+    R, S = models.ResourceItem, models.SavedItem
+    qry = (
+        db.query(
+            R.id, R.created_by_user_id, models.User.full_name.label('created_by_name'), R.title, R.category,
+            R.description, R.url, R.status, R.created_at, S.id.label('save_id'),
+        )
+        .outerjoin(models.User, models.User.id == R.created_by_user_id)
+        .outerjoin(S, and_(S.user_id == current_user.id, S.item_type == 'resource', S.item_id == R.id))
+    )
+    if category:
+        qry = qry.filter(R.category == category)
+    qry = _search(db, _visible(qry, current_user.id), q)
+    if cursor:
+        try:
+            qry = qry.filter(pagination.after([R.created_at, R.id], decode_cursor(cursor, 2)))
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+    rows = qry.order_by(R.created_at.desc(), R.id.desc()).limit(limit).all()
+
+    out = []
+    for r in rows:
+        item = dict(r._mapping)
+        item['is_saved'] = item.pop('save_id') is not None
+        out.append(item)
+    headers = {}
+    if len(out) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(out[-1]['created_at'], out[-1]['id'])
+    response.headers.update(headers)
+    return fast_json(out, headers)
+
+
+@router.get('/resources/categories', response_model=list[schemas.ResourceCategoryCount])
+def resources_category_counts(q: str | None = None, db: Session = Depends(get_read_db), current_user=Depends(get_current_reader)):
+    """Items per category among what /resources/items would show for `q` (uncategorized as null)."""
+    R = models.ResourceItem
+    qry = _search(db, _visible(db.query(R.category, func.count(R.id).label('count')), current_user.id), q)
+    rows = qry.group_by(R.category).order_by(func.count(R.id).desc(), R.category.asc()).all()
+    return [{'category': r.category, 'count': int(r.count)} for r in rows]
+
+
+@router.post('/resources/items', response_model=schemas.ResourceItemOut)
+def resources_create_item(body: schemas.ResourceItemCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    title = (body.title or '').strip()
+    if not title:
+        raise HTTPException(status_code=400, detail='title is required')
+    it = models.ResourceItem(
+        created_by_user_id=current_user.id,
+        title=title,
+        category=(body.category or None),
+        description=(body.description or None),
+        url=(body.url or None),
+        status='pending',
+    )
+    db.add(it)
+    db.commit()
+    db.refresh(it)
+    return {
+        'id': it.id,
+        'created_by_user_id': it.created_by_user_id,
+        'created_by_name': current_user.full_name,
+        'title': it.title,
+        'category': it.category,
+        'description': it.description,
+        'url': it.url,
+        'status': it.status,
+        'created_at': it.created_at,
+        'is_saved': False,
+    }
+
+
+@router.post('/resources/items/{resource_id}/save')
+def resources_save(resource_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    it = db.query(models.ResourceItem).filter(models.ResourceItem.id == resource_id).first()
+    if not it:
+        raise HTTPException(status_code=404, detail='Not found')
+    # Only approved (or your own) can be saved
+    if it.status != 'approved' and it.created_by_user_id != current_user.id:
+        raise HTTPException(status_code=403, detail='Not authorized')
+    crud.save_item(db, current_user.id, 'resource', resource_id)
+    db.commit()
+    return {'ok': True}
+
+
+@router.delete('/resources/items/{resource_id}/save')
+def resources_unsave(resource_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    crud.unsave_items(db, current_user.id, [('resource', resource_id)])
+    db.commit()
+    return {'ok': True}
+
+
+@router.get('/resources/saved', response_model=list[schemas.ResourceItemOut])
+def resources_saved(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    # Most recently saved first; GET /me/saved pages the same rows
+    return [s['resource'] for s in crud.list_saved_items(db, current_user.id, 'resource')]
+
+
+@router.get('/admin/resources/items', response_model=list[schemas.ResourceItemOut])
+def admin_resources_items(status: str | None = None, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    require_admin(current_user)
+    q = db.query(models.ResourceItem, models.User.full_name).outerjoin(models.User, models.User.id == models.ResourceItem.created_by_user_id)
+    if status:
+        q = q.filter(models.ResourceItem.status == status)
+    items = q.order_by(models.ResourceItem.created_at.desc(), models.ResourceItem.id.desc()).all()
+    out = []
+    for it, created_by_name in items:
+        out.append({
+            'id': it.id,
+            'created_by_user_id': it.created_by_user_id,
+            'created_by_name': created_by_name,
+            'title': it.title,
+            'category': it.category,
+            'description': it.description,
+            'url': it.url,
+            'status': it.status,
+            'created_at': it.created_at,
+            'is_saved': False,
+        })
+    return out
+
+
+@router.post('/admin/resources/items/{resource_id}/approve')
+def admin_approve_resource(resource_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    require_admin(current_user)
+    it = db.query(models.ResourceItem).filter(models.ResourceItem.id == resource_id).first()
+    if not it:
+        raise HTTPException(status_code=404, detail='Not found')
+    it.status = 'approved'
+    db.add(it)
+    search.index(db, it)
+    db.commit()
+    return {'ok': True}
+
+
+@router.post('/admin/resources/items/{resource_id}/reject')
+def admin_reject_resource(resource_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    require_admin(current_user)
+    it = db.query(models.ResourceItem).filter(models.ResourceItem.id == resource_id).first()
+    if not it:
+        raise HTTPException(status_code=404, detail='Not found')
+    it.status = 'rejected'
+    db.add(it)
+    search.index(db, it)
+    db.commit()
+    return {'ok': True}
+
+
+@router.delete('/admin/resources/items/{resource_id}')
+def admin_delete_resource(resource_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    require_admin(current_user)
+    crud.delete_saves_of(db, 'resource', [resource_id])
+    it = db.query(models.ResourceItem).filter(models.ResourceItem.id == resource_id).first()
+    if not it:
+        raise HTTPException(status_code=404, detail='Not found')
+    search.unindex(db, 'resource', resource_id)
+    db.delete(it)
+    db.commit()
+    return {'ok': True}
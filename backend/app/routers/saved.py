@@ -0,0 +1,75 @@
+"""Saved jobs and resources, across both apps."""
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session
+from .. import schemas, crud, config
+from ..database import get_db
+from ..auth import get_current_user
+from ..pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+
+router = APIRouter()
+
+# Toggles per batch request
+MAX_BATCH_ITEMS = 200
+
+
+def _enabled_types() -> set[str]:
+    types = set()
+    if config.ENABLE_JOBS:
+        types.add('job')
+    if config.ENABLE_RESOURCES:
+        types.add('resource')
+    return types
+
+
+@router.get('/me/saved', response_model=list[schemas.SavedItemOut])
+def my_saved(response: Response, type: str | None = None, limit: int = 50, cursor: str | None = None, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    """Newest saves first, each with its item; the next page's cursor is in X-Next-Cursor."""
+    limit = min(max(int(limit), 1), 200)
+    enabled = _enabled_types()
+    if type is not None and type not in enabled:
+        raise HTTPException(status_code=400, detail=f"type must be one of: {', '.join(sorted(enabled))}")
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, 2)
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+    if type is None and len(enabled) < len(crud.SAVED_ITEM_TYPES):
+        # One app is off: list only the other's saves
+        type = next(iter(enabled), None)
+        if type is None:
+            return []
+    page = crud.list_saved_items(db, current_user.id, type, limit=limit, after=after)
+    if len(page) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(page[-1]['saved_at'], page[-1]['save_id'])
+    return page
+
+
+@router.post('/me/saved/batch', response_model=schemas.SavedBatchOut)
+def my_saved_batch(body: schemas.SavedBatchIn, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    """Apply many save/unsave toggles in one transaction.
+
+    `saved` counts new saves only; an item listed as both saved and unsaved is a 400.
+    """
+    if len(body.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f'Too many items (max {MAX_BATCH_ITEMS})')
+    enabled = _enabled_types()
+    unknown = sorted({t.type for t in body.items} - enabled)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown type: {', '.join(unknown)}")
+
+    to_save = [(t.type, t.id) for t in body.items if t.saved]
+    to_unsave = [(t.type, t.id) for t in body.items if not t.saved]
+    conflicting = sorted(set(to_save) & set(to_unsave))
+    if conflicting:
+        listed = ', '.join(f'{t}:{i}' for t, i in conflicting)
+        raise HTTPException(status_code=400, detail=f'Items both saved and unsaved: {listed}')
+    saved, skipped = crud.save_items(db, current_user.id, to_save)
+    unsaved = crud.unsave_items(db, current_user.id, to_unsave)
+    db.commit()
+    return {
+        'saved': saved,
+        'unsaved': int(unsaved),
+        'skipped': [{'type': t, 'id': i, 'saved': True} for t, i in skipped],
+    }
@@ -0,0 +1,30 @@
+"""Cross-app search (see app/search.py)."""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from .. import schemas, search
+from ..database import get_read_db
+from ..auth import get_current_reader
+from ..responses import fast_json
+
+router = APIRouter()
+
+
+@router.get('/search', response_model=list[schemas.SearchResultOut])
+def search_all(q: str, type: str | None = None, limit: int = 20, skip: int = 0, db: Session = Depends(get_read_db), current_user=Depends(get_current_reader)):
+    """Ranked matches across the apps. `type` narrows to a comma-separated subset of search.DOC_TYPES."""
+    s = (q or '').strip()
+    if not s:
+        raise HTTPException(status_code=400, detail='q is required')
+    limit = min(max(int(limit), 1), 50)
+    skip = max(int(skip), 0)
+    types = search.enabled_types()
+    if type:
+        requested = [t.strip() for t in type.split(',') if t.strip()]
+        unknown = [t for t in requested if t not in search.DOC_TYPES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown type: {', '.join(unknown)}")
+        types = [t for t in types if t in requested]
+    if not types:
+        return []
+    return fast_json(search.search(db, s, types=types, limit=limit, skip=skip))
@@ -0,0 +1,202 @@
+"""Auth and profile endpoints."""
+
+import time
+import hmac
+import hashlib
+import secrets
+from datetime import timedelta
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.orm import Session
+from .. import schemas, crud, config
+from ..database import get_db
+from ..auth import create_access_token, get_current_user
+from ..dependencies import rate_limiter, get_client_ip
+from ..emailer import send_password_reset_code
+
+router = APIRouter()
+
+
+@router.post("/auth/register", response_model=schemas.UserOut)
+def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    existing = crud.get_user_by_email(db, user.email)
+    if existing:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    new = crud.create_user(db, user)
+    return new
+
+
+@router.post("/auth/token", response_model=schemas.Token)
+def login_for_access_token(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    ip = get_client_ip(request)
+    email = (form_data.username or '').strip().lower()
+
+    ok, retry_after = rate_limiter.hit(f'auth:token:ip:{ip}', limit=8, window_seconds=60)
+    if not ok:
+        raise HTTPException(
+            status_code=429,
+            detail='Too many login attempts. Please try again shortly.',
+            headers={'Retry-After': str(retry_after)},
+        )
+
+    if email:
+        ok2, retry_after2 = rate_limiter.hit(f'auth:token:email:{email}', limit=10, window_seconds=600)
+        if not ok2:
+            raise HTTPException(
+                status_code=429,
+                detail='Too many login attempts for this account. Please try again later.',
+                headers={'Retry-After': str(retry_after2)},
+            )
+
+    user = crud.authenticate_user(db, form_data.username, form_data.password)
+    if not user:
+        # Small jittered delay to slow brute forcing even if attacker rotates IPs.
+        time.sleep(0.25 + (secrets.randbelow(250) / 1000.0))
+        raise HTTPException(status_code=400, detail="Incorrect username or password")
+
+    # Successful login: clear account-specific limiter to reduce user friction.
+    if email:
+        rate_limiter.reset(f'auth:token:email:{email}')
+    access_token = create_access_token(data={"sub": user.email})
+    return {"access_token": access_token, "token_type": "bearer"}
+
+
+def _reset_code_hash(code: str) -> str:
+    key = (config.SECRET_KEY or "devsecret").encode("utf-8")
+    msg = (code or "").encode("utf-8")
+    return hmac.new(key, msg, hashlib.sha256).hexdigest()
+
+
+@router.post("/auth/forgot-password")
+def forgot_password(request: Request, body: schemas.ForgotPasswordRequest, db: Session = Depends(get_db)):
+    ip = get_client_ip(request)
+    ok, retry_after = rate_limiter.hit(f'auth:forgot:ip:{ip}', limit=5, window_seconds=60)
+    if not ok:
+        raise HTTPException(status_code=429, detail='Too many requests. Please try again shortly.', headers={'Retry-After': str(retry_after)})
+
+    email = (body.email or '').strip().lower()
+    if email:
+        ok2, retry_after2 = rate_limiter.hit(f'auth:forgot:email:{email}', limit=5, window_seconds=600)
+        if not ok2:
+            raise HTTPException(status_code=429, detail='Too many requests. Please try again later.', headers={'Retry-After': str(retry_after2)})
+
+    # Always return ok to avoid user enumeration
+    user = crud.get_user_by_email(db, body.email)
+    if user:
+        code = str(secrets.randbelow(1_000_000)).zfill(6)
+        user.reset_code_hash = _reset_code_hash(code)
+        user.reset_code_expires_at = int(time.time()) + (10 * 60)
+        db.add(user)
+        db.commit()
+
+        # Best-effort email (Resend only; logs on failure)
+        send_password_reset_code(body.email, code)
+    return {"ok": True}
+
+
+@router.post("/auth/verify-reset-code", response_model=schemas.VerifyResetCodeResponse)
+def verify_reset_code(request: Request, body: schemas.VerifyResetCodeRequest, db: Session = Depends(get_db)):
+    ip = get_client_ip(request)
+    ok, retry_after = rate_limiter.hit(f'auth:verify-reset:ip:{ip}', limit=10, window_seconds=60)
+    if not ok:
+        raise HTTPException(status_code=429, detail='Too many attempts. Please try again shortly.', headers={'Retry-After': str(retry_after)})
+
+    email = (body.email or '').strip().lower()
+    if email:
+        ok2, retry_after2 = rate_limiter.hit(f'auth:verify-reset:email:{email}', limit=10, window_seconds=600)
+        if not ok2:
+            raise HTTPException(status_code=429, detail='Too many attempts. Please try again later.', headers={'Retry-After': str(retry_after2)})
+
+    user = crud.get_user_by_email(db, body.email)
+    now = int(time.time())
+    if (not user) or (not user.reset_code_hash) or (not user.reset_code_expires_at) or (now > int(user.reset_code_expires_at)):
+        raise HTTPException(status_code=400, detail="Invalid or expired code")
+
+    code = (body.code or "").strip()
+    if len(code) != 6 or not code.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid or expired code")
+
+    if not hmac.compare_digest(user.reset_code_hash, _reset_code_hash(code)):
+        time.sleep(0.15 + (secrets.randbelow(200) / 1000.0))
+        raise HTTPException(status_code=400, detail="Invalid or expired code")
+
+    # One-time use: clear code once verified, then issue short-lived reset token
+    user.reset_code_hash = None
+    user.reset_code_expires_at = None
+    db.add(user)
+    db.commit()
+
+    reset_token = create_access_token(
+        data={"sub": user.email, "purpose": "password_reset"},
+        expires_delta=timedelta(minutes=10),
+    )
+    return {"reset_token": reset_token}
+
+
+@router.post("/auth/reset-password")
+def reset_password_confirm(body: schemas.ResetPasswordConfirmRequest, db: Session = Depends(get_db)):
+    # Validate reset token
+    from jose import JWTError, jwt
+    try:
+        payload = jwt.decode(body.reset_token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
+        email = payload.get("sub")
+        purpose = payload.get("purpose")
+        if not email or purpose != "password_reset":
+            raise HTTPException(status_code=400, detail="Invalid reset token")
+    except JWTError:
+        raise HTTPException(status_code=400, detail="Invalid reset token")
+
+    new_password = body.new_password or ""
+    if len(new_password) < 6:
+        raise HTTPException(status_code=400, detail="Password too short")
+
+    user = crud.get_user_by_email(db, email)
+    if not user:
+        raise HTTPException(status_code=400, detail="Invalid reset token")
+
+    crud.set_user_password(db, user, new_password)
+    return {"ok": True}
+
+
+@router.get("/users/me", response_model=schemas.UserOut)
+def read_users_me(current_user = Depends(get_current_user)):
+    return current_user
+
+
+@router.get('/users/me/phone', response_model=schemas.MyPhoneOut)
+def get_my_phone(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    data = crud.get_my_phone(db, current_user.id)
+    if not data:
+        raise HTTPException(status_code=404, detail='Not found')
+    return data
+
+
+@router.put('/users/me/phone', response_model=schemas.MyPhoneOut)
+def set_my_phone(body: schemas.MyPhoneUpdate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    phone = (body.phone_number or '').strip()
+    if len(phone) < 6:
+        raise HTTPException(status_code=400, detail='Invalid phone number')
+    data = crud.set_my_phone(db, current_user.id, phone)
+    if not data:
+        raise HTTPException(status_code=404, detail='Not found')
+    return data
+
+
+@router.put('/users/me', response_model=schemas.UserOut)
+def update_profile(up: schemas.UserUpdate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    user = crud.get_user_by_email(db, current_user.email)
+    if not user:
+        raise HTTPException(status_code=404, detail='Not found')
+    user = crud.update_user(db, user, up.dict())
+    return user
+
+
+@router.post('/users/me/password')
+def change_password(body: schemas.PasswordChange, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    user = crud.get_user_by_email(db, current_user.email)
+    if not user:
+        raise HTTPException(status_code=404, detail='Not found')
+    updated = crud.change_user_password(db, user, body.current_password, body.new_password)
+    if not updated:
+        raise HTTPException(status_code=400, detail='Current password incorrect')
+    return {'ok': True}
@@ -0,0 +1,136 @@
+"""Structured salaries for job listings.
+
+Posters type salaries free-form ("12,000-15,000 NIS/month", "45 ש"ח לשעה",
+"10k"). `parse_salary` extracts a numeric range and pay period once, when the
+listing is written, so the jobs board can filter on indexed integer columns
+instead of substring-matching the text. The original text is kept for display.
+
+Postings mix pay with other numbers ("40 hours/week, 12000 monthly"), so only
+two amounts joined by "-", "–" or "to" form a range, and an amount next to a
+currency or pay period ("₪", "NIS", "/hour", "monthly") beats a bare one.
+Numbers that count something ("40 hours", "5 days") are never pay.
+`python -m doctest app/salary.py` runs the examples in `parse_salary`.
+"""
+
+import re
+from typing import NamedTuple
+
+PERIODS = ('hour', 'day', 'month', 'year')
+
+# The match nearest the amount, within its clause, wins (see `_period`)
+_PERIOD_PATTERNS = (
+    ('hour', re.compile(r'hour|hourly|\bhr\b|/h\b|לשעה|שעתי|שעה')),
+    ('day', re.compile(r'\bday\b|daily|/d\b|ליום|יומי')),
+    ('month', re.compile(r'month|\bmo\b|/mo\b|לחודש|חודשי|חודש')),
+    ('year', re.compile(r'year|annual|\byr\b|/y\b|לשנה|שנתי')),
+)
+_THOUSANDS_SEP = re.compile(r'(?<=\d)[,\s](?=\d{3}(?!\d))')
+_AMOUNT = re.compile(r'(\d+(?:\.\d+)?)(?:\s*(k\b|אלף))?')
+_CURRENCY = r'(?:₪|\$|€|\bnis\b|\bils\b|shekels?|\busd\b|\beur\b|ש"ח|ש״ח|\bשח\b|שקלים|שקל)'
+_PER_PERIOD = r'(?:/\s*(?:h|hr|hour|d|day|mo|month|y|yr|year)\b|(?:per|an?)\s+(?:hour|day|month|year)\b|hourly|daily|monthly|yearly|annually|ל(?:שעה|יום|חודש|שנה))'
+# What makes an amount pay: a currency or pay period right after it, or a currency right before it
+_PAY_AFTER = re.compile(r'\s*(?:' + _CURRENCY + '|' + _PER_PERIOD + ')')
+_PAY_BEFORE = re.compile(_CURRENCY + r'\s*$')
+# An amount directly followed by one of these counts something ("40 hours", "5 days a week")
+_COUNT_UNIT = re.compile(r'\s*(?:hours?|hrs?|days?|weeks?|months?|years?|yrs?|shifts?|people|%|שעות|ימים|שבועות|חודשים|שנים)(?![a-z])')
+_RANGE_JOIN = re.compile(r'\s*(?:' + _CURRENCY + r'\s*)?(?:-|–|—|to|עד)\s*(?:' + _CURRENCY + r'\s*)?')
+# Period words only apply within the clause holding the amount
+_CLAUSE_BREAK = re.compile(r'[,;|\n(]')
+
+# Without an explicit period, Israeli postings quote hourly rates below this and
+# monthly pay above it; six-figure amounts are annual.
+_HOURLY_BELOW = 300
+_YEARLY_FROM = 120_000
+
+
+class Salary(NamedTuple):
+    min: int
+    max: int
+    period: str
+
+
+def parse_salary(text: str | None) -> Salary | None:
+    """Numeric range and period from free text, or None if it holds no amount.
+
+    >>> parse_salary('12,000-15,000 NIS/month')
+    Salary(min=12000, max=15000, period='month')
+    >>> parse_salary('45 ש"ח לשעה')
+    Salary(min=45, max=45, period='hour')
+    >>> parse_salary('10k')
+    Salary(min=10000, max=10000, period='month')
+    >>> parse_salary('40 hours/week, 12000 monthly')
+    Salary(min=12000, max=12000, period='month')
+    >>> parse_salary('Full time, 5 days a week, 10,000')
+    Salary(min=10000, max=10000, period='month')
+    >>> parse_salary('Ages 18-25, 45 NIS per hour')
+    Salary(min=45, max=45, period='hour')
+    >>> parse_salary('from 40 to 50 an hour')
+    Salary(min=40, max=50, period='hour')
+    >>> parse_salary('₪9,000 per month for 40 hours a week')
+    Salary(min=9000, max=9000, period='month')
+    >>> parse_salary('3 shifts') is None
+    True
+    """
+
+    s = (text or '').strip().lower()
+    if not s:
+        return None
+    s = _THOUSANDS_SEP.sub('', s)
+    amounts = []  # (value, start, end)
+    counts = []  # spans of "40 hours"-style quantities
+    for m in _AMOUNT.finditer(s):
+        unit = _COUNT_UNIT.match(s, m.end())
+        if unit:
+            counts.append((m.start(), unit.end()))
+            continue
+        value = float(m.group(1)) * (1000 if m.group(2) else 1)
+        if value > 0:
+            amounts.append((int(round(value)), m.start(), m.end()))
+    if not amounts:
+        return None
+
+    def is_pay(amount) -> bool:
+        _, start, end = amount
+        return bool(_PAY_AFTER.match(s, end) or _PAY_BEFORE.search(s, 0, start))
+
+    # Candidates are ranges of two adjacent amounts joined by a dash/"to", then single amounts;
+    # the first one marked as pay wins, else the first one at all
+    ranges = [
+        (a, b) for a, b in zip(amounts, amounts[1:])
+        if _RANGE_JOIN.fullmatch(s, a[2], b[1])
+    ]
+    candidates = ranges + [(a, a) for a in amounts]
+    first, last = next((c for c in candidates if is_pay(c[0]) or is_pay(c[1])), candidates[0])
+    lo, hi = sorted((first[0], last[0]))
+    return Salary(lo, hi, _period(s, first[1], last[2], lo, hi, counts))
+
+
+def _period(s: str, start: int, end: int, lo: int, hi: int, counts: list[tuple[int, int]]) -> str:
+    """Pay period for the amounts at s[start:end]: the nearest period word in their clause, else guessed from size.
+
+    Period words inside `counts` ("40 hours") are quantities, not the pay period.
+    """
+
+    breaks = [m.start() for m in _CLAUSE_BREAK.finditer(s)]
+    clause_start = max([b + 1 for b in breaks if b < start], default=0)
+    clause_end = min([b for b in breaks if b >= end], default=len(s))
+    best = None
+    for period, pattern in _PERIOD_PATTERNS:
+        for m in pattern.finditer(s, clause_start, clause_end):
+            if any(c_start <= m.start() < c_end for c_start, c_end in counts):
+                continue
+            distance = m.start() - end if m.start() >= end else start - m.end()
+            if best is None or distance < best[0]:
+                best = (distance, period)
+    if best is not None:
+        return best[1]
+    return 'hour' if hi < _HOURLY_BELOW else ('year' if lo >= _YEARLY_FROM else 'month')
+
+
+def salary_columns(text: str | None) -> dict:
+    """JobListing column values for `text` (all None when it can't be parsed)."""
+
+    parsed = parse_salary(text)
+    if parsed is None:
+        return {'salary_min': None, 'salary_max': None, 'salary_period': None}
+    return {'salary_min': parsed.min, 'salary_max': parsed.max, 'salary_period': parsed.period}
@@ -0,0 +1,207 @@
+"""Frozen schema of migration 1 (`baseline`).
+
+The tables exactly as they stood when migrations were introduced, i.e. what the
+old startup `create_all` had already built on existing databases. Migration 1
+creates these and nothing else; every later table, column and index belongs to
+the migration that introduced it. Never edit this file: change the models and
+add a migration instead.
+"""
+
+from sqlalchemy import MetaData, Table, Column, Integer, String, Text, Boolean, ForeignKey, BigInteger, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+
+metadata = MetaData()
+
+Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("email", String, unique=True, index=True, nullable=False),
+    Column("full_name", String, nullable=True),
+    Column("phone", String, nullable=True),
+    Column("phone_number", String, nullable=True),
+    Column("phone_verified", Boolean),
+    Column("hashed_password", String, nullable=False),
+    Column("is_admin", Boolean),
+    Column("reset_code_hash", String, nullable=True),
+    Column("reset_code_expires_at", BigInteger, nullable=True),
+)
+
+Table(
+    "apartments", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String, index=True),
+    Column("description", Text),
+    Column("location", String, index=True),
+    Column("rooms", Integer),
+    Column("rent", Integer),
+    Column("listing_type", String, index=True),
+    Column("gender", String, nullable=True),
+    Column("shomer_shabbos", Boolean),
+    Column("shomer_kashrut", Boolean),
+    Column("opposite_gender_allowed", Boolean),
+    Column("smoking_allowed", Boolean),
+    Column("owner_id", Integer, ForeignKey("users.id"), index=True),
+)
+
+Table(
+    "applications", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("message", Text),
+    Column("status", String),
+    Column("applicant_id", Integer, ForeignKey("users.id"), index=True),
+    Column("apartment_id", Integer, ForeignKey("apartments.id"), index=True),
+)
+
+Table(
+    "notifications", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("message", Text),
+    Column("is_read", Boolean),
+    Column("created_at", String, nullable=True),
+)
+
+Table(
+    "push_subscriptions", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("endpoint", String, unique=True, nullable=False),
+    Column("p256dh", String, nullable=False),
+    Column("auth", String, nullable=False),
+    Column("created_at", String),
+)
+
+# External listings
+
+Table(
+    "external_listings", metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("created_by_user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("source", String, nullable=False),
+    Column("url", String, nullable=False),
+    Column("title", String, nullable=True),
+    Column("price", String, nullable=True),
+    Column("location", String, nullable=True),
+    Column("notes", Text, nullable=True),
+    Column("created_at", String, index=True),
+)
+
+Table(
+    "external_listing_interests", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("listing_id", UUID(as_uuid=True), ForeignKey("external_listings.id"), index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("created_at", String),
+    UniqueConstraint("listing_id", "user_id", name="uq_external_interest_listing_user"),
+)
+
+Table(
+    "contact_requests", metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("requester_user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("target_user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("listing_id", UUID(as_uuid=True), ForeignKey("external_listings.id")),
+    Column("status", String),
+    Column("created_at", String),
+)
+
+# Community
+
+Table(
+    "community_posts", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("created_by_user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("title", String, nullable=True),
+    Column("body", Text, nullable=False),
+    Column("is_pinned", Boolean),
+    Column("created_at", String),
+)
+
+Table(
+    "community_comments", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("post_id", Integer, ForeignKey("community_posts.id"), index=True),
+    Column("created_by_user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("body", Text, nullable=False),
+    Column("created_at", String),
+)
+
+Table(
+    "community_events", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("created_by_user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("title", String, nullable=False),
+    Column("description", Text, nullable=True),
+    Column("location", String, nullable=True),
+    Column("starts_at", String, nullable=False),
+    Column("status", String),
+    Column("created_at", String),
+)
+
+Table(
+    "community_messages", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("sender_user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("recipient_user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("body", Text, nullable=False),
+    Column("is_read", Boolean),
+    Column("created_at", String),
+)
+
+# Resources
+
+Table(
+    "resource_items", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("created_by_user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("title", String, nullable=False),
+    Column("category", String, nullable=True, index=True),
+    Column("description", Text, nullable=True),
+    Column("url", String, nullable=True),
+    Column("status", String),
+    Column("created_at", String),
+)
+
+Table(
+    "resource_saves", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("resource_id", Integer, ForeignKey("resource_items.id"), index=True),
+    Column("created_at", String),
+    UniqueConstraint("user_id", "resource_id", name="uq_resource_save_user_resource"),
+)
+
+# Jobs
+
+Table(
+    "job_listings", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("created_by_user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("title", String, nullable=False),
+    Column("company", String, nullable=True),
+    Column("location", String, nullable=True),
+    Column("description", Text, nullable=True),
+    Column("apply_url", String, nullable=True),
+    Column("salary", String, nullable=True),
+    Column("status", String),
+    Column("created_at", String),
+)
+
+Table(
+    "job_saves", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("job_id", Integer, ForeignKey("job_listings.id"), index=True),
+    Column("created_at", String),
+    UniqueConstraint("user_id", "job_id", name="uq_job_save_user_job"),
+)
+
+Table(
+    "job_applications", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("job_id", Integer, ForeignKey("job_listings.id"), index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("message", Text, nullable=True),
+    Column("created_at", String),
+    UniqueConstraint("job_id", "user_id", name="uq_job_application_job_user"),
+)
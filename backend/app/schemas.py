@@ -176,6 +176,10 @@ class ExternalListingOut(BaseModel):
 class ExternalListingListOut(BaseModel):
     items: List[ExternalListingOut]
     total: int
+    # True when total hit the count cap (show "1000+")
+    total_capped: bool = False
+    # Pass back as `cursor` for the next page; null on the last page
+    next_cursor: Optional[str] = None
 
 
 # -----------------------------
@@ -320,6 +324,11 @@ class ResourceItemOut(BaseModel):
     is_saved: bool = False
 
 
+class ResourceCategoryCount(BaseModel):
+    category: Optional[str] = None
+    count: int
+
+
 # -----------------------------
 # Jobs
 # -----------------------------
@@ -344,6 +353,9 @@ class JobListingOut(BaseModel):
     description: Optional[str] = None
     apply_url: Optional[str] = None
     salary: Optional[str] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    salary_period: Optional[str] = None
     status: Optional[str] = None
     created_at: Optional[str] = None
     is_saved: bool = False
@@ -362,6 +374,139 @@ class JobApplicationOut(BaseModel):
     created_at: Optional[str] = None
 
 
+# -----------------------------
+# Admin user directory
+# -----------------------------
+
+
+class AdminUserOut(BaseModel):
+    id: int
+    email: str
+    full_name: Optional[str] = None
+    is_admin: bool = False
+    apartments_count: int = 0
+    applications_count: int = 0
+    jobs_count: int = 0
+
+
+# -----------------------------
+# Background admin jobs
+# -----------------------------
+
+
+class UserDeletionJobOut(BaseModel):
+    ok: bool = True
+    job_id: int
+    user_id: int
+    status: str  # 'queued' | 'running' | 'done' | 'failed'
+    # Step in progress (None once done) and how many of the steps_total are finished
+    step: Optional[str] = None
+    steps_done: int = 0
+    steps_total: int
+    deleted_rows: int = 0
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
+class PurgeJobOut(BaseModel):
+    ok: bool = True
+    job_id: int
+    mode: str  # 'auto' until the run picks 'chunked' or 'truncate'
+    status: str
+    step: Optional[str] = None
+    steps_done: int = 0
+    steps_total: int
+    deleted_rows: int = 0
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
+# -----------------------------
+# Moderation
+# -----------------------------
+
+
+class ModerationItemOut(BaseModel):
+    type: str  # 'event' | 'job' | 'resource'
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    # Type-specific details (null where they don't apply)
+    location: Optional[str] = None
+    starts_at: Optional[str] = None
+    category: Optional[str] = None
+    company: Optional[str] = None
+    url: Optional[str] = None
+    created_by_user_id: Optional[int] = None
+    created_by_name: Optional[str] = None
+    created_at: Optional[str] = None
+
+
+class ModerationDecision(BaseModel):
+    type: str
+    id: int
+    action: str  # 'approve' | 'reject'
+
+
+class ModerationDecisionsIn(BaseModel):
+    items: List[ModerationDecision]
+
+
+class ModerationDecisionsOut(BaseModel):
+    updated: int
+    # Items that no longer exist
+    missing: List[ModerationDecision] = []
+
+
+# -----------------------------
+# Saved items
+# -----------------------------
+
+
+class SavedItemOut(BaseModel):
+    type: str  # 'job' | 'resource'
+    id: int
+    saved_at: Optional[str] = None
+    # Exactly one is set, matching `type`
+    job: Optional[JobListingOut] = None
+    resource: Optional[ResourceItemOut] = None
+
+
+class SavedItemToggle(BaseModel):
+    type: str
+    id: int
+    saved: bool = True
+
+
+class SavedBatchIn(BaseModel):
+    items: List[SavedItemToggle]
+
+
+class SavedBatchOut(BaseModel):
+    saved: int
+    unsaved: int
+    # Items that don't exist or aren't visible to the caller; not saved
+    skipped: List[SavedItemToggle] = []
+
+
+# -----------------------------
+# Search
+# -----------------------------
+
+
+class SearchResultOut(BaseModel):
+    type: str
+    # Id of the item in its own app (a UUID string for external listings)
+    id: str
+    title: Optional[str] = None
+    snippet: Optional[str] = None
+    created_at: Optional[str] = None
+
+
 # -----------------------------
 # Push
 # -----------------------------
@@ -0,0 +1,192 @@
+"""Cross-app search over one document table.
+
+Every publicly visible apartment, external listing, approved job, approved
+resource and community post has a row in `search_documents` (title + body
+text). Writers call `index`/`unindex` in the same transaction as the change
+they make, so `GET /search` is a single indexed query instead of one ILIKE
+scan per app. `python -m app.maintenance rebuild-search` regenerates the table
+from the source rows if it ever drifts.
+
+On Postgres documents are matched and ranked with a weighted tsvector (GIN
+index from migration 17); elsewhere search falls back to ILIKE, title matches
+first.
+"""
+
+import re
+from sqlalchemy import case, func, literal_column, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from . import models, config
+
+DOC_TYPES = ('apartment', 'external_listing', 'job', 'resource', 'post')
+
+SNIPPET_CHARS = 200
+
+
+def _join(*parts) -> str | None:
+    return ' '.join(p.strip() for p in parts if p and str(p).strip()) or None
+
+
+def _apartment(ap: models.Apartment) -> dict:
+    return {'owner_user_id': ap.owner_id, 'title': ap.title, 'body': _join(ap.location, ap.description), 'created_at': None}
+
+
+def _external_listing(listing: models.ExternalListing) -> dict:
+    return {
+        'owner_user_id': listing.created_by_user_id,
+        'title': listing.title or listing.url,
+        'body': _join(listing.location, listing.price, listing.notes, listing.source),
+        'created_at': listing.created_at,
+    }
+
+
+def _job(job: models.JobListing) -> dict | None:
+    if job.status != 'approved':
+        return None
+    return {
+        'owner_user_id': job.created_by_user_id,
+        'title': job.title,
+        'body': _join(job.company, job.location, job.salary, job.description),
+        'created_at': job.created_at,
+    }
+
+
+def _resource(item: models.ResourceItem) -> dict | None:
+    if item.status != 'approved':
+        return None
+    return {'owner_user_id': item.created_by_user_id, 'title': item.title, 'body': _join(item.category, item.description), 'created_at': item.created_at}
+
+
+def _post(post: models.CommunityPost) -> dict:
+    return {
+        'owner_user_id': post.created_by_user_id,
+        'title': post.title or (post.body or '')[:80],
+        'body': post.body,
+        'created_at': post.created_at,
+    }
+
+
+# model -> (doc_type, builder); a builder returns None when the row must not be searchable
+_SOURCES = {
+    models.Apartment: ('apartment', _apartment),
+    models.ExternalListing: ('external_listing', _external_listing),
+    models.JobListing: ('job', _job),
+    models.ResourceItem: ('resource', _resource),
+    models.CommunityPost: ('post', _post),
+}
+
+
+def enabled_types() -> list[str]:
+    """Document types whose app is mounted (others are never returned)."""
+
+    off = set()
+    if not config.ENABLE_COMMUNITY:
+        off.add('post')
+    if not config.ENABLE_JOBS:
+        off.add('job')
+    if not config.ENABLE_RESOURCES:
+        off.add('resource')
+    return [t for t in DOC_TYPES if t not in off]
+
+
+# -----------------------------
+# Maintenance (call before the caller's commit)
+# -----------------------------
+
+def index(db: Session, obj) -> None:
+    """Insert or refresh `obj`'s document, or drop it if `obj` is no longer visible.
+
+    `obj` must be flushed (have its id).
+    """
+    index_many(db, [obj])
+
+
+def index_many(db: Session, objs: list) -> None:
+    """`index` for many rows: one upsert for the visible ones, one delete per type for the rest."""
+
+    D = models.SearchDocument
+    docs, hidden = [], {}
+    for obj in objs:
+        doc_type, build = _SOURCES[type(obj)]
+        doc = build(obj)
+        if doc is None:
+            hidden.setdefault(doc_type, []).append(str(obj.id))
+        else:
+            docs.append({'doc_type': doc_type, 'ref_id': str(obj.id), **doc})
+    for doc_type, ref_ids in hidden.items():
+        db.query(D).filter(D.doc_type == doc_type, D.ref_id.in_(ref_ids)).delete(synchronize_session=False)
+    if docs:
+        dialect = postgresql if db.get_bind().dialect.name == 'postgresql' else sqlite
+        stmt = dialect.insert(D).values(docs)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=['doc_type', 'ref_id'],
+            set_={c: stmt.excluded[c] for c in ('owner_user_id', 'title', 'body', 'created_at')},
+        ))
+
+
+def unindex(db: Session, doc_type: str, ref_id) -> None:
+    D = models.SearchDocument
+    db.query(D).filter(D.doc_type == doc_type, D.ref_id == str(ref_id)).delete(synchronize_session=False)
+
+
+def rebuild(db: Session, batch_size: int = 1000) -> int:
+    """Regenerate every document from the source tables in one transaction. Returns the count."""
+
+    db.query(models.SearchDocument).delete(synchronize_session=False)
+    written = 0
+    for model, (doc_type, build) in _SOURCES.items():
+        batch = []
+        for obj in db.query(model).yield_per(batch_size):
+            doc = build(obj)
+            if doc is not None:
+                batch.append({'doc_type': doc_type, 'ref_id': str(obj.id), **doc})
+            if len(batch) >= batch_size:
+                db.bulk_insert_mappings(models.SearchDocument, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            db.bulk_insert_mappings(models.SearchDocument, batch)
+            written += len(batch)
+    db.commit()
+    return written
+
+
+# -----------------------------
+# Query
+# -----------------------------
+
+def prefix_tsquery(text: str) -> str | None:
+    """`rent jer` -> `rent:* & jer:*` (every word, as a prefix); None if there are no words."""
+
+    terms = re.findall(r'\w+', text or '')
+    return ' & '.join(f'{t}:*' for t in terms) or None
+
+
+def search(db: Session, q: str, *, types: list[str], limit: int = 20, skip: int = 0) -> list[dict]:
+    """Best matches for `q` among `types`, most relevant first."""
+
+    D = models.SearchDocument
+    columns = [
+        D.doc_type.label('type'), D.ref_id.label('id'), D.title,
+        func.substr(D.body, 1, SNIPPET_CHARS).label('snippet'), D.created_at,
+    ]
+    if db.get_bind().dialect.name == 'postgresql':
+        tsquery = prefix_tsquery(q)
+        if tsquery is None:
+            return []
+        vector = literal_column(models.SEARCH_DOCUMENT_VECTOR)
+        query = func.to_tsquery('simple', tsquery)
+        qry = (
+            db.query(*columns)
+            .filter(vector.op('@@')(query))
+            .order_by(func.ts_rank(vector, query).desc(), D.created_at.desc(), D.id.desc())
+        )
+    else:
+        like = f"%{q.strip()}%"
+        qry = (
+            db.query(*columns)
+            .filter(or_(D.title.ilike(like), D.body.ilike(like)))
+            .order_by(case((D.title.ilike(like), 0), else_=1), D.created_at.desc(), D.id.desc())
+        )
+    rows = qry.filter(D.doc_type.in_(types)).offset(skip).limit(limit).all()
+    return [dict(r._mapping) for r in rows]
@@ -0,0 +1,47 @@
+"""Background deletion of a user account and everything that references it.
+
+`DELETE /admin/users/{id}` only queues a UserDeletionJob and returns its id;
+deleting a big account inside the request (one DELETE per table, all in one
+transaction) held locks across every side-app table and could time the request
+out. `run` removes the user's rows with the chunked, resumable steps in
+app/purge.py, ending with the user row itself.
+`python -m app.maintenance run-user-deletions` resumes queued, failed and
+abandoned jobs.
+"""
+
+from sqlalchemy.orm import Session
+from . import models, purge
+
+BATCH_SIZE = purge.BATCH_SIZE
+
+STEPS = purge.STEPS
+steps_done = purge.steps_done
+
+_UNFINISHED = ('queued', 'running', 'failed')
+
+
+def enqueue(db: Session, user_id: int, requested_by_user_id: int | None = None) -> models.UserDeletionJob:
+    """The user's unfinished deletion job, or a new queued one (caller commits)."""
+    J = models.UserDeletionJob
+    job = db.query(J).filter(J.user_id == user_id, J.status.in_(_UNFINISHED)).order_by(J.id.desc()).first()
+    if job is None:
+        job = J(user_id=user_id, requested_by_user_id=requested_by_user_id, status='queued', deleted_rows=0)
+        db.add(job)
+        db.flush()
+    return job
+
+
+def _work(db: Session, job: models.UserDeletionJob, batch_size: int) -> None:
+    user_id = job.user_id
+    purge.run_steps(db, job, lambda column: column == user_id, batch_size)
+    purge.finish(db, job)
+
+
+def run(job_id: int, batch_size: int = BATCH_SIZE) -> int | None:
+    """Work job `job_id` to completion. Returns rows deleted by this run, or None if it wasn't claimable or failed."""
+    return purge.execute(models.UserDeletionJob, job_id, lambda db, job: _work(db, job, batch_size), 'user-deletion')
+
+
+def run_pending(batch_size: int = BATCH_SIZE) -> int:
+    """Run every resumable job; returns the rows deleted."""
+    return purge.run_pending(models.UserDeletionJob, lambda job_id: run(job_id, batch_size))
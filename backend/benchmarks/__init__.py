@@ -0,0 +1,2 @@
+# Performance tooling (not shipped in the Docker image). Run from backend/, e.g.
+# `python -m benchmarks.startup`.
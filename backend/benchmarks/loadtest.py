@@ -0,0 +1,191 @@
+"""HTTP load test replaying a realistic traffic mix against a running API.
+
+Seed first with `python -m benchmarks.datagen --scale N`, start the API
+(e.g. `uvicorn app.main:app --workers 4`), then:
+
+    python -m benchmarks.loadtest --base-url http://localhost:8000 --users N --duration 60 --concurrency 50
+    python -m benchmarks.loadtest ... --mix browse_apartments=60,poll_notifications=40
+    python -m benchmarks.loadtest ... --json > before.json
+
+Each virtual user logs in as a random generated user and loops over weighted
+scenarios until the duration elapses. Latencies are recorded per route template
+and reported as p50/p95/p99 plus throughput. Every virtual user sends its own
+X-Forwarded-For address so the per-IP login limiter doesn't throttle the run.
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+import httpx
+from .datagen import EMAIL_TEMPLATE, LOAD_PASSWORD
+
+DEFAULT_MIX = {
+    'browse_apartments': 40,
+    'poll_notifications': 25,
+    'login': 10,
+    'browse_external_listings': 10,
+    'apply': 5,
+    'browse_jobs': 5,
+}
+# Opt-in via --mix (the community app is off unless ENABLE_COMMUNITY is set on the server)
+SCENARIOS = set(DEFAULT_MIX) | {'browse_community'}
+
+_SEARCH_TERMS = [None, None, None, 'jerusalem', 'balcony', 'room', 'tel aviv']
+
+
+class _Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def add(self, label: str, seconds: float, status: int) -> None:
+        self.latencies[label].append(seconds)
+        self.statuses[label][status] += 1
+
+
+def _percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank
+    k = min(len(sorted_values) - 1, max(0, math.ceil(p / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+class _VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, rec: _Recorder, rng: random.Random, users: int):
+        self.client = client
+        self.rec = rec
+        self.rng = rng
+        self.users = users
+        self.ip = f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}'
+        self.headers: dict[str, str] = {'X-Forwarded-For': self.ip}
+        self.apartment_ids: list[int] = []
+
+    async def _call(self, label: str, method: str, url: str, **kw) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            resp = await self.client.request(method, url, headers=self.headers, **kw)
+        except httpx.HTTPError:
+            self.rec.add(label, time.perf_counter() - started, 0)
+            return None
+        self.rec.add(label, time.perf_counter() - started, resp.status_code)
+        return resp
+
+    async def login(self) -> None:
+        email = EMAIL_TEMPLATE.format(self.rng.randrange(self.users))
+        resp = await self._call('POST /auth/token', 'POST', '/auth/token', data={'username': email, 'password': LOAD_PASSWORD})
+        if resp is not None and resp.status_code == 200:
+            self.headers['Authorization'] = f"Bearer {resp.json()['access_token']}"
+
+    # scenarios ----------------------------------------------------------
+
+    async def browse_apartments(self) -> None:
+        resp = await self._call('GET /apartments', 'GET', '/apartments')
+        if resp is not None and resp.status_code == 200:
+            self.apartment_ids = [a['id'] for a in resp.json()] or self.apartment_ids
+        for _ in range(self.rng.randint(1, 3)):
+            if not self.apartment_ids:
+                break
+            await self._call('GET /apartments/{apartment_id}', 'GET', f'/apartments/{self.rng.choice(self.apartment_ids)}')
+
+    async def poll_notifications(self) -> None:
+        await self._call('GET /notifications', 'GET', '/notifications')
+
+    async def browse_external_listings(self) -> None:
+        q = self.rng.choice(_SEARCH_TERMS)
+        params = {'limit': 20, **({'q': q} if q else {})}
+        await self._call('GET /external-listings', 'GET', '/external-listings', params=params)
+
+    async def apply(self) -> None:
+        if not self.apartment_ids:
+            await self.browse_apartments()
+        if self.apartment_ids:
+            ap = self.rng.choice(self.apartment_ids)
+            # 400 (own listing / already applied) is an expected outcome at steady state
+            await self._call('POST /apartments/{apartment_id}/apply', 'POST', f'/apartments/{ap}/apply', json={'message': 'Load test application'})
+
+    async def browse_jobs(self) -> None:
+        await self._call('GET /jobs/listings', 'GET', '/jobs/listings')
+
+    async def browse_community(self) -> None:
+        await self._call('GET /community/posts', 'GET', '/community/posts')
+
+    async def run(self, mix: dict[str, int], deadline: float) -> None:
+        await self.login()
+        names = list(mix)
+        weights = [mix[n] for n in names]
+        while time.perf_counter() < deadline:
+            await getattr(self, self.rng.choices(names, weights)[0])()
+
+
+def _report(rec: _Recorder, elapsed: float) -> dict:
+    out = {}
+    for label in sorted(rec.latencies):
+        lat = sorted(rec.latencies[label])
+        out[label] = {
+            'requests': len(lat),
+            'rps': round(len(lat) / elapsed, 2),
+            'p50_ms': round(_percentile(lat, 50) * 1000, 1),
+            'p95_ms': round(_percentile(lat, 95) * 1000, 1),
+            'p99_ms': round(_percentile(lat, 99) * 1000, 1),
+            'statuses': dict(sorted(rec.statuses[label].items())),
+        }
+    return out
+
+
+def _parse_mix(raw: str | None) -> dict[str, int]:
+    if not raw:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in raw.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f'unknown scenario {name!r}; choose from {", ".join(sorted(SCENARIOS))}')
+        mix[name] = int(weight or 1)
+    return mix
+
+
+async def _main(args) -> int:
+    mix = _parse_mix(args.mix)
+    rec = _Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30.0) as client:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        vus = [_VirtualUser(client, rec, random.Random(args.seed + i), args.users) for i in range(args.concurrency)]
+        await asyncio.gather(*(vu.run(mix, deadline) for vu in vus))
+        elapsed = time.perf_counter() - started
+
+    report = _report(rec, elapsed)
+    if args.json:
+        print(json.dumps({'duration_s': round(elapsed, 1), 'concurrency': args.concurrency, 'mix': mix, 'endpoints': report}, indent=2))
+        return 0
+    total = sum(r['requests'] for r in report.values())
+    print(f"{'endpoint':<40} {'reqs':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for label, r in report.items():
+        statuses = ' '.join(f'{k}:{v}' for k, v in r['statuses'].items())
+        print(f"{label:<40} {r['requests']:>7} {r['rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}  {statuses}")
+    print(f'total {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)')
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--users', type=int, default=10_000, help='--scale used when seeding (login pool size)')
+    parser.add_argument('--duration', type=float, default=60.0, help='seconds')
+    parser.add_argument('--concurrency', type=int, default=20, help='virtual users')
+    parser.add_argument('--mix', help='scenario weights, e.g. browse_apartments=60,login=10')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    return asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Micro-benchmarks for crud and serialization hot paths.
+
+Times individual functions (not HTTP round trips) against a small fixed dataset:
+the crud list/aggregate helpers, the list_apartments handler's dict building,
+and the response_model validation + JSON encoding FastAPI performs per response.
+Each `serialize.*` bench has a `[fast]` twin that renders the same payload with
+FastJSONResponse (app/responses.py); the difference is the CPU saved per
+response by FAST_JSON_RESPONSES.
+
+Usage (from backend/):
+
+    python -m benchmarks.micro                      # print timings
+    python -m benchmarks.micro --save               # overwrite benchmarks/baselines/micro.json
+    python -m benchmarks.micro --compare            # fail if any bench is >25% slower than baseline
+    python -m benchmarks.micro --compare --threshold 0.1 -k serialize
+
+Uses a throwaway SQLite database unless DATABASE_URL is set. Baselines are only
+comparable on the same machine and database; regenerate with --save when the
+runner changes.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='sh-micro-'), 'micro.db')
+
+from datetime import datetime, timedelta  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import parse_obj_as  # noqa: E402
+from app import models, schemas, crud, migrations  # noqa: E402
+from app.database import engine, SessionLocal  # noqa: E402
+from app.routers import housing  # noqa: E402
+from app.responses import FastJSONResponse  # noqa: E402
+from .seed import bulk_insert, make_users  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'micro.json')
+
+ROWS = 100
+
+
+def _seed(db) -> dict:
+    users = make_users(db, ROWS, prefix='micro')
+    owner = users[0]
+    now = datetime.utcnow()
+    ts = [(now - timedelta(minutes=i)).isoformat() for i in range(ROWS)]
+    apartments = bulk_insert(db, models.Apartment, [
+        {'title': f'Apartment {i}', 'description': 'Bright room near the bus line. ' * 8, 'location': 'Jerusalem', 'rooms': 3, 'rent': 4200, 'owner_id': owner if i < 20 else users[i]}
+        for i in range(ROWS)
+    ])
+    bulk_insert(db, models.Application, [
+        {'applicant_id': users[(i * 7 + j) % ROWS], 'apartment_id': apartments[i], 'message': 'Hi', 'status': 'pending'}
+        for i in range(20) for j in range(3)
+    ], returning=False)
+    listings = bulk_insert(db, models.ExternalListing, [
+        {'created_by_user_id': users[i], 'source': 'yad2', 'url': f'https://www.yad2.co.il/item/{i}', 'title': f'Listing {i} balcony', 'location': 'Tel Aviv', 'notes': 'furnished', 'created_at': ts[i]}
+        for i in range(ROWS)
+    ])
+    bulk_insert(db, models.ExternalListingInterest, [
+        {'listing_id': listings[i % 50], 'user_id': users[i]} for i in range(ROWS)
+    ], returning=False)
+    return {'owner': owner, 'listings': listings[:50]}
+
+
+def _benches(db, fx: dict) -> dict:
+    apartments_out = crud.list_apartment_rows(db)
+    items, total, _ = crud.list_external_listings(db, limit=50)
+    listings_out = {
+        'items': [
+            {**{k: getattr(i, k) for k in ('id', 'created_by_user_id', 'source', 'url', 'title', 'price', 'location', 'notes', 'created_at')}, 'interest_count': 1, 'is_interested': False}
+            for i in items
+        ],
+        'total': total,
+    }
+    posts_out = [
+        {'id': i, 'created_by_user_id': i, 'created_by_name': f'User {i}', 'title': f'Post {i}', 'body': 'Looking for a roommate. ' * 10, 'is_pinned': False, 'created_at': datetime.utcnow().isoformat(), 'comments_count': i % 7}
+        for i in range(50)
+    ]
+
+    def encode(model, payload):
+        # What FastAPI does after the handler returns: validate, then encode to JSON bytes
+        validated = parse_obj_as(model, payload)
+        return json.dumps(jsonable_encoder(validated)).encode('utf-8')
+
+    def encode_fast(payload):
+        return FastJSONResponse(payload).body
+
+    return {
+        'crud.list_apartments': lambda: crud.list_apartments(db),
+        'crud.list_external_listings': lambda: crud.list_external_listings(db, limit=20),
+        'crud.list_external_listings[search]': lambda: crud.list_external_listings(db, limit=20, search='balcony'),
+        'crud.get_interest_counts': lambda: crud.get_interest_counts(db, fx['listings']),
+        'crud.list_applications_for_owner': lambda: crud.list_applications_for_owner(db, fx['owner']),
+        'crud.list_apartment_rows': lambda: crud.list_apartment_rows(db),
+        'handler.list_apartments': lambda: housing.list_apartments(db=db),
+        'serialize.apartments': lambda: encode(list[schemas.ApartmentOut], apartments_out),
+        'serialize.external_listings': lambda: encode(schemas.ExternalListingListOut, listings_out),
+        'serialize.community_posts': lambda: encode(list[schemas.CommunityPostOut], posts_out),
+        'serialize.apartments[fast]': lambda: encode_fast(apartments_out),
+        'serialize.external_listings[fast]': lambda: encode_fast(listings_out),
+        'serialize.community_posts[fast]': lambda: encode_fast(posts_out),
+    }
+
+
+def _time(fn, min_seconds: float = 0.5, repeat: int = 7) -> dict:
+    fn()  # warm up caches / compiled queries
+    number = 1
+    while True:
+        t = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - t >= min_seconds / repeat or number >= 1 << 16:
+            break
+        number *= 2
+    per_call = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - t) / number)
+    return {'min_us': round(min(per_call) * 1e6, 1), 'median_us': round(statistics.median(per_call) * 1e6, 1)}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--save', action='store_true', help='write results as the new baseline')
+    parser.add_argument('--compare', action='store_true', help='compare against the stored baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown ratio for --compare')
+    parser.add_argument('-k', dest='keyword', help='only run benches whose name contains this')
+    args = parser.parse_args(argv)
+
+    migrations.upgrade(engine)
+    db = SessionLocal()
+    try:
+        fx = _seed(db)
+        benches = _benches(db, fx)
+        results = {}
+        for name, fn in benches.items():
+            if args.keyword and args.keyword not in name:
+                continue
+            results[name] = _time(fn)
+    finally:
+        db.close()
+
+    baseline = {}
+    if args.compare:
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)['results']
+
+    regressions = 0
+    print(f"{'bench':<38} {'min us':>10} {'median us':>10}" + (f" {'baseline':>10} {'ratio':>7}" if baseline else ''))
+    for name, r in results.items():
+        line = f"{name:<38} {r['min_us']:>10} {r['median_us']:>10}"
+        if baseline and name in baseline:
+            ratio = r['min_us'] / baseline[name]['min_us'] if baseline[name]['min_us'] else 1.0
+            flag = ''
+            if ratio > 1 + args.threshold:
+                flag = '  REGRESSION'
+                regressions += 1
+            line += f" {baseline[name]['min_us']:>10} {ratio:>7.2f}{flag}"
+        print(line)
+
+    if args.save:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump({
+                'meta': {'python': platform.python_version(), 'platform': platform.platform(), 'database': engine.dialect.name, 'rows': ROWS},
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'baseline written to {os.path.relpath(BASELINE_PATH)}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""Query-budget check for list endpoints.
+
+Seeds the database at two sizes, calls every list endpoint through a TestClient
+and counts the SQL statements each request issues. A route fails when
+
+- its statement count grows between the small and the large dataset (N+1), or
+- it issues more statements than its budget in `BUDGETS`.
+
+Usage (from backend/; needs `pip install -r requirements-dev.txt`):
+
+    python -m benchmarks.query_budget               # throwaway SQLite database
+    DATABASE_URL=postgresql://.../scratch python -m benchmarks.query_budget
+
+Exit status is non-zero on any failure, so CI can run it as a gate. Only point
+DATABASE_URL at a scratch database: the check migrates it and inserts rows.
+
+Routes in `KNOWN_N_PLUS_ONE` still scale with N; they are reported but do not
+fail the run. A listed route that passes fails the run instead, so fixing one
+means deleting it from that set, and the contract is enforced from then on.
+The set is currently empty.
+"""
+
+import os
+import sys
+import tempfile
+import argparse
+
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='sh-budget-'), 'budget.db')
+# Mount every optional subsystem so all list endpoints are covered.
+for _flag in ('ENABLE_COMMUNITY', 'ENABLE_RESOURCES', 'ENABLE_JOBS'):
+    os.environ.setdefault(_flag, 'true')
+# Measure the queries, not the hot-feed cache (the fixture bulk-inserts without invalidating it)
+os.environ.setdefault('FEED_CACHE_TTL_SECONDS', '0')
+
+from datetime import datetime, timedelta  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from app import models, migrations, search  # noqa: E402
+from app.auth import create_access_token  # noqa: E402
+from app.database import engine, SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from .seed import bulk_insert, make_users  # noqa: E402
+
+# Max statements per request, including the one that loads the current user.
+BUDGETS = {
+    '/apartments': 3,
+    '/external-listings': 4,
+    '/contact-requests/incoming': 3,
+    '/owner/applications': 3,
+    '/notifications': 2,
+    '/community/posts': 2,
+    '/community/posts/{post_id}/comments': 3,
+    '/community/events': 2,
+    '/resources/items': 2,
+    '/resources/categories': 2,
+    '/resources/saved': 2,
+    '/jobs/listings': 2,
+    '/jobs/saved': 2,
+    '/me/saved': 2,
+    '/jobs/listings/{job_id}/applications': 3,
+    '/jobs/my-applications': 2,
+    '/search': 2,
+    '/admin/users': 3,
+    '/admin/apartments': 2,
+    '/admin/applications': 2,
+    '/admin/community/posts': 2,
+    '/admin/community/events': 2,
+    '/admin/resources/items': 2,
+    '/admin/jobs/listings': 2,
+    '/admin/moderation-queue': 2,
+}
+
+KNOWN_N_PLUS_ONE: set[str] = set()
+
+
+class _Fixture:
+    """Fixed actors; `grow()` adds n rows per list endpoint, each by a distinct author."""
+
+    def __init__(self, db):
+        self.db = db
+        self.admin_id = make_users(db, 1, prefix='admin', is_admin=True)[0]
+        self.owner_id, self.viewer_id = make_users(db, 2, prefix='actor')
+        now = datetime.utcnow().isoformat()
+        self.owner_listing_id = bulk_insert(db, models.ExternalListing, [
+            {'created_by_user_id': self.owner_id, 'source': 'yad2', 'url': 'https://yad2.co.il/item/owner', 'created_at': now},
+        ])[0]
+        self.thread_post_id = bulk_insert(db, models.CommunityPost, [
+            {'created_by_user_id': self.owner_id, 'body': 'thread', 'is_pinned': False, 'created_at': now},
+        ])[0]
+        self.owner_job_id = bulk_insert(db, models.JobListing, [
+            {'created_by_user_id': self.owner_id, 'title': 'Owner job', 'status': 'approved', 'created_at': now},
+        ])[0]
+        self._authors = 0
+
+    def grow(self, n: int) -> None:
+        db = self.db
+        authors = make_users(db, n, prefix='author', offset=self._authors)
+        self._authors += n
+        now = datetime.utcnow()
+        ts = [(now + timedelta(seconds=i)).isoformat() for i in range(n)]
+        starts = [(now + timedelta(days=1, hours=i)).isoformat() for i in range(n)]
+
+        apartments = bulk_insert(db, models.Apartment, [
+            {'title': f'Apartment {a}', 'owner_id': self.owner_id, 'rooms': 2, 'rent': 3000} for a in authors
+        ])
+        bulk_insert(db, models.Application, [
+            {'applicant_id': a, 'apartment_id': ap, 'status': 'pending'} for a, ap in zip(authors, apartments)
+        ])
+        bulk_insert(db, models.Apartment, [
+            {'title': f'Own apartment {a}', 'owner_id': a, 'rooms': 1, 'rent': 2500} for a in authors
+        ])
+        listings = bulk_insert(db, models.ExternalListing, [
+            {'created_by_user_id': a, 'source': 'yad2', 'url': f'https://yad2.co.il/item/{a}', 'title': f'Listing {a}', 'created_at': t}
+            for a, t in zip(authors, ts)
+        ])
+        bulk_insert(db, models.ExternalListingInterest, [
+            {'listing_id': lid, 'user_id': self.viewer_id} for lid in listings
+        ])
+        bulk_insert(db, models.ContactRequest, [
+            {'requester_user_id': a, 'target_user_id': self.owner_id, 'listing_id': self.owner_listing_id, 'status': 'pending', 'created_at': t}
+            for a, t in zip(authors, ts)
+        ])
+        bulk_insert(db, models.Notification, [
+            {'user_id': self.viewer_id, 'message': f'note {a}', 'is_read': False, 'created_at': t} for a, t in zip(authors, ts)
+        ])
+        bulk_insert(db, models.CommunityPost, [
+            {'created_by_user_id': a, 'title': f'Post {a}', 'body': 'hello', 'is_pinned': False, 'created_at': t}
+            for a, t in zip(authors, ts)
+        ])
+        bulk_insert(db, models.CommunityComment, [
+            {'post_id': self.thread_post_id, 'created_by_user_id': a, 'body': 'reply', 'created_at': t} for a, t in zip(authors, ts)
+        ])
+        bulk_insert(db, models.CommunityEvent, [
+            {'created_by_user_id': a, 'title': f'Event {a}', 'starts_at': s, 'status': 'approved', 'created_at': t}
+            for a, s, t in zip(authors, starts, ts)
+        ])
+        resources = bulk_insert(db, models.ResourceItem, [
+            {'created_by_user_id': a, 'title': f'Resource {a}', 'category': 'housing', 'status': 'approved', 'created_at': t}
+            for a, t in zip(authors, ts)
+        ])
+        bulk_insert(db, models.SavedItem, [{'user_id': self.viewer_id, 'item_type': 'resource', 'item_id': r, 'created_at': t} for r, t in zip(resources, ts)])
+        jobs = bulk_insert(db, models.JobListing, [
+            {'created_by_user_id': a, 'title': f'Job {a}', 'company': 'Acme', 'status': 'approved', 'created_at': t}
+            for a, t in zip(authors, ts)
+        ])
+        bulk_insert(db, models.SavedItem, [{'user_id': self.viewer_id, 'item_type': 'job', 'item_id': j, 'created_at': t} for j, t in zip(jobs, ts)])
+        bulk_insert(db, models.JobApplication, [
+            {'job_id': j, 'user_id': self.viewer_id, 'created_at': t} for j, t in zip(jobs, ts)
+        ])
+        bulk_insert(db, models.JobApplication, [
+            {'job_id': self.owner_job_id, 'user_id': a, 'created_at': t} for a, t in zip(authors, ts)
+        ])
+        # A pending backlog of every moderated type for the merged moderation queue
+        for model in (models.CommunityEvent, models.ResourceItem, models.JobListing):
+            extra = {'starts_at': starts[0]} if model is models.CommunityEvent else {}
+            bulk_insert(db, model, [
+                {'created_by_user_id': a, 'title': f'Pending {a}', 'status': 'pending', 'created_at': t, **extra}
+                for a, t in zip(authors, ts)
+            ], returning=False)
+        # Bulk inserts bypass the write paths that maintain search documents
+        search.rebuild(db)
+
+    def requests(self) -> list[tuple[str, str, int]]:
+        """(route template, concrete path, acting user id) for every checked endpoint."""
+
+        v, o, adm = self.viewer_id, self.owner_id, self.admin_id
+        return [
+            ('/apartments', '/apartments', v),
+            ('/external-listings', '/external-listings?limit=100', v),
+            ('/contact-requests/incoming', '/contact-requests/incoming', o),
+            ('/owner/applications', '/owner/applications', o),
+            ('/notifications', '/notifications', v),
+            ('/community/posts', '/community/posts?limit=100', v),
+            ('/community/posts/{post_id}/comments', f'/community/posts/{self.thread_post_id}/comments', v),
+            ('/community/events', '/community/events', v),
+            ('/resources/items', '/resources/items', v),
+            ('/resources/categories', '/resources/categories', v),
+            ('/search', '/search?q=job&limit=50', v),
+            ('/resources/saved', '/resources/saved', v),
+            ('/jobs/listings', '/jobs/listings', v),
+            ('/jobs/saved', '/jobs/saved', v),
+            ('/me/saved', '/me/saved?limit=200', v),
+            ('/jobs/listings/{job_id}/applications', f'/jobs/listings/{self.owner_job_id}/applications', o),
+            ('/jobs/my-applications', '/jobs/my-applications', v),
+            ('/admin/users', '/admin/users', adm),
+            ('/admin/apartments', '/admin/apartments', adm),
+            ('/admin/applications', '/admin/applications', adm),
+            ('/admin/community/posts', '/admin/community/posts', adm),
+            ('/admin/community/events', '/admin/community/events', adm),
+            ('/admin/resources/items', '/admin/resources/items', adm),
+            ('/admin/jobs/listings', '/admin/jobs/listings', adm),
+            ('/admin/moderation-queue', '/admin/moderation-queue?limit=200', adm),
+        ]
+
+
+class _StatementCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, 'after_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def _measure(client: TestClient, counter: _StatementCounter, fixture: _Fixture, tokens: dict) -> dict[str, int]:
+    out = {}
+    for route, path, user_id in fixture.requests():
+        headers = {'Authorization': f'Bearer {tokens[user_id]}'}
+        before = counter.count
+        resp = client.get(path, headers=headers)
+        if resp.status_code != 200:
+            raise RuntimeError(f'GET {path} returned {resp.status_code}: {resp.text[:200]}')
+        out[route] = counter.count - before
+    return out
+
+
+def run(small: int, large: int) -> int:
+    migrations.upgrade(engine)
+    db = SessionLocal()
+    try:
+        fixture = _Fixture(db)
+        emails = dict(db.query(models.User.id, models.User.email).filter(
+            models.User.id.in_([fixture.admin_id, fixture.owner_id, fixture.viewer_id])
+        ).all())
+        tokens = {uid: create_access_token({'sub': email}) for uid, email in emails.items()}
+        counter = _StatementCounter()
+        with TestClient(app) as client:
+            fixture.grow(small)
+            at_small = _measure(client, counter, fixture, tokens)
+            fixture.grow(large - small)
+            at_large = _measure(client, counter, fixture, tokens)
+    finally:
+        db.close()
+
+    failures = 0
+    print(f"{'route':<42} {'N=' + str(small):>8} {'N=' + str(large):>8} {'budget':>7}  result")
+    for route, _, _ in fixture.requests():
+        a, b, budget = at_small[route], at_large[route], BUDGETS.get(route)
+        problems = []
+        if b > a:
+            problems.append('grows with N')
+        if budget is not None and b > budget:
+            problems.append('over budget')
+        if not problems:
+            result = 'ok'
+            if route in KNOWN_N_PLUS_ONE:
+                result = 'FAIL: fixed, remove from KNOWN_N_PLUS_ONE'
+                failures += 1
+        elif route in KNOWN_N_PLUS_ONE:
+            result = 'known: ' + ', '.join(problems)
+        else:
+            result = 'FAIL: ' + ', '.join(problems)
+            failures += 1
+        print(f"{route:<42} {a:>8} {b:>8} {budget if budget is not None else '-':>7}  {result}")
+    return 1 if failures else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--small', type=int, default=3, help='rows per endpoint in the first pass')
+    parser.add_argument('--large', type=int, default=12, help='rows per endpoint in the second pass')
+    args = parser.parse_args(argv)
+    if args.large <= args.small:
+        parser.error('--large must be greater than --small')
+    return run(args.small, args.large)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
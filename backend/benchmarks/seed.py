@@ -0,0 +1,42 @@
+"""Bulk data helpers shared by the benchmark tools."""
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app import models
+
+BATCH_SIZE = 5_000
+
+# Never used to log in; benchmark users authenticate with minted tokens.
+PLACEHOLDER_PASSWORD_HASH = '!benchmark-user'
+
+
+def bulk_insert(db: Session, model, rows: list[dict], *, returning: bool = True) -> list:
+    """Insert rows in batches; returns the new primary keys in input order."""
+
+    ids: list = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        if not batch:
+            continue
+        if returning:
+            res = db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), batch)
+            ids.extend(r[0] for r in res)
+        else:
+            db.execute(insert(model), batch)
+    db.commit()
+    return ids
+
+
+def make_users(db: Session, count: int, *, prefix: str, offset: int = 0, is_admin: bool = False) -> list[int]:
+    rows = [
+        {
+            'email': f'{prefix}{offset + i}@bench.example.com',
+            'full_name': f'{prefix.title()} {offset + i}',
+            'hashed_password': PLACEHOLDER_PASSWORD_HASH,
+            'is_admin': is_admin,
+            'phone_number': f'050{offset + i:07d}',
+            'phone_verified': True,
+        }
+        for i in range(count)
+    ]
+    return bulk_insert(db, models.User, rows)
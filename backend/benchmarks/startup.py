@@ -0,0 +1,100 @@
+"""Startup benchmark: import time of app.main and time-to-first-request.
+
+Usage (from backend/, against a migrated database):
+
+    DATABASE_URL=postgresql://... python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --json > startup.json   # machine-readable, for tracking over time
+
+Each run uses a fresh interpreter so module caches don't hide regressions.
+Feature flags (ENABLE_COMMUNITY, ...) are read from the environment as usual,
+so running with and without them shows what optional subsystems cost.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure_import() -> float:
+    out = subprocess.run(
+        [sys.executable, '-c', _IMPORT_SNIPPET],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def measure_first_request(timeout: float = 30.0) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError('uvicorn exited during startup (is the database migrated?)')
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/docs', timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError('timed out waiting for first response')
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def _summary(samples: list[float]) -> dict:
+    return {
+        'min_ms': round(min(samples) * 1000, 1),
+        'median_ms': round(statistics.median(samples) * 1000, 1),
+        'max_ms': round(max(samples) * 1000, 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    imports = [measure_import() for _ in range(args.runs)]
+    first = [measure_first_request() for _ in range(args.runs)]
+    result = {
+        'runs': args.runs,
+        'flags': {k: os.getenv(k) for k in ('ENABLE_COMMUNITY', 'ENABLE_RESOURCES', 'ENABLE_JOBS', 'ENABLE_PUSH') if os.getenv(k) is not None},
+        'import_app_main': _summary(imports),
+        'time_to_first_request': _summary(first),
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for key in ('import_app_main', 'time_to_first_request'):
+            s = result[key]
+            print(f"{key:<24} min {s['min_ms']:>8} ms   median {s['median_ms']:>8} ms   max {s['max_ms']:>8} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
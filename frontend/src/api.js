@@ -30,7 +30,8 @@ async function resolveBase(){
 // Create a placeholder axios instance; we'll update its baseURL after resolving
 // config. Callers may import `API` and `await initApi()` if they need the base
 // to be resolved before first request.
-const API = axios.create()
+// withCredentials: the API's short-lived read-your-writes cookie must travel with reads
+const API = axios.create({ withCredentials: true })
 let _apiInitPromise = null
 export function initApi(){
   if (!_apiInitPromise) _apiInitPromise = (async ()=>{
@@ -245,10 +246,15 @@ export async function deleteAdminApplication(id){
   return API.delete(`/admin/applications/${id}`, authHeaders())
 }
 
+// Queues the clean and returns the job (202); poll adminPurgeStatus(job_id) for progress
 export async function adminCleanDB(){
   return API.post('/admin/clean', {}, authHeaders())
 }
 
+export async function adminPurgeStatus(id){
+  return API.get(`/admin/purges/${id}`, authHeaders())
+}
+
 export async function adminSendEmail(payload){
   return API.post('/admin/email', payload, authHeaders())
 }
@@ -350,10 +356,12 @@ export async function adminRejectCommunityEvent(eventId){
 // Resources app
 // -----------------------------
 
-export async function resourcesListItems(category, q){
+// One page of items; the next page's cursor is in the X-Next-Cursor response header
+export async function resourcesListItems(category, q, cursor){
   const qs = new URLSearchParams()
   if(category) qs.set('category', category)
   if(q && String(q).trim()) qs.set('q', String(q).trim())
+  if(cursor) qs.set('cursor', cursor)
   const suffix = qs.toString() ? `?${qs.toString()}` : ''
   return API.get(`/resources/items${suffix}`, authHeaders())
 }
@@ -395,10 +403,13 @@ export async function adminDeleteResource(id){
 // Jobs app
 // -----------------------------
 
-export async function jobsList(q){
+// One page of the board; the next page's cursor is in the X-Next-Cursor response header
+export async function jobsList(q, cursor){
+  const params = {}
   const s = (q || '').trim()
-  const qs = s ? `?q=${encodeURIComponent(s)}` : ''
-  return API.get(`/jobs/listings${qs}`, authHeaders())
+  if (s) params.q = s
+  if (cursor) params.cursor = cursor
+  return API.get('/jobs/listings', { ...authHeaders(), params })
 }
 
 export async function jobsCreate(payload){
@@ -7,6 +7,7 @@ import {
   getAdminApplications,
   deleteAdminApplication,
   adminCleanDB,
+  adminPurgeStatus,
   adminSendEmail,
   adminSendNotification,
   adminCommunityEvents,
@@ -213,10 +214,21 @@ export default function Admin(){
   async function doClean(){
     if(!confirm('Clean database: remove all non-admin users, apartments, applications, and notifications?')) return
     try{
-      await adminCleanDB()
-      alert('Database cleaned')
+      const resp = await adminCleanDB()
+      alert('Clean queued; you will be told when it finishes')
+      let job = resp.data
+      while(job.status !== 'done' && job.status !== 'failed'){
+        await new Promise(resolve => setTimeout(resolve, 2000))
+        job = (await adminPurgeStatus(job.job_id)).data
+      }
+      if(job.status === 'done') alert(`Database cleaned (${job.deleted_rows} rows deleted)`)
+      else alert('Clean failed: ' + (job.error || 'unknown error'))
       fetchAll(); fetchApps()
-    }catch(e){ console.error(e); alert('Clean failed') }
+    }catch(e){
+      console.error(e)
+      const detail = e && e.response && e.response.data && e.response.data.detail
+      alert(detail || 'Clean failed')
+    }
   }
 
   async function submitEmail(e){
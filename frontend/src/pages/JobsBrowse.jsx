@@ -6,6 +6,10 @@ export default function JobsBrowse(){
   const { user } = useAuth()
   const [items, setItems] = useState([])
   const [loading, setLoading] = useState(false)
+  // Search the loaded pages came from; "Load more" keeps using it even if the box was edited since
+  const [query, setQuery] = useState('')
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   const [search, setSearch] = useState('')
 
@@ -16,6 +20,8 @@ export default function JobsBrowse(){
       const s = typeof nextSearch === 'string' ? nextSearch : search
       const resp = await jobsList((s || '').trim() || undefined)
       setItems(Array.isArray(resp.data) ? resp.data : [])
+      setQuery((s || '').trim())
+      setNextCursor(resp.headers['x-next-cursor'] || null)
     }catch(e){
       console.error(e)
       alert('Failed to load jobs')
@@ -26,12 +32,30 @@ export default function JobsBrowse(){
 
   useEffect(()=>{ refresh() },[])
 
+  async function loadMore(){
+    if(!nextCursor) return
+    setLoadingMore(true)
+    try{
+      await initApi()
+      const resp = await jobsList(query || undefined, nextCursor)
+      const more = Array.isArray(resp.data) ? resp.data : []
+      setItems(prev => prev.concat(more))
+      setNextCursor(resp.headers['x-next-cursor'] || null)
+    }catch(e){
+      console.error(e)
+      alert('Failed to load more jobs')
+    }finally{
+      setLoadingMore(false)
+    }
+  }
+
   async function toggleSave(j){
     try{
       await initApi()
       if(j.is_saved) await jobsUnsave(j.id)
       else await jobsSave(j.id)
-      await refresh()
+      // Update in place so the pages loaded so far stay on screen
+      setItems(prev => prev.map(x => x.id === j.id ? { ...x, is_saved: !j.is_saved } : x))
     }catch(e){
       console.error(e)
       alert('Failed to update saved list')
@@ -118,6 +142,14 @@ export default function JobsBrowse(){
         </div>
       ))}
 
+      {!loading && nextCursor && (
+        <div className="flex justify-center">
+          <button onClick={loadMore} disabled={loadingMore} className="text-sm px-3 py-2 bg-slate-100 rounded">
+            {loadingMore ? 'Loading…' : 'Load more'}
+          </button>
+        </div>
+      )}
+
       <div className="h-20" />
     </div>
   )
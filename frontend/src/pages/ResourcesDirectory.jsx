@@ -4,6 +4,10 @@ import { initApi, resourcesCreateItem, resourcesListItems, resourcesSaveItem, re
 export default function ResourcesDirectory(){
   const [items, setItems] = useState([])
   const [loading, setLoading] = useState(false)
+  // Filters the loaded pages came from; "Load more" keeps using them even if the boxes were edited since
+  const [applied, setApplied] = useState({ category: '', search: '' })
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   const [search, setSearch] = useState('')
   const [filterCategory, setFilterCategory] = useState('')
@@ -23,6 +27,8 @@ export default function ResourcesDirectory(){
       const c = typeof nextCategory === 'string' ? nextCategory : filterCategory
       const resp = await resourcesListItems((c || '').trim() || undefined, (s || '').trim() || undefined)
       setItems(Array.isArray(resp.data) ? resp.data : [])
+      setApplied({ category: (c || '').trim(), search: (s || '').trim() })
+      setNextCursor(resp.headers['x-next-cursor'] || null)
     }catch(e){
       console.error(e)
       alert('Failed to load resources')
@@ -33,6 +39,23 @@ export default function ResourcesDirectory(){
 
   useEffect(()=>{ refresh() },[])
 
+  async function loadMore(){
+    if(!nextCursor) return
+    setLoadingMore(true)
+    try{
+      await initApi()
+      const resp = await resourcesListItems(applied.category || undefined, applied.search || undefined, nextCursor)
+      const more = Array.isArray(resp.data) ? resp.data : []
+      setItems(prev => prev.concat(more))
+      setNextCursor(resp.headers['x-next-cursor'] || null)
+    }catch(e){
+      console.error(e)
+      alert('Failed to load more resources')
+    }finally{
+      setLoadingMore(false)
+    }
+  }
+
   async function submit(e){
     e.preventDefault()
     const t = (title || '').trim()
@@ -62,7 +85,8 @@ export default function ResourcesDirectory(){
       await initApi()
       if(it.is_saved) await resourcesUnsaveItem(it.id)
       else await resourcesSaveItem(it.id)
-      await refresh()
+      // Update in place so the pages loaded so far stay on screen
+      setItems(prev => prev.map(x => x.id === it.id ? { ...x, is_saved: !it.is_saved } : x))
     }catch(e){
       console.error(e)
       alert('Failed to update saved list')
@@ -146,6 +170,14 @@ export default function ResourcesDirectory(){
             {it.description && <div className="text-sm text-slate-700 mt-2 whitespace-pre-wrap">{it.description}</div>}
           </div>
         ))}
+
+        {!loading && nextCursor && (
+          <div className="flex justify-center">
+            <button onClick={loadMore} disabled={loadingMore} className="text-sm px-3 py-2 bg-slate-100 rounded">
+              {loadingMore ? 'Loading…' : 'Load more'}
+            </button>
+          </div>
+        )}
       </section>
 
       <div className="h-20" />
@@ -4,6 +4,8 @@ import { initApi, resourcesCreateItem, resourcesListItems, resourcesSaveItem, re
 export default function ResourcesGuides(){
   const [items, setItems] = useState([])
   const [loading, setLoading] = useState(false)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   const [title, setTitle] = useState('')
   const [url, setUrl] = useState('')
@@ -17,6 +19,7 @@ export default function ResourcesGuides(){
       await initApi()
       const resp = await resourcesListItems(category)
       setItems(Array.isArray(resp.data) ? resp.data : [])
+      setNextCursor(resp.headers['x-next-cursor'] || null)
     }catch(e){
       console.error(e)
       alert('Failed to load guides')
@@ -27,6 +30,23 @@ export default function ResourcesGuides(){
 
   useEffect(()=>{ refresh() },[])
 
+  async function loadMore(){
+    if(!nextCursor) return
+    setLoadingMore(true)
+    try{
+      await initApi()
+      const resp = await resourcesListItems(category, undefined, nextCursor)
+      const more = Array.isArray(resp.data) ? resp.data : []
+      setItems(prev => prev.concat(more))
+      setNextCursor(resp.headers['x-next-cursor'] || null)
+    }catch(e){
+      console.error(e)
+      alert('Failed to load more guides')
+    }finally{
+      setLoadingMore(false)
+    }
+  }
+
   async function submit(e){
     e.preventDefault()
     const t = (title || '').trim()
@@ -55,7 +75,8 @@ export default function ResourcesGuides(){
       await initApi()
       if(it.is_saved) await resourcesUnsaveItem(it.id)
       else await resourcesSaveItem(it.id)
-      await refresh()
+      // Update in place so the pages loaded so far stay on screen
+      setItems(prev => prev.map(x => x.id === it.id ? { ...x, is_saved: !it.is_saved } : x))
     }catch(e){
       console.error(e)
       alert('Failed to update saved list')
@@ -101,6 +122,14 @@ export default function ResourcesGuides(){
             {it.description && <div className="text-sm text-slate-700 mt-2 whitespace-pre-wrap">{it.description}</div>}
           </div>
         ))}
+
+        {!loading && nextCursor && (
+          <div className="flex justify-center">
+            <button onClick={loadMore} disabled={loadingMore} className="text-sm px-3 py-2 bg-slate-100 rounded">
+              {loadingMore ? 'Loading…' : 'Load more'}
+            </button>
+          </div>
+        )}
       </section>
 
       <div className="h-20" />